@@ -0,0 +1,110 @@
+from typing import Text, List, NoReturn, Dict, Union, Optional, Tuple, Iterator
+
+from rasa_codeless.shared.constants import BotStoreSortKey
+
+
+class BotStore:
+    """
+    Interface of the botstore backends the RASAC server
+    lists, scores, persists and deletes models through.
+    model scores and summaries are returned in the
+    format of the local botstore, so backends can be
+    swapped without changing the server
+    """
+
+    # whether the backend keeps catalog records which
+    # can be exported with export_records
+    supports_records = False
+
+    def get_models(self, latest_only: bool = False) -> Union[List, Text]:
+        """
+        Returns the models in the botstore, latest first,
+        or only the name of the latest model
+        """
+        raise NotImplementedError("get_models is not implemented")
+
+    def model_exists(self, model_name: Text) -> bool:
+        raise NotImplementedError("model_exists is not implemented")
+
+    def model_summaries(
+            self,
+            sort_by: Text = BotStoreSortKey.TIMESTAMP,
+            descending: bool = True,
+            min_scores: Optional[Dict] = None,
+            max_scores: Optional[Dict] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[Text] = None,
+    ) -> Tuple[List, Optional[Text]]:
+        """
+        Lists the final scores of the models, and the
+        cursor of the next page
+        """
+        raise NotImplementedError("model_summaries is not implemented")
+
+    def model_performance(
+            self,
+            model_name: Union[Text, List] = None,
+            curve: bool = True,
+            sort: bool = False,
+    ) -> Union[Dict, List]:
+        """
+        Returns the scores of a model, a list of models
+        or all models, either as curves or final scores
+        """
+        raise NotImplementedError("model_performance is not implemented")
+
+    def model_config(self, model_name: Union[Text, List] = None) -> Optional[Dict]:
+        raise NotImplementedError("model_config is not implemented")
+
+    def reserve_model_name(self, model_name: Text) -> Text:
+        """
+        Reserves a free name for a trained model, which
+        concurrent trainings cannot get as well
+        """
+        raise NotImplementedError("reserve_model_name is not implemented")
+
+    def persist_model(
+            self,
+            model_name: Text,
+            assets: Dict = None,
+            asset_sources: Dict = None,
+    ) -> Dict:
+        raise NotImplementedError("persist_model is not implemented")
+
+    def register_model(self, model_name: Text) -> NoReturn:
+        # called once a persisted model has been moved
+        # into the models dir
+        pass
+
+    def release_model(self, model_name: Text) -> NoReturn:
+        # called when a persisted model could not be
+        # moved into the models dir
+        pass
+
+    def delete_model(self, model_name: Text) -> NoReturn:
+        raise NotImplementedError("delete_model is not implemented")
+
+    def clear_cache(self) -> NoReturn:
+        pass
+
+    def get_model_path(self, model_name: Text) -> Text:
+        raise NotImplementedError("get_model_path is not implemented")
+
+    def model_digest(self, model_name: Text) -> Text:
+        raise NotImplementedError("model_digest is not implemented")
+
+    def export_records(
+            self,
+            record_type: Text,
+            batch_size: int = None,
+            fields: Optional[List[Text]] = None,
+            start_after: Optional[Text] = None,
+    ) -> Iterator[Text]:
+        """
+        Streams the catalog records of one of
+        BotStoreRecordType as NDJSON lines
+        """
+        raise NotImplementedError("export_records is not implemented")
+
+    def deploy_model(self) -> NoReturn:
+        raise NotImplementedError("deploy_model is not implemented")
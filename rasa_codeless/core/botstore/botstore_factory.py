@@ -0,0 +1,46 @@
+import logging
+from typing import Text, Optional
+
+from rasa_codeless.shared.constants import (
+    DEFAULT_BOTSTORE_BACKEND,
+    BotStoreBackend,
+)
+from rasa_codeless.shared.exceptions.botstore import InvalidBotStoreBackendException
+from rasa_codeless.core.botstore.botstore import BotStore
+from rasa_codeless.core.botstore.local_botstore import LocalBotStore
+
+logger = logging.getLogger(__name__)
+
+
+def create_botstore(
+        backend: Text = DEFAULT_BOTSTORE_BACKEND,
+        local_botstore: Optional[LocalBotStore] = None,
+) -> BotStore:
+    """
+    Creates the botstore of a backend
+
+    Args:
+        backend: one of BotStoreBackend.VALID_BACKENDS
+        local_botstore: local botstore to keep the models
+            in. a new one is created if not specified
+
+    Returns:
+        botstore of the backend
+    """
+    if backend not in BotStoreBackend.VALID_BACKENDS:
+        raise InvalidBotStoreBackendException(f"Invalid botstore backend: {backend}")
+
+    local_botstore = local_botstore if local_botstore else LocalBotStore()
+    if backend == BotStoreBackend.LOCAL:
+        return local_botstore
+
+    # imported lazily so that the local backend does
+    # not depend on pymongo
+    from rasa_codeless.core.botstore.mongodb_botstore import MongoDBBotStore
+    from rasa_codeless.core.botstore.write_through_botstore import WriteThroughBotStore
+
+    return WriteThroughBotStore(
+        local=local_botstore,
+        remote=MongoDBBotStore(),
+        remote_reads=backend == BotStoreBackend.MONGODB,
+    )
@@ -0,0 +1,258 @@
+import base64
+import json
+import logging
+import sqlite3
+from typing import Text, List, Dict, Optional, NoReturn, Tuple, Any
+
+from rasa_codeless.shared.constants import (
+    BOTSTORE_INDEX,
+    BOTSTORE_INDEX_TABLE,
+    BOTSTORE_INDEX_VERSION,
+    BOTSTORE_INDEX_BUSY_TIMEOUT,
+    BOTSTORE_PAGE_MAX_LIMIT,
+    BotStoreSortKey,
+)
+from rasa_codeless.shared.exceptions.botstore import (
+    BotStoreIndexException,
+    InvalidBotStoreQueryException,
+)
+from rasa_codeless.utils.model_names import model_timestamp_key
+from rasa_codeless.utils.sqlite import ThreadLocalConnection
+
+logger = logging.getLogger(__name__)
+
+# sort keys map to index columns, so that user
+# input never ends up in the query itself
+_SORT_COLUMNS = {
+    BotStoreSortKey.TIMESTAMP: "model_timestamp",
+    BotStoreSortKey.TRAIN_ACC: "train_acc",
+    BotStoreSortKey.TEST_ACC: "test_acc",
+    BotStoreSortKey.TRAIN_LOSS: "train_loss",
+    BotStoreSortKey.TEST_LOSS: "test_loss",
+    BotStoreSortKey.EPOCHS: "epochs",
+}
+_SCORE_KEYS = ["test_acc", "train_acc", "test_loss", "train_loss"]
+
+
+def encode_cursor(sort_by: Text, descending: bool, value: Any, model_id: Text) -> Text:
+    cursor = json.dumps([sort_by, descending, value, model_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(cursor.encode("utf8")).decode("ascii")
+
+
+def decode_cursor(cursor: Text, sort_by: Text, descending: bool) -> Tuple[Any, Text]:
+    """
+    Returns the sort value and model id of the last
+    model of the previous page
+
+    Raises:
+        InvalidBotStoreQueryException: if the cursor is
+            malformed or belongs to another sort order
+    """
+    try:
+        cursor_sort_by, cursor_descending, value, model_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf8")
+        )
+    except Exception as e:
+        raise InvalidBotStoreQueryException(f"Invalid cursor: {e}")
+
+    if cursor_sort_by != sort_by or cursor_descending != descending:
+        raise InvalidBotStoreQueryException("Cursor does not belong to the requested sort order")
+    return value, model_id
+
+
+class BotStoreIndex:
+    """
+    Summary of the scores of every botstore model,
+    holding the final train and test accuracy and
+    loss, the number of epochs and the timestamp of
+    each model. lets the botstore list, sort and
+    filter models without reading their event files
+    """
+
+    def __init__(self, index_path: Text = BOTSTORE_INDEX):
+        self.index_path = index_path
+
+        self._connections = ThreadLocalConnection(
+            database_path=self.index_path,
+            timeout=BOTSTORE_INDEX_BUSY_TIMEOUT,
+            on_connect=self._create_table,
+        )
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection) -> NoReturn:
+        with conn:
+            # indexes of an older version are rebuilt, the
+            # models are indexed again from their event files
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != BOTSTORE_INDEX_VERSION:
+                conn.execute(f"DROP TABLE IF EXISTS {BOTSTORE_INDEX_TABLE}")
+                conn.execute(f"PRAGMA user_version = {BOTSTORE_INDEX_VERSION}")
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {BOTSTORE_INDEX_TABLE} '
+                         f'(model_id TEXT PRIMARY KEY, '
+                         f'model_timestamp INT NOT NULL, '
+                         f'train_acc REAL, '
+                         f'test_acc REAL, '
+                         f'train_loss REAL, '
+                         f'test_loss REAL, '
+                         f'epochs INT);')
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def close(self) -> NoReturn:
+        self._connections.close()
+
+    @staticmethod
+    def _to_summary(row: sqlite3.Row) -> Dict:
+        # models without tensorboard results are listed
+        # with empty scores, as the botstore always did
+        summary = {"model_id": row["model_id"]}
+        for key in _SCORE_KEYS:
+            summary[key] = row[key] if row[key] is not None else ""
+        summary["epochs"] = row["epochs"] if row["epochs"] is not None else ""
+        return summary
+
+    def upsert(self, summary: Dict) -> bool:
+        """
+        Adds the summary of a model to the index, or
+        replaces it if the model is already indexed
+
+        Args:
+            summary: model_id, final scores and number of
+                epochs of the model. empty scores are
+                stored as missing
+        """
+        try:
+            values = [
+                summary[key] if summary.get(key) not in ["", None] else None
+                for key in _SCORE_KEYS + ["epochs"]
+            ]
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    f'INSERT OR REPLACE INTO {BOTSTORE_INDEX_TABLE} (model_id, model_timestamp, test_acc, '
+                    f'train_acc, test_loss, train_loss, epochs) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (summary["model_id"], model_timestamp_key(model_name=summary["model_id"]), *values)
+                )
+            return True
+        except Exception as e:
+            raise BotStoreIndexException(e)
+
+    def remove(self, model_ids: List[Text]) -> bool:
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    f"DELETE FROM {BOTSTORE_INDEX_TABLE} WHERE model_id = ?",
+                    [(model_id,) for model_id in model_ids]
+                )
+            return True
+        except Exception as e:
+            raise BotStoreIndexException(e)
+
+    def model_ids(self) -> List[Text]:
+        try:
+            conn = self._connection()
+            return [
+                row["model_id"] for row in
+                conn.execute(f"SELECT model_id FROM {BOTSTORE_INDEX_TABLE}").fetchall()
+            ]
+        except Exception as e:
+            raise BotStoreIndexException(e)
+
+    def get(self, model_id: Text) -> Optional[Dict]:
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                f"SELECT * FROM {BOTSTORE_INDEX_TABLE} WHERE model_id = ?",
+                (model_id,)
+            ).fetchone()
+            return self._to_summary(row) if row else None
+        except Exception as e:
+            raise BotStoreIndexException(e)
+
+    def query(
+            self,
+            sort_by: Text = BotStoreSortKey.TIMESTAMP,
+            descending: bool = True,
+            min_scores: Optional[Dict] = None,
+            max_scores: Optional[Dict] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[Text] = None,
+    ) -> Tuple[List[Dict], Optional[Text]]:
+        """
+        Lists the summaries of the indexed models. pages
+        are resolved on the index with a keyset cursor,
+        so only the requested page is read
+
+        Args:
+            sort_by: one of BotStoreSortKey.VALID_KEYS.
+                models without the score go last
+            descending: sort order
+            min_scores: lower bounds of scores, keyed by
+                score name, e.g. {"test_acc": 0.8}
+            max_scores: upper bounds of scores, keyed by
+                score name, e.g. {"test_loss": 0.5}
+            limit: maximum number of models to return
+            cursor: next_cursor of the previous page
+
+        Returns:
+            list of model summaries and the cursor of the
+                next page, which is None on the last page
+        """
+        try:
+            if sort_by not in _SORT_COLUMNS:
+                raise InvalidBotStoreQueryException(f"Invalid sort key: {sort_by}")
+            if limit is not None and not 0 < limit <= BOTSTORE_PAGE_MAX_LIMIT:
+                raise InvalidBotStoreQueryException(f"Limit should be between 1 and {BOTSTORE_PAGE_MAX_LIMIT}")
+
+            column = _SORT_COLUMNS[sort_by]
+            conditions, parameters = list(), list()
+            for bounds, operator in [(min_scores, ">="), (max_scores, "<=")]:
+                for key, bound in (bounds or dict()).items():
+                    if key not in _SORT_COLUMNS:
+                        raise InvalidBotStoreQueryException(f"Invalid score key: {key}")
+                    conditions.append(f"{_SORT_COLUMNS[key]} {operator} ?")
+                    parameters.append(bound)
+
+            # models come after the last model of the previous
+            # page in (missing score, score, model_id) order
+            comparison = "<" if descending else ">"
+            if cursor:
+                value, model_id = decode_cursor(cursor=cursor, sort_by=sort_by, descending=descending)
+                if value is None:
+                    conditions.append(f"({column} IS NULL AND model_id {comparison} ?)")
+                    parameters.append(model_id)
+                else:
+                    conditions.append(f"({column} IS NULL OR {column} {comparison} ? "
+                                      f"OR ({column} = ? AND model_id {comparison} ?))")
+                    parameters += [value, value, model_id]
+
+            direction = "DESC" if descending else "ASC"
+            where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+            limit_clause = ""
+            if limit is not None:
+                limit_clause = " LIMIT ?"
+                parameters.append(limit + 1)
+
+            conn = self._connection()
+            rows = conn.execute(
+                f"SELECT * FROM {BOTSTORE_INDEX_TABLE} {where}"
+                f"ORDER BY {column} IS NULL, {column} {direction}, model_id {direction}{limit_clause}",
+                parameters
+            ).fetchall()
+
+            next_cursor = None
+            if limit is not None and len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(
+                    sort_by=sort_by,
+                    descending=descending,
+                    value=rows[-1][column],
+                    model_id=rows[-1]["model_id"],
+                )
+            return [self._to_summary(row) for row in rows], next_cursor
+        except InvalidBotStoreQueryException:
+            raise
+        except Exception as e:
+            raise BotStoreIndexException(e)
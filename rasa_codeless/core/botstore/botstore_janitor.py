@@ -0,0 +1,103 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Text, NoReturn, Any, List
+from uuid import uuid4
+
+from rasa_codeless.shared.constants import (
+    BOTSTORE_TRASH_PATH,
+    BOTSTORE_GC_INTERVAL,
+    RASA_MODEL_EXTENSIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BotStoreJanitor:
+    """
+    Removes the botstore dirs of models which no longer
+    exist in the models dir, in a background thread.
+    garbage collection requests are coalesced and run
+    at most once per interval. orphaned dirs are moved
+    into a trash dir first, which is a cheap rename,
+    and deleted from there afterwards
+    """
+
+    def __init__(
+            self,
+            botstore: Any,
+            trash_path: Text = BOTSTORE_TRASH_PATH,
+            interval: float = BOTSTORE_GC_INTERVAL,
+    ):
+        self.botstore = botstore
+        self.trash_path = trash_path
+        self.interval = interval
+        self._requested = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_run = 0.0
+
+    def schedule(self) -> NoReturn:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="botstore-janitor", daemon=True)
+                self._thread.start()
+        self._requested.set()
+
+    def _run(self) -> NoReturn:
+        while True:
+            self._requested.wait()
+            time.sleep(max(0.0, self._last_run + self.interval - time.monotonic()))
+            self._requested.clear()
+            self._last_run = time.monotonic()
+            try:
+                self.collect()
+            except Exception as e:
+                logger.warning(f"Exception occurred while collecting botstore garbage. {e}")
+
+    def collect(self) -> List[Text]:
+        """
+        Moves orphaned botstore dirs into the trash and
+        empties the trash
+
+        Returns:
+            list of collected models
+        """
+        collected_models = list()
+        for model_name in self.botstore.orphaned_models():
+            self.botstore.registry.remove_botstore_model(model_name=model_name)
+            self.botstore.index.remove(model_ids=[model_name])
+            model_dir = os.path.join(self.botstore.botstore_path, model_name.replace(RASA_MODEL_EXTENSIONS[0], ""))
+            self._trash(model_dir=model_dir)
+            collected_models.append(model_name)
+            logger.debug(f"Collected orphaned botstore model {model_name}")
+        self.purge()
+        return collected_models
+
+    def _trash(self, model_dir: Text) -> NoReturn:
+        os.makedirs(self.trash_path, exist_ok=True)
+        try:
+            os.rename(model_dir, os.path.join(self.trash_path, f"{os.path.basename(model_dir)}.{uuid4().hex}"))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # the trash is on another filesystem
+            logger.debug(f"Could not move {model_dir} into the botstore trash. {e}")
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+    def purge(self) -> NoReturn:
+        if os.path.isdir(self.trash_path):
+            for trashed_dir in os.listdir(self.trash_path):
+                shutil.rmtree(os.path.join(self.trash_path, trashed_dir), ignore_errors=True)
+
+        # blobs are only unreferenced once the model dirs
+        # referring to them have been deleted
+        referenced_blobs = self.botstore.referenced_blobs()
+        if referenced_blobs is None:
+            logger.warning("Could not read the manifests of the botstore models. Botstore blobs are kept")
+            return
+        removed_blobs = self.botstore.blob_store.collect(referenced=referenced_blobs)
+        if removed_blobs:
+            logger.debug(f"Removed {removed_blobs} unreferenced botstore blobs")
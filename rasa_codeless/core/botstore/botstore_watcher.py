@@ -0,0 +1,145 @@
+import fnmatch
+import logging
+import os
+import re
+import threading
+from typing import Text, NoReturn, Any, Optional
+
+from rasa_codeless.shared.constants import (
+    BOTSTORE_WATCH_POLL_INTERVAL,
+    RASA_MODEL_EXTENSIONS,
+    RASA_BOTSTORE_DIR_REGEX,
+    TENSORBOARD_RESULTS_FILE_EXTENSION,
+)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+
+class _BotStoreEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "BotStoreWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_created(self, event) -> NoReturn:
+        self.watcher.path_added(path=event.src_path, is_directory=event.is_directory)
+
+    def on_deleted(self, event) -> NoReturn:
+        self.watcher.path_removed(path=event.src_path, is_directory=event.is_directory)
+
+    def on_moved(self, event) -> NoReturn:
+        self.watcher.path_removed(path=event.src_path, is_directory=event.is_directory)
+        self.watcher.path_added(path=event.dest_path, is_directory=event.is_directory)
+
+    def on_modified(self, event) -> NoReturn:
+        if not event.is_directory:
+            self.watcher.path_modified(path=event.src_path)
+
+
+class BotStoreWatcher:
+    """
+    Keeps the model registry and the botstore index of
+    a botstore in sync with models which are added to
+    or removed from the models dir and the botstore
+    outside the RASAC server. uses inotify through
+    watchdog if it is installed, or else polls the
+    modification times of the watched dirs
+    """
+
+    def __init__(self, botstore: Any, poll_interval: float = BOTSTORE_WATCH_POLL_INTERVAL):
+        self.botstore = botstore
+        self.poll_interval = poll_interval
+        self._observer = None
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def _is_parent(parent_path: Text, path: Text) -> bool:
+        return os.path.abspath(path).startswith(os.path.abspath(parent_path) + os.sep)
+
+    def _botstore_model(self, path: Text) -> Optional[Text]:
+        # name of the botstore model a path belongs to
+        relative_path = os.path.relpath(os.path.abspath(path), os.path.abspath(self.botstore.botstore_path))
+        model_dir = relative_path.split(os.sep)[0]
+        if re.match(RASA_BOTSTORE_DIR_REGEX, model_dir):
+            return model_dir + RASA_MODEL_EXTENSIONS[0]
+        return None
+
+    def path_added(self, path: Text, is_directory: bool) -> NoReturn:
+        if not is_directory and self._is_parent(self.botstore.models_path, path) \
+                and path.endswith(tuple(RASA_MODEL_EXTENSIONS)):
+            self.botstore.registry.add_model_file(model_name=os.path.basename(path))
+        elif is_directory and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.botstore.botstore_path):
+            model_name = self._botstore_model(path=path)
+            if model_name:
+                self.botstore.registry.add_botstore_model(model_name=model_name)
+
+    def path_removed(self, path: Text, is_directory: bool) -> NoReturn:
+        if self._is_parent(self.botstore.models_path, path) and path.endswith(tuple(RASA_MODEL_EXTENSIONS)):
+            self.botstore.registry.remove_model_file(model_name=os.path.basename(path))
+        elif os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.botstore.botstore_path):
+            model_name = self._botstore_model(path=path)
+            if model_name:
+                self.botstore.registry.remove_botstore_model(model_name=model_name)
+                self.botstore.index.remove(model_ids=[model_name])
+        elif self._is_parent(self.botstore.botstore_path, path):
+            self.path_modified(path=path)
+
+    def path_modified(self, path: Text) -> NoReturn:
+        # only changes of event files invalidate the scores
+        # of a model. the scalar cache detects them on its
+        # own, while the index entry has to be dropped
+        if not self._is_parent(self.botstore.botstore_path, path) \
+                or not fnmatch.fnmatch(os.path.basename(path), TENSORBOARD_RESULTS_FILE_EXTENSION):
+            return
+        model_name = self._botstore_model(path=path)
+        if model_name:
+            logger.debug(f"Tensorboard results of botstore model {model_name} changed")
+            self.botstore.index.remove(model_ids=[model_name])
+
+    def _poll(self) -> NoReturn:
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.botstore.registry.poll()
+            except Exception as e:
+                logger.warning(f"Exception occurred while polling the botstore. {e}")
+
+    def start(self) -> NoReturn:
+        for watched_path in [self.botstore.models_path, self.botstore.botstore_path]:
+            os.makedirs(watched_path, exist_ok=True)
+
+        # the registry is scanned once and then only
+        # updated from filesystem events
+        self.botstore.registry.refresh(force=True)
+        self._stopped.clear()
+
+        if Observer is not None:
+            self._observer = Observer()
+            event_handler = _BotStoreEventHandler(watcher=self)
+            self._observer.schedule(event_handler, self.botstore.models_path, recursive=True)
+            self._observer.schedule(event_handler, self.botstore.botstore_path, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+            logger.debug("Watching the botstore with watchdog")
+        else:
+            self._poll_thread = threading.Thread(target=self._poll, name="botstore-watcher", daemon=True)
+            self._poll_thread.start()
+            logger.debug(f"watchdog is not installed. Polling the botstore every {self.poll_interval}s")
+        self.botstore.registry.watched = True
+
+    def stop(self) -> NoReturn:
+        self.botstore.registry.watched = False
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._poll_thread is not None:
+            self._poll_thread.join()
+            self._poll_thread = None
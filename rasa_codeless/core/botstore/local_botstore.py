@@ -1,9 +1,10 @@
+import json
 import logging
 import os
 import re
-import shutil
-from datetime import datetime
-from typing import Text, List, NoReturn, Dict, Union, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Text, List, NoReturn, Dict, Union, Optional, Tuple, Set
 
 import yaml as pyyaml
 
@@ -12,86 +13,208 @@ from rasa_codeless.shared.constants import (
     DEFAULT_MODEL_PATH,
     DEFAULT_TENSORBOARD_LOGDIR,
     RASA_MODEL_EXTENSIONS,
-    RASA_MODEL_TIMESTAMP_PATTERN,
     DEFAULT_RASA_CONFIG_PATH,
+    BOTSTORE_MAX_WORKERS,
+    BOTSTORE_INDEX,
+    BOTSTORE_MODEL_DIGEST_FILE,
+    BOTSTORE_BLOBS_DIR,
+    BOTSTORE_MANIFEST_FILE,
+    RASA_BOTSTORE_DIR_REGEX,
+    DEFAULT_PERSIST_MODE,
+    BotStoreSortKey,
+    TensorboardDirectories,
+    TensorboardMetrics,
 )
 from rasa_codeless.shared.exceptions.botstore import (
     BotStoreRetrieveException,
     BotStorePersistException,
     BotStoreCacheException,
     BotStoreCleanupException,
+    BotStoreIndexException,
+    InvalidBotStoreQueryException,
 )
 from rasa_codeless.shared.exceptions.core import InvalidModelException
 from rasa_codeless.shared.exceptions.io import TensorboardScalarsException
 from rasa_codeless.utils.io import (
     persist_model_data,
-    get_valid_model_list,
-    get_latest_model_name,
-    get_existing_toplevel_file_list,
+    get_botstore_model_list,
+    get_available_model_name,
+    file_digest,
 )
+from rasa_codeless.utils.blob_store import BlobStore
 from rasa_codeless.utils.tensorboard import TensorBoardResults
 from rasa_codeless.core.curve_explainer import CurveExplainer
+from rasa_codeless.core.botstore.botstore import BotStore
+from rasa_codeless.core.botstore.botstore_index import BotStoreIndex
+from rasa_codeless.core.botstore.model_registry import ModelRegistry
+from rasa_codeless.core.botstore.botstore_janitor import BotStoreJanitor
 
 logger = logging.getLogger(__name__)
 
 
-class LocalBotStore:
+class LocalBotStore(BotStore):
     def __init__(
             self,
             botstore_path: Text = BOTSTORE_PATH,
             models_path: Text = DEFAULT_MODEL_PATH,
             logdir: Text = DEFAULT_TENSORBOARD_LOGDIR,
+            max_workers: int = BOTSTORE_MAX_WORKERS,
+            index_path: Text = BOTSTORE_INDEX,
+            persist_mode: Text = DEFAULT_PERSIST_MODE,
     ):
         self.botstore_path = botstore_path
         self.models_path = models_path
         self.logdir = logdir
+        self.max_workers = max_workers
+        self.persist_mode = persist_mode
         self.tensorboard_results = TensorBoardResults(logdir=logdir)
         self.curve_explainer = CurveExplainer()
+        self.index = BotStoreIndex(index_path=index_path)
+        self.registry = ModelRegistry(botstore_path=botstore_path, models_path=models_path)
+        self.blob_store = BlobStore(blobs_path=os.path.join(botstore_path, BOTSTORE_BLOBS_DIR))
+        self.janitor = BotStoreJanitor(botstore=self)
+        self._promoting_models = set()
+        self._promoting_lock = threading.Lock()
 
     def get_models(self, latest_only: bool = False) -> Union[List, Text]:
         try:
-            valid_models = get_valid_model_list(
-                botstore_path=self.botstore_path,
-                models_path=self.models_path
-            )
             if latest_only:
-                return get_latest_model_name(models_path=valid_models)
+                return self.registry.latest()
             else:
-                return valid_models
+                return self.registry.models()
         except Exception as e:
             logger.error("Exception occurred while retrieving botstore models")
             raise BotStoreRetrieveException(e)
 
-    def persist_model(self, model_name: Text, assets: Dict = None) -> NoReturn:
+    def reserve_model_name(self, model_name: Text) -> Text:
+        """
+        Reserves a free name for a trained model by
+        creating its botstore dir, which is kept from
+        the janitor until the model is registered or
+        released
+
+        Args:
+            model_name: name the model was trained under
+
+        Returns:
+            reserved model name
+        """
+        try:
+            with self._promoting_lock:
+                reserved_model_name = get_available_model_name(
+                    model_name=model_name,
+                    models_path=self.models_path,
+                    botstore_path=self.botstore_path,
+                    reserve=True,
+                )
+                self._promoting_models.add(reserved_model_name)
+            return reserved_model_name
+        except Exception as e:
+            logger.error("Exception occurred while reserving a model name")
+            raise BotStorePersistException(e)
+
+    def persist_model(
+            self,
+            model_name: Text,
+            assets: Dict = None,
+            asset_sources: Dict = None,
+    ) -> Dict:
+        # until the model is registered, its botstore
+        # dir must not be mistaken for an orphan
+        with self._promoting_lock:
+            self._promoting_models.add(model_name)
         try:
-            persist_model_data(
+            persist_report = persist_model_data(
                 model_name=model_name,
                 botstore_path=self.botstore_path,
-                assets=assets if assets else dict()
+                assets=assets if assets else dict(),
+                asset_sources=asset_sources if asset_sources else dict(),
+                blob_store=self.blob_store,
+                persist_mode=self.persist_mode,
             )
+            logger.debug(f"Persisted model {model_name} in {self.persist_mode} mode. "
+                         f"Files placed: {persist_report['files']}. Blobs stored: {persist_report['blobs']}")
         except Exception as e:
             logger.error("Exception occurred while retrieving botstore models")
+            self.release_model(model_name=model_name)
             raise BotStorePersistException(e)
 
+        self.registry.add_botstore_model(model_name=model_name)
+        try:
+            self._index_models(botstore_models=[model_name])
+        except BotStoreIndexException as e:
+            # the model gets indexed on the next listing
+            logger.warning(f"Could not index botstore model {model_name}. {e}")
+        return persist_report
+
+    def register_model(self, model_name: Text) -> NoReturn:
+        # called once a model has been moved into the models dir
+        self.registry.add_model_file(model_name=model_name)
+        self.release_model(model_name=model_name)
+        try:
+            # computed ahead of the first download
+            self.model_digest(model_name=model_name)
+        except BotStoreRetrieveException as e:
+            logger.warning(f"Could not compute the digest of model {model_name}. {e}")
+
+    def release_model(self, model_name: Text) -> NoReturn:
+        with self._promoting_lock:
+            self._promoting_models.discard(model_name)
+
+    def orphaned_models(self) -> List:
+        """
+        Returns the botstore models whose model is no
+        longer in the models dir. models which are being
+        promoted into the models dir are left out
+        """
+        # the dirs are listed first, since a model name is
+        # reserved by creating its dir, and a promoted model
+        # is registered before it is released. a dir listed
+        # here is thus in one of the later snapshots unless
+        # it is orphaned
+        botstore_models = get_botstore_model_list(botstore_path=self.botstore_path)
+        with self._promoting_lock:
+            promoting_models = set(self._promoting_models)
+        valid_models = set(self.registry.models())
+        return [
+            model for model in botstore_models
+            if model not in valid_models and model not in promoting_models
+        ]
+
+    def referenced_blobs(self) -> Optional[Set[Text]]:
+        """
+        Returns the digests of the blobs listed in the
+        manifests of the botstore model dirs, or None if
+        a manifest could not be read, since its blobs
+        would then be mistaken for garbage
+        """
+        referenced = set()
+        try:
+            botstore_dirs = os.listdir(self.botstore_path)
+        except FileNotFoundError:
+            return referenced
+
+        for botstore_dir in botstore_dirs:
+            if not re.match(RASA_BOTSTORE_DIR_REGEX, botstore_dir):
+                continue
+            manifest_path = os.path.join(self.botstore_path, botstore_dir, BOTSTORE_MANIFEST_FILE)
+            try:
+                with open(manifest_path, mode="r", encoding="utf8") as manifest_file:
+                    referenced.update(json.load(manifest_file)["files"].values())
+            except FileNotFoundError:
+                # models persisted without the blob store, or
+                # deleted while the manifests are read
+                continue
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                logger.warning(f"Could not read botstore manifest {manifest_path}. {e}")
+                return None
+        return referenced
+
     def clear_cache(self) -> NoReturn:
         try:
-            all_botstore_models = [
-                model + RASA_MODEL_EXTENSIONS[0]
-                for model in get_existing_toplevel_file_list(dir_path=self.botstore_path)
-            ]
-            valid_models = get_valid_model_list(
-                botstore_path=self.botstore_path,
-                models_path=self.models_path
-            )
-            invalid_model_caches = [
-                re.sub(RASA_MODEL_EXTENSIONS[0], "", dir_)
-                for dir_
-                in list(set(all_botstore_models).difference(set(valid_models)))
-            ]
-            logger.debug(f"Invalid model caches found: {invalid_model_caches}")
-            for cache_dir in invalid_model_caches:
-                shutil.rmtree(os.path.join(self.botstore_path, cache_dir))
-                logger.debug(f"Deleted invalid model cache {cache_dir}")
+            # orphaned model caches are removed by the
+            # janitor, off the request path
+            self.janitor.schedule()
         except Exception as e:
             logger.error("Exception occurred while clearing botstore cache")
             raise BotStoreCacheException(e)
@@ -99,48 +222,93 @@ class LocalBotStore:
     def delete_model(self, model_name: Text) -> NoReturn:
         try:
             os.remove(path=os.path.join(self.models_path, model_name))
+            self.registry.remove_model_file(model_name=model_name)
         except Exception as e:
             raise BotStoreCleanupException(e)
 
-    def get_model_path(self, model_name: Text) -> NoReturn:
+    def get_model_path(self, model_name: Text) -> Text:
         return os.path.join(os.getcwd(), self.models_path, f"{model_name}")
 
-    def deploy_model(self) -> NoReturn:
-        raise NotImplementedError("deploy_model is not implemented")
+    def model_digest(self, model_name: Text) -> Text:
+        """
+        Returns the sha256 digest of a model. the digest
+        is stored in the botstore dir of the model and
+        only recomputed when the size or modification
+        time of the model changes
+
+        Args:
+            model_name: name of the model
+
+        Returns:
+            sha256 hex digest of the model
+        """
+        try:
+            model_stat = os.stat(os.path.join(self.models_path, model_name))
+            digest_path = os.path.join(
+                self.botstore_path,
+                model_name.replace(RASA_MODEL_EXTENSIONS[0], ""),
+                BOTSTORE_MODEL_DIGEST_FILE
+            )
+            try:
+                with open(digest_path, mode="r", encoding="utf8") as digest_file:
+                    stored_digest = json.load(digest_file)
+                if stored_digest.get("size") == model_stat.st_size \
+                        and stored_digest.get("mtime_ns") == model_stat.st_mtime_ns:
+                    return stored_digest["sha256"]
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass
+
+            digest = file_digest(file_path=os.path.join(self.models_path, model_name))
+            try:
+                with open(digest_path, mode="w", encoding="utf8") as digest_file:
+                    json.dump({
+                        "size": model_stat.st_size,
+                        "mtime_ns": model_stat.st_mtime_ns,
+                        "sha256": digest,
+                    }, digest_file)
+            except OSError as e:
+                logger.debug(f"Could not store the digest of model {model_name}. {e}")
+            return digest
+        except Exception as e:
+            logger.error("Exception occurred while computing the model digest")
+            raise BotStoreRetrieveException(e)
 
     def model_exists(self, model_name: Text) -> bool:
-        valid_models = self.get_models()
-        if model_name in valid_models:
-            return True
-        else:
-            return False
-
-    @staticmethod
-    def _sort_model_scores(scores: List) -> List:
+        return self.registry.contains(model_name=model_name)
+
+    def _sort_model_scores(self, scores: List) -> List:
         return sorted(
             scores,
-            key=lambda x: datetime.strptime(x['model_id'], RASA_MODEL_TIMESTAMP_PATTERN), reverse=True
+            key=lambda x: self.registry.timestamp(model_name=x['model_id']) or 0, reverse=True
         )
 
     def _model_scores_dict(self, botstore_model: Text, curve: bool) -> Union[Dict, List]:
         try:
-            test_acc = self.tensorboard_results.validation_acc(
-                botstore_model=os.path.join(self.botstore_path, botstore_model)
-            )[0]
-            train_acc = self.tensorboard_results.training_acc(
+            # reading every event file of the model once
+            scalars = self.tensorboard_results.read_scalars(
                 botstore_model=os.path.join(self.botstore_path, botstore_model)
+            )
+            test_acc = self.tensorboard_results.get_scores(
+                scalars=scalars,
+                results_dir=TensorboardDirectories.VALIDATION,
+                metric=TensorboardMetrics.ACCURACY,
             )[0]
-            test_loss = self.tensorboard_results.validation_loss(
-                botstore_model=os.path.join(self.botstore_path, botstore_model)
+            train_acc = self.tensorboard_results.get_scores(
+                scalars=scalars,
+                results_dir=TensorboardDirectories.TRAIN,
+                metric=TensorboardMetrics.ACCURACY,
             )[0]
-            train_loss = self.tensorboard_results.training_loss(
-                botstore_model=os.path.join(self.botstore_path, botstore_model)
+            test_loss = self.tensorboard_results.get_scores(
+                scalars=scalars,
+                results_dir=TensorboardDirectories.VALIDATION,
+                metric=TensorboardMetrics.LOSS,
             )[0]
-            epochs = self.tensorboard_results.generate_epoch_list(
-                total_epochs=self.tensorboard_results.training_loss(
-                    botstore_model=os.path.join(self.botstore_path, botstore_model)
-                )[1]
+            train_loss, train_epochs = self.tensorboard_results.get_scores(
+                scalars=scalars,
+                results_dir=TensorboardDirectories.TRAIN,
+                metric=TensorboardMetrics.LOSS,
             )
+            epochs = self.tensorboard_results.generate_epoch_list(total_epochs=train_epochs)
 
             if curve:
                 return {
@@ -181,6 +349,90 @@ class LocalBotStore:
                     "epochs": "",
                 }
 
+    def _model_scores_dict_list(self, botstore_models: List, curve: bool) -> List:
+        # scores are extracted concurrently since reading
+        # the event files of a model mostly waits on the
+        # disk. results keep the order of the models
+        if len(botstore_models) <= 1 or self.max_workers <= 1:
+            return [self._model_scores_dict(botstore_model=model, curve=curve) for model in botstore_models]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(botstore_models))) as executor:
+            return list(executor.map(
+                lambda model: self._model_scores_dict(botstore_model=model, curve=curve),
+                botstore_models
+            ))
+
+    def _index_models(self, botstore_models: List) -> NoReturn:
+        for model_scores in self._model_scores_dict_list(botstore_models=botstore_models, curve=False):
+            epochs = model_scores["epochs"]
+            self.index.upsert(summary={
+                **model_scores,
+                "epochs": len(epochs) if isinstance(epochs, List) else epochs,
+            })
+
+    def _sync_index(self, valid_models: List) -> NoReturn:
+        # drops models which no longer exist and indexes
+        # the ones which were not persisted through the
+        # botstore, e.g. models from older versions
+        indexed_models = set(self.index.model_ids())
+        stale_models = list(indexed_models.difference(valid_models))
+        if stale_models:
+            self.index.remove(model_ids=stale_models)
+        missing_models = [model for model in valid_models if model not in indexed_models]
+        if missing_models:
+            logger.debug(f"Indexing botstore models: {missing_models}")
+            self._index_models(botstore_models=missing_models)
+
+    def model_summaries(
+            self,
+            sort_by: Text = BotStoreSortKey.TIMESTAMP,
+            descending: bool = True,
+            min_scores: Optional[Dict] = None,
+            max_scores: Optional[Dict] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[Text] = None,
+    ) -> Tuple[List, Optional[Text]]:
+        """
+        Lists the final scores of the valid botstore
+        models from the botstore index
+
+        Args:
+            sort_by: one of BotStoreSortKey.VALID_KEYS
+            descending: sort order
+            min_scores: lower bounds of scores, keyed by
+                score name
+            max_scores: upper bounds of scores, keyed by
+                score name
+            limit: maximum number of models to return
+            cursor: next_cursor of the previous page
+
+        Returns:
+            list of model scores, in the same format as
+                model_performance with curve disabled,
+                and the cursor of the next page
+        """
+        try:
+            self._sync_index(valid_models=self.get_models())
+            model_summaries, next_cursor = self.index.query(
+                sort_by=sort_by,
+                descending=descending,
+                min_scores=min_scores,
+                max_scores=max_scores,
+                limit=limit,
+                cursor=cursor,
+            )
+            for model_summary in model_summaries:
+                if model_summary["epochs"] != "":
+                    model_summary["epochs"] = self.tensorboard_results.generate_epoch_list(
+                        total_epochs=model_summary["epochs"]
+                    )
+            return model_summaries, next_cursor
+        except InvalidBotStoreQueryException:
+            raise
+        except Exception as e:
+            logger.error("Exception occurred while retrieving model summaries")
+            raise BotStoreRetrieveException(e)
+
     def model_performance(
             self,
             model_name: Union[Text, List] = None,
@@ -188,26 +440,28 @@ class LocalBotStore:
             sort: bool = False,
     ) -> Union[Dict, List]:
         try:
-            valid_models = self.get_models()
-
             if isinstance(model_name, Text):
-                if model_name not in valid_models:
+                if not self.registry.contains(model_name=model_name):
                     raise InvalidModelException()
 
                 return self._model_scores_dict(botstore_model=model_name, curve=curve)
 
             elif isinstance(model_name, List):
-                model_score_list = list()
                 for model in model_name:
-                    if model not in valid_models:
+                    if not self.registry.contains(model_name=model):
                         raise InvalidModelException()
 
-                    model_score_list.append(self._model_scores_dict(botstore_model=model, curve=curve))
+                model_score_list = self._model_scores_dict_list(botstore_models=model_name, curve=curve)
                 return model_score_list if not sort else self._sort_model_scores(model_score_list)
+            elif not curve:
+                # final scores are served from the botstore index
+                model_summaries = self.model_summaries()[0]
+                if sort:
+                    return model_summaries
+                model_positions = {model: position for position, model in enumerate(self.get_models())}
+                return sorted(model_summaries, key=lambda x: model_positions[x["model_id"]])
             else:
-                all_model_score_list = list()
-                for model in valid_models:
-                    all_model_score_list.append(self._model_scores_dict(botstore_model=model, curve=curve))
+                all_model_score_list = self._model_scores_dict_list(botstore_models=self.get_models(), curve=curve)
                 return all_model_score_list if not sort else self._sort_model_scores(all_model_score_list)
         except Exception as e:
             logger.error("Exception occurred while retrieving model scores")
@@ -233,10 +487,8 @@ class LocalBotStore:
             model_name: Union[Text, List] = None
     ) -> Optional[Dict]:
         try:
-            valid_models = self.get_models()
-
             if isinstance(model_name, Text):
-                if model_name not in valid_models:
+                if not self.registry.contains(model_name=model_name):
                     raise InvalidModelException()
 
                 return {
@@ -0,0 +1,175 @@
+import bisect
+import logging
+import os
+import re
+import threading
+from typing import Text, List, Dict, Set, NoReturn, Optional, Tuple
+
+from rasa_codeless.shared.constants import (
+    BOTSTORE_PATH,
+    DEFAULT_MODEL_PATH,
+    RASA_MODEL_EXTENSIONS,
+    RASA_BOTSTORE_DIR_REGEX,
+)
+from rasa_codeless.utils.model_names import model_timestamp_key
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    In-process registry of the models in the models
+    dir and the botstore. a model is valid when it
+    is in both. the registry is updated by the code
+    paths which add or delete models, and rescans a
+    dir only when its modification time has changed,
+    e.g. when a model was copied in by hand. valid
+    models are kept sorted by their timestamp keys,
+    which are parsed once when a model is registered
+    """
+
+    def __init__(
+            self,
+            botstore_path: Text = BOTSTORE_PATH,
+            models_path: Text = DEFAULT_MODEL_PATH,
+    ):
+        self.botstore_path = botstore_path
+        self.models_path = models_path
+        self._lock = threading.RLock()
+        self._model_files: Set[Text] = set()
+        self._botstore_models: Set[Text] = set()
+        self._valid_models: Dict[Text, int] = dict()
+        self._ordered_models: List[Tuple[int, Text]] = list()
+        self._models_mtimes: Dict[Text, int] = dict()
+        self._botstore_mtime = None
+        self._scanned = False
+
+        # set while a botstore watcher keeps the registry
+        # current, so requests never have to stat the dirs
+        self.watched = False
+
+    @staticmethod
+    def _mtime(dir_path: Text):
+        try:
+            return os.stat(dir_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _scan_model_files(self) -> NoReturn:
+        # models can be nested in subdirs of the models
+        # dir, so the mtime of every subdir is tracked
+        model_files, models_mtimes = set(), dict()
+        for dir_path, _, file_names in os.walk(self.models_path):
+            models_mtimes[dir_path] = self._mtime(dir_path)
+            model_files.update(
+                file_name for file_name in file_names if file_name.endswith(tuple(RASA_MODEL_EXTENSIONS))
+            )
+        self._model_files = model_files
+        self._models_mtimes = models_mtimes
+
+    def _scan_botstore(self) -> NoReturn:
+        self._botstore_mtime = self._mtime(self.botstore_path)
+        try:
+            botstore_dirs = os.listdir(self.botstore_path)
+        except FileNotFoundError:
+            botstore_dirs = list()
+        self._botstore_models = {
+            dir_ + RASA_MODEL_EXTENSIONS[0] for dir_ in botstore_dirs if re.match(RASA_BOTSTORE_DIR_REGEX, dir_)
+        }
+
+    def _update_valid_models(self) -> NoReturn:
+        self._valid_models = dict()
+        for model_name in self._model_files.intersection(self._botstore_models):
+            timestamp = model_timestamp_key(model_name=model_name)
+            if timestamp is not None:
+                self._valid_models[model_name] = timestamp
+        self._ordered_models = sorted((timestamp, model_name) for model_name, timestamp in self._valid_models.items())
+
+    def _add_valid_model(self, model_name: Text) -> NoReturn:
+        if model_name in self._valid_models:
+            return
+        timestamp = model_timestamp_key(model_name=model_name)
+        if timestamp is not None:
+            self._valid_models[model_name] = timestamp
+            bisect.insort(self._ordered_models, (timestamp, model_name))
+
+    def _remove_valid_model(self, model_name: Text) -> NoReturn:
+        timestamp = self._valid_models.pop(model_name, None)
+        if timestamp is not None:
+            position = bisect.bisect_left(self._ordered_models, (timestamp, model_name))
+            del self._ordered_models[position]
+
+    def _models_changed(self) -> bool:
+        if not self._models_mtimes:
+            return self._mtime(self.models_path) is not None
+        return any(self._mtime(dir_path) != mtime for dir_path, mtime in self._models_mtimes.items())
+
+    def refresh(self, force: bool = False) -> NoReturn:
+        """
+        Rescans the models dir and the botstore if they
+        were modified since they were last scanned. does
+        nothing while a watcher keeps the registry current
+
+        Args:
+            force: rescan both dirs regardless of their
+                modification times
+        """
+        if self.watched and self._scanned and not force:
+            return
+        self.poll(force=force)
+
+    def poll(self, force: bool = False) -> NoReturn:
+        with self._lock:
+            changed = False
+            if force or not self._scanned or self._models_changed():
+                self._scan_model_files()
+                changed = True
+            if force or not self._scanned or self._mtime(self.botstore_path) != self._botstore_mtime:
+                self._scan_botstore()
+                changed = True
+            if changed:
+                self._update_valid_models()
+                logger.debug(f"Model registry was refreshed. {len(self._valid_models)} valid models found")
+            self._scanned = True
+
+    def models(self) -> List[Text]:
+        """
+        Returns the valid models, latest first
+        """
+        self.refresh()
+        with self._lock:
+            return [model_name for _, model_name in reversed(self._ordered_models)]
+
+    def latest(self) -> Optional[Text]:
+        self.refresh()
+        with self._lock:
+            return self._ordered_models[-1][1] if self._ordered_models else None
+
+    def contains(self, model_name: Text) -> bool:
+        self.refresh()
+        return model_name in self._valid_models
+
+    def timestamp(self, model_name: Text) -> Optional[int]:
+        return self._valid_models.get(model_name)
+
+    def add_model_file(self, model_name: Text) -> NoReturn:
+        with self._lock:
+            self._model_files.add(model_name)
+            if model_name in self._botstore_models:
+                self._add_valid_model(model_name=model_name)
+
+    def remove_model_file(self, model_name: Text) -> NoReturn:
+        with self._lock:
+            self._model_files.discard(model_name)
+            self._remove_valid_model(model_name=model_name)
+
+    def add_botstore_model(self, model_name: Text) -> NoReturn:
+        with self._lock:
+            self._botstore_models.add(model_name)
+            if model_name in self._model_files:
+                self._add_valid_model(model_name=model_name)
+
+    def remove_botstore_model(self, model_name: Text) -> NoReturn:
+        with self._lock:
+            self._botstore_models.discard(model_name)
+            self._remove_valid_model(model_name=model_name)
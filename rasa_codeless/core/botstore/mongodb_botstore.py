@@ -1,9 +1,14 @@
+import atexit
 import logging
 import os
-from typing import Text, List, NoReturn
+import threading
+from itertools import islice
+from typing import Text, List, Dict, NoReturn, Optional, Iterator, Union, Tuple
 
 from bson import json_util
 import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 
 from rasa_codeless.shared.constants import (
     MODEL_ID_TAG,
@@ -13,6 +18,18 @@ from rasa_codeless.shared.constants import (
     TRAIN_LOSS_TAG,
     VALIDATION_LOSS_TAG,
     CONFIG_TAG,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_CONNECT_TIMEOUT_MS,
+    MONGODB_SOCKET_TIMEOUT_MS,
+    MONGODB_BULK_BATCH_SIZE,
+    MONGODB_READ_BATCH_SIZE,
+    MONGODB_TENSORBOARD_FIELDS,
+    MONGODB_DUPLICATE_KEY_ERROR_CODE,
+    BOTSTORE_PAGE_MAX_LIMIT,
+    BotStoreSortKey,
+    BotStoreRecordType,
 )
 from rasa_codeless.shared.exceptions.botstore import (
     MongoDBBotStoreCredentialsException,
@@ -20,12 +37,112 @@ from rasa_codeless.shared.exceptions.botstore import (
     MongoDBBotStoreInsertException,
     MongoDBBotStoreUpdateException,
     MongoDBBotSoreReadException,
+    BotStoreRetrieveException,
+    BotStoreCleanupException,
+    InvalidBotStoreQueryException,
 )
+from rasa_codeless.shared.exceptions.core import InvalidModelException
+from rasa_codeless.core.botstore.botstore import BotStore
+from rasa_codeless.core.botstore.botstore_index import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
+# clients are shared by every botstore of the process,
+# keyed by cluster url, since each client holds its
+# own connection pool and topology monitor. a client
+# created before a fork is not reused by the child
+_clients: Dict[Text, pymongo.MongoClient] = dict()
+_clients_pid = os.getpid()
+_clients_lock = threading.Lock()
+
+# collections whose model_id index was ensured by
+# this process, keyed by cluster url, instance and
+# collection name
+_indexed_collections = set()
+_indexes_lock = threading.Lock()
+
+# tensorboard records map to the score keys of the
+# local botstore
+_SCORE_TAGS = {
+    "test_acc": VALIDATION_ACCURACY_TAG,
+    "train_acc": TRAIN_ACCURACY_TAG,
+    "test_loss": VALIDATION_LOSS_TAG,
+    "train_loss": TRAIN_LOSS_TAG,
+}
+
+# fetches only the final value of each curve
+_SUMMARY_PROJECTION = {EPOCHS_TAG: 1, **{tag: {'$slice': -1} for tag in _SCORE_TAGS.values()}}
+
+# final scores of each model, denormalized into its
+# configuration record so that model summaries are
+# filtered, sorted and paged by MongoDB
+_SUMMARY_FIELDS = {key: f"final_{key}" for key in BotStoreSortKey.SCORE_KEYS}
+
+
+def _env_int(name: Text, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}. Using the default value {default}")
+        return default
+
+
+def get_client(cluster_url: Text) -> pymongo.MongoClient:
+    """
+    Returns the process-wide client of a cluster,
+    creating it on first use. pool sizes and timeouts
+    can be overridden with the MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE, MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_CONNECT_TIMEOUT_MS and MONGODB_SOCKET_TIMEOUT_MS
+    environment variables
+    """
+    global _clients_pid
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+
+        client = _clients.get(cluster_url)
+        if client is None:
+            client = pymongo.MongoClient(
+                cluster_url,
+                maxPoolSize=_env_int("MONGODB_MAX_POOL_SIZE", MONGODB_MAX_POOL_SIZE),
+                minPoolSize=_env_int("MONGODB_MIN_POOL_SIZE", MONGODB_MIN_POOL_SIZE),
+                serverSelectionTimeoutMS=_env_int(
+                    "MONGODB_SERVER_SELECTION_TIMEOUT_MS", MONGODB_SERVER_SELECTION_TIMEOUT_MS
+                ),
+                connectTimeoutMS=_env_int("MONGODB_CONNECT_TIMEOUT_MS", MONGODB_CONNECT_TIMEOUT_MS),
+                socketTimeoutMS=_env_int("MONGODB_SOCKET_TIMEOUT_MS", MONGODB_SOCKET_TIMEOUT_MS),
+                connect=False,
+            )
+            _clients[cluster_url] = client
+        return client
+
+
+def close_clients() -> NoReturn:
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Could not close MongoDB client. {e}")
+        _clients.clear()
+
+
+atexit.register(close_clients)
+
+
+class MongoDBBotStore(BotStore):
+    """
+    Botstore catalog kept in MongoDB, holding the
+    tensorboard scores and the config of each model,
+    keyed by model_id. the model files themselves are
+    not stored, so models cannot be persisted into or
+    downloaded from it
+    """
+
+    supports_records = True
 
-class MongoDBBotStore:
     def __init__(self):
         try:
             self.cluster_url = f"mongodb+srv://{os.environ.get('MONGODB_USERNAME')}:" \
@@ -44,23 +161,100 @@ class MongoDBBotStore:
 
     def get_collection(self, collection: Text) -> pymongo.collection.Collection:
         try:
-            client = pymongo.MongoClient(self.cluster_url, maxPoolSize=50, connect=False)
-            db = pymongo.database.Database(client, self.instance)
-            coll = pymongo.collection.Collection(db, collection)
-            return coll
+            client = get_client(cluster_url=self.cluster_url)
+            coll = client[self.instance][collection]
         except Exception as e:
             logger.error("Exception occurred while obtaining the BotStore collection")
             raise MongoDBBotStoreCollectionException(e)
 
-    def check_model_existence(self, model_name: Text) -> bool:
-        collection = self.get_collection(self.configuration_collection)
-        cur = collection.find({MODEL_ID_TAG: model_name})
-        list_cur = list(cur)
-        if len(list_cur) == 0:
-            return False
-        else:
+        if collection in [self.tensorboard_collection, self.configuration_collection]:
+            self.ensure_index(collection=coll)
+        return coll
+
+    def ensure_index(self, collection: pymongo.collection.Collection) -> bool:
+        """
+        Creates the unique model_id index of a record
+        collection, and the final score indexes of the
+        configuration collection, once per process. a
+        collection which already holds duplicated model_ids
+        keeps working without the unique index. indexes
+        which could not be created are retried on the next
+        call
+
+        Returns:
+            whether the indexes of the collection are ensured
+        """
+        index_key = (self.cluster_url, self.instance, collection.name)
+        if index_key in _indexed_collections:
             return True
 
+        with _indexes_lock:
+            if index_key in _indexed_collections:
+                return True
+
+            ensured = True
+            try:
+                collection.create_index([(MODEL_ID_TAG, pymongo.ASCENDING)], unique=True)
+            except OperationFailure as e:
+                # retrying does not help until the duplicated
+                # records are removed
+                if e.code != MONGODB_DUPLICATE_KEY_ERROR_CODE:
+                    ensured = False
+                logger.warning(f"Could not create the {MODEL_ID_TAG} index of {collection.name}. {e}")
+            except Exception as e:
+                ensured = False
+                logger.warning(f"Could not create the {MODEL_ID_TAG} index of {collection.name}. {e}")
+            if collection.name == self.configuration_collection:
+                # model summaries are sorted by a final score
+                # and then by model_id
+                for field in _SUMMARY_FIELDS.values():
+                    try:
+                        collection.create_index([(field, pymongo.ASCENDING), (MODEL_ID_TAG, pymongo.ASCENDING)])
+                    except Exception as e:
+                        ensured = False
+                        logger.warning(f"Could not create the {field} index of {collection.name}. {e}")
+            if ensured:
+                _indexed_collections.add(index_key)
+            return ensured
+
+    def ensure_indexes(self) -> bool:
+        """
+        Creates the indexes of the record collections up
+        front, instead of on their first use
+
+        Returns:
+            whether the indexes of both collections are
+                ensured
+        """
+        try:
+            client = get_client(cluster_url=self.cluster_url)
+            return all([
+                self.ensure_index(collection=client[self.instance][collection_name])
+                for collection_name in [self.tensorboard_collection, self.configuration_collection]
+            ])
+        except Exception as e:
+            logger.error("Exception occurred while obtaining the BotStore collection")
+            raise MongoDBBotStoreCollectionException(e)
+
+    @staticmethod
+    def _projection(fields: Optional[Union[List[Text], Dict]]) -> Optional[Dict]:
+        # records are always returned with their model_id
+        if fields is None:
+            return None
+        projection = dict(fields) if isinstance(fields, Dict) else {field: 1 for field in fields}
+        projection.update({MODEL_ID_TAG: 1, '_id': 0})
+        return projection
+
+    def check_model_existence(self, model_name: Text) -> bool:
+        try:
+            collection = self.get_collection(self.configuration_collection)
+            return collection.find_one({MODEL_ID_TAG: model_name}, projection={'_id': 1}) is not None
+        except MongoDBBotStoreCollectionException:
+            raise
+        except Exception as e:
+            logger.error(f"Exception occurred while checking the existence of model {model_name}. {e}")
+            raise MongoDBBotSoreReadException()
+
     def insert_tensorboard_record(
             self,
             model_id: Text,
@@ -120,6 +314,9 @@ class MongoDBBotStore:
                 }
             }
             collection.update_one(query_, values_, upsert=upsert)
+            self.get_collection(self.configuration_collection).update_one(
+                query_, {'$set': self._summary_values(values_['$set'])}, upsert=upsert
+            )
         except Exception as e:
             logger.error(f"Exception occurred while updating tensorboard record in BotStore. {e}")
             raise MongoDBBotStoreUpdateException()
@@ -139,11 +336,147 @@ class MongoDBBotStore:
             logger.error(f"Exception occurred while updating configuration record in BotStore. {e}")
             raise MongoDBBotStoreUpdateException()
 
-    def get_model_curve_data(self, model_id: Text, bson_output: bool = True):
+    def _bulk_upsert(
+            self,
+            collection_name: Text,
+            model_ids: List[Text],
+            operations: List[UpdateOne],
+            batch_size: int,
+            report: Dict,
+    ) -> NoReturn:
+        collection = self.get_collection(collection_name)
+        collection_report = report[collection_name] = {"matched": 0, "modified": 0, "upserted": 0, "failed": 0}
+
+        for start in range(0, len(operations), batch_size):
+            batch_ids = model_ids[start:start + batch_size]
+            try:
+                # unordered batches keep going past failed
+                # documents, which are reported by index
+                result = collection.bulk_write(operations[start:start + batch_size], ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                for write_error in details.get("writeErrors", list()):
+                    report["errors"].append({
+                        MODEL_ID_TAG: batch_ids[write_error["index"]],
+                        "collection": collection_name,
+                        "code": write_error.get("code"),
+                        "message": write_error.get("errmsg"),
+                    })
+                for write_concern_error in details.get("writeConcernErrors", list()):
+                    report["errors"].append({
+                        MODEL_ID_TAG: None,
+                        "collection": collection_name,
+                        "code": write_concern_error.get("code"),
+                        "message": write_concern_error.get("errmsg"),
+                    })
+                collection_report["failed"] += len(details.get("writeErrors", list()))
+            except Exception as e:
+                logger.error(f"Exception occurred while syncing a batch of {len(batch_ids)} "
+                             f"models to {collection_name}. {e}")
+                report["errors"] += [
+                    {MODEL_ID_TAG: model_id, "collection": collection_name, "code": None, "message": str(e)}
+                    for model_id in batch_ids
+                ]
+                collection_report["failed"] += len(batch_ids)
+                continue
+
+            collection_report["matched"] += details.get("nMatched", 0)
+            collection_report["modified"] += details.get("nModified", 0)
+            collection_report["upserted"] += details.get("nUpserted", 0)
+
+    def bulk_sync(self, models: List[Dict], batch_size: Optional[int] = MONGODB_BULK_BATCH_SIZE) -> Dict:
+        """
+        Upserts the tensorboard and configuration records
+        of many models with unordered bulk writes, instead
+        of one round trip per record
+
+        Args:
+            models: records to sync. each record holds a
+                model_id and any of the tensorboard fields
+                (epochs, train, test, train_loss, test_loss)
+                and the config of the model. the final scores
+                are written into the configuration record
+            batch_size: maximum number of writes per bulk
+                write
+
+        Returns:
+            counts of matched, modified, upserted and failed
+                records per collection, and the model_id,
+                collection, code and message of each failed
+                record
+        """
+        if not batch_size or batch_size < 1:
+            raise MongoDBBotStoreUpdateException("Batch size should be a positive integer")
+
+        report = {"errors": list()}
+        tensorboard_ids, tensorboard_operations = list(), list()
+        config_ids, config_operations = list(), list()
+
+        for model in models:
+            model_id = model.get(MODEL_ID_TAG)
+            if not model_id:
+                report["errors"].append({
+                    MODEL_ID_TAG: None,
+                    "collection": None,
+                    "code": None,
+                    "message": "Record has no model_id",
+                })
+                continue
+
+            tensorboard_values = {key: model[key] for key in MONGODB_TENSORBOARD_FIELDS if key in model}
+            config_update = dict()
+            if tensorboard_values:
+                tensorboard_ids.append(model_id)
+                tensorboard_operations.append(
+                    UpdateOne({MODEL_ID_TAG: model_id}, {'$set': tensorboard_values}, upsert=True)
+                )
+                # final scores of partially updated records
+                # are unset and filled in by the next backfill
+                if len(tensorboard_values) == len(MONGODB_TENSORBOARD_FIELDS):
+                    config_update['$set'] = self._summary_values(tensorboard_values)
+                else:
+                    config_update['$unset'] = {field: "" for field in _SUMMARY_FIELDS.values()}
+            if CONFIG_TAG in model:
+                config_update.setdefault('$set', dict())[CONFIG_TAG] = model[CONFIG_TAG]
+            if config_update:
+                config_ids.append(model_id)
+                config_operations.append(UpdateOne({MODEL_ID_TAG: model_id}, config_update, upsert=True))
+
+        for collection_name, model_ids, operations in [
+            (self.tensorboard_collection, tensorboard_ids, tensorboard_operations),
+            (self.configuration_collection, config_ids, config_operations),
+        ]:
+            if operations:
+                self._bulk_upsert(
+                    collection_name=collection_name,
+                    model_ids=model_ids,
+                    operations=operations,
+                    batch_size=batch_size,
+                    report=report,
+                )
+
+        if report["errors"]:
+            logger.warning(f"{len(report['errors'])} records could not be synced to the BotStore")
+        return report
+
+    def get_model_curve_data(
+            self,
+            model_id: Text,
+            bson_output: bool = True,
+            fields: Optional[List[Text]] = None,
+    ):
+        """
+        Args:
+            model_id: model to get the curves of
+            bson_output: serialize the record
+            fields: record fields to fetch, e.g. ["epochs"].
+                all fields are fetched if not specified
+        """
         try:
             collection = self.get_collection(self.tensorboard_collection)
             query_ = {'model_id': model_id}
-            curve_data = collection.find_one(query_)
+            curve_data = collection.find_one(query_, projection=self._projection(fields))
             if bson_output:
                 return json_util.dumps(curve_data)
             else:
@@ -152,25 +485,96 @@ class MongoDBBotStore:
             logger.error(f"Exception occurred while retrieving model curve data. {e}")
             raise MongoDBBotSoreReadException()
 
-    # testing - getting all curve data - start
-    def get_all_model_curve_data(self, bson_output: bool = True):
-        try:
-            collection = self.get_collection(self.tensorboard_collection)
-            curve_data = collection.find()
-            # if bson_output:
-            #     return json_util.dumps(curve_data)
-            # else:
-            return curve_data
-        except Exception as e:
-            logger.error(f"Exception occurred while retrieving model curve data. {e}")
-            raise MongoDBBotSoreReadException()
+    def iterate_records(
+            self,
+            collection_name: Text,
+            batch_size: int = MONGODB_READ_BATCH_SIZE,
+            fields: Optional[Union[List[Text], Dict]] = None,
+            start_after: Optional[Text] = None,
+            query: Optional[Dict] = None,
+    ) -> Iterator[Dict]:
+        """
+        Yields the records of a collection in model_id
+        order. records are read in pages which resume
+        after the last model_id of the previous page on
+        the model_id index, so only one page is held in
+        memory at a time
+
+        Args:
+            collection_name: collection to read
+            batch_size: number of records per page
+            fields: record fields to fetch. all fields
+                are fetched if not specified
+            start_after: model_id to resume after
+            query: filter of the records to read
+        """
+        if not batch_size or batch_size < 1:
+            raise MongoDBBotSoreReadException("Batch size should be a positive integer")
+
+        collection = self.get_collection(collection_name)
+        projection = self._projection(fields)
+        last_model_id = start_after
 
-    # testing - getting all curve data - end
-    def get_model_config_data(self, model_id: Text, bson_output: bool = True):
+        while True:
+            try:
+                conditions = [query] if query else list()
+                if last_model_id is not None:
+                    conditions.append({MODEL_ID_TAG: {'$gt': last_model_id}})
+                query_ = {'$and': conditions} if conditions else dict()
+                records = list(
+                    collection.find(query_, projection=projection)
+                    .sort(MODEL_ID_TAG, pymongo.ASCENDING)
+                    .limit(batch_size)
+                    .batch_size(batch_size)
+                )
+            except Exception as e:
+                logger.error(f"Exception occurred while reading records of {collection_name}. {e}")
+                raise MongoDBBotSoreReadException()
+
+            yield from records
+            if len(records) < batch_size:
+                return
+            last_model_id = records[-1][MODEL_ID_TAG]
+
+    @staticmethod
+    def to_ndjson(records: Iterator[Dict]) -> Iterator[Text]:
+        """
+        Serializes records into newline delimited JSON,
+        one line per record
+        """
+        for record in records:
+            yield json_util.dumps(record) + "\n"
+
+    def get_all_model_curve_data(
+            self,
+            bson_output: bool = True,
+            fields: Optional[List[Text]] = None,
+            batch_size: int = MONGODB_READ_BATCH_SIZE,
+            start_after: Optional[Text] = None,
+    ) -> Iterator:
+        """
+        Returns a generator of the tensorboard records of
+        all models, or of their NDJSON lines if bson_output
+        is set
+        """
+        records = self.iterate_records(
+            collection_name=self.tensorboard_collection,
+            batch_size=batch_size,
+            fields=fields,
+            start_after=start_after,
+        )
+        return self.to_ndjson(records) if bson_output else records
+
+    def get_model_config_data(
+            self,
+            model_id: Text,
+            bson_output: bool = True,
+            fields: Optional[List[Text]] = None,
+    ):
         try:
             collection = self.get_collection(self.configuration_collection)
             query_ = {'model_id': model_id}
-            config_data = collection.find_one(query_)
+            config_data = collection.find_one(query_, projection=self._projection(fields))
             if bson_output:
                 return json_util.dumps(config_data)
             else:
@@ -179,14 +583,349 @@ class MongoDBBotStore:
             logger.error(f"Exception occurred while retrieving model config data. {e}")
             raise MongoDBBotSoreReadException()
 
-    def get_all_model_config_data(self, bson_output: bool = True):
+    def get_all_model_config_data(
+            self,
+            bson_output: bool = True,
+            fields: Optional[List[Text]] = None,
+            batch_size: int = MONGODB_READ_BATCH_SIZE,
+            start_after: Optional[Text] = None,
+    ) -> Iterator:
+        """
+        Returns a generator of the configuration records
+        of all models, or of their NDJSON lines if
+        bson_output is set
+        """
+        records = self.iterate_records(
+            collection_name=self.configuration_collection,
+            batch_size=batch_size,
+            fields=fields,
+            start_after=start_after,
+        )
+        return self.to_ndjson(records) if bson_output else records
+
+    def export_records(
+            self,
+            record_type: Text,
+            batch_size: int = MONGODB_READ_BATCH_SIZE,
+            fields: Optional[List[Text]] = None,
+            start_after: Optional[Text] = None,
+    ) -> Iterator[Text]:
+        """
+        Streams the records of one of BotStoreRecordType
+        as NDJSON lines, in model_id order
+        """
+        if record_type == BotStoreRecordType.CURVES:
+            return self.get_all_model_curve_data(fields=fields, batch_size=batch_size, start_after=start_after)
+        elif record_type == BotStoreRecordType.CONFIGS:
+            return self.get_all_model_config_data(fields=fields, batch_size=batch_size, start_after=start_after)
+        raise InvalidBotStoreQueryException(f"Invalid record type: {record_type}")
+
+    @staticmethod
+    def _to_scores(model_id: Text, record: Optional[Dict], curve: bool) -> Dict:
+        # scores in the format of the local botstore, which
+        # leaves them empty if the model has no results
+        epochs = record.get(EPOCHS_TAG) if record else None
+        if not record or not isinstance(epochs, int) \
+                or not all(record.get(tag) for tag in _SCORE_TAGS.values()):
+            scores = {MODEL_ID_TAG: model_id, **{key: "" for key in _SCORE_TAGS}, EPOCHS_TAG: ""}
+            if curve:
+                scores["curve_insights"] = ""
+            return scores
+
+        scores = {MODEL_ID_TAG: model_id}
+        for key, tag in _SCORE_TAGS.items():
+            scores[key] = record[tag] if curve else record[tag][-1]
+        scores[EPOCHS_TAG] = list(range(1, epochs + 1))
+        return scores
+
+    def iterate_model_scores(
+            self,
+            model_ids: Optional[List[Text]] = None,
+            curve: bool = False,
+    ) -> Iterator[Dict]:
+        """
+        Yields the scores of the models which have a
+        tensorboard record, in model_id order
+
+        Args:
+            model_ids: models to get the scores of. all
+                models are read if not specified
+            curve: whether to get the curves or only the
+                final scores
+        """
+        fields = None if curve else _SUMMARY_PROJECTION
+        if model_ids is None:
+            records = self.iterate_records(collection_name=self.tensorboard_collection, fields=fields)
+        else:
+            try:
+                collection = self.get_collection(self.tensorboard_collection)
+                records = collection.find(
+                    {MODEL_ID_TAG: {'$in': list(model_ids)}},
+                    projection=self._projection(fields),
+                ).sort(MODEL_ID_TAG, pymongo.ASCENDING)
+            except MongoDBBotStoreCollectionException:
+                raise
+            except Exception as e:
+                logger.error(f"Exception occurred while retrieving model scores. {e}")
+                raise MongoDBBotSoreReadException()
+
+        for record in records:
+            yield self._to_scores(model_id=record[MODEL_ID_TAG], record=record, curve=curve)
+
+    def get_models(self, latest_only: bool = False) -> Union[List, Text]:
+        # model names start with their timestamps, so the
+        # model_id order is the order they were trained in
         try:
-            collection = self.get_collection(self.configuration_collection)
-            config_data = collection.find()
-            if bson_output:
-                return json_util.dumps(config_data)
+            if latest_only:
+                collection = self.get_collection(self.configuration_collection)
+                record = collection.find_one(
+                    projection=self._projection([]),
+                    sort=[(MODEL_ID_TAG, pymongo.DESCENDING)],
+                )
+                return record[MODEL_ID_TAG] if record else None
+
+            model_ids = [
+                record[MODEL_ID_TAG] for record in
+                self.iterate_records(collection_name=self.configuration_collection, fields=[])
+            ]
+            return list(reversed(model_ids))
+        except Exception as e:
+            logger.error("Exception occurred while retrieving botstore models")
+            raise BotStoreRetrieveException(e)
+
+    def model_exists(self, model_name: Text) -> bool:
+        return self.check_model_existence(model_name=model_name)
+
+    @staticmethod
+    def _sort_value(summary: Dict, sort_by: Text):
+        if sort_by == BotStoreSortKey.TIMESTAMP:
+            return summary[MODEL_ID_TAG]
+        if summary[sort_by] == "":
+            return None
+        return len(summary[sort_by]) if sort_by == BotStoreSortKey.EPOCHS else summary[sort_by]
+
+    @classmethod
+    def _summary_values(cls, record: Optional[Dict]) -> Dict:
+        # final scores of a tensorboard record, or None
+        # if the model has no results
+        summary = cls._to_scores(model_id=None, record=record, curve=False)
+        return {field: cls._sort_value(summary, key) for key, field in _SUMMARY_FIELDS.items()}
+
+    @classmethod
+    def _from_summary_values(cls, record: Dict) -> Dict:
+        epochs = record.get(_SUMMARY_FIELDS[EPOCHS_TAG])
+        if not isinstance(epochs, int) or any(record.get(field) is None for field in _SUMMARY_FIELDS.values()):
+            return cls._to_scores(model_id=record[MODEL_ID_TAG], record=None, curve=False)
+
+        scores = {MODEL_ID_TAG: record[MODEL_ID_TAG]}
+        for key in _SCORE_TAGS:
+            scores[key] = record[_SUMMARY_FIELDS[key]]
+        scores[EPOCHS_TAG] = list(range(1, epochs + 1))
+        return scores
+
+    def backfill_summaries(self, batch_size: int = MONGODB_BULK_BATCH_SIZE) -> int:
+        """
+        Writes the final scores of the configuration
+        records which have none yet, e.g. records synced
+        by an earlier version of RASAC
+
+        Returns:
+            number of configuration records backfilled
+        """
+        records = self.iterate_records(
+            collection_name=self.configuration_collection,
+            batch_size=batch_size,
+            fields=[],
+            query={_SUMMARY_FIELDS[EPOCHS_TAG]: {'$exists': False}},
+        )
+        backfilled = 0
+        while True:
+            model_ids = [record[MODEL_ID_TAG] for record in islice(records, batch_size)]
+            if not model_ids:
+                return backfilled
+
+            try:
+                tensorboard_records = {
+                    record[MODEL_ID_TAG]: record for record in
+                    self.get_collection(self.tensorboard_collection).find(
+                        {MODEL_ID_TAG: {'$in': model_ids}},
+                        projection=self._projection(_SUMMARY_PROJECTION),
+                    )
+                }
+                self.get_collection(self.configuration_collection).bulk_write([
+                    UpdateOne(
+                        {MODEL_ID_TAG: model_id},
+                        {'$set': self._summary_values(tensorboard_records.get(model_id))},
+                    )
+                    for model_id in model_ids
+                ], ordered=False)
+            except MongoDBBotStoreCollectionException:
+                raise
+            except Exception as e:
+                logger.error(f"Exception occurred while backfilling model summaries. {e}")
+                raise MongoDBBotStoreUpdateException()
+            backfilled += len(model_ids)
+
+    def _find_summaries(
+            self,
+            conditions: List[Dict],
+            sort_fields: List[Text],
+            descending: bool,
+            limit: Optional[int],
+    ) -> List[Dict]:
+        direction = pymongo.DESCENDING if descending else pymongo.ASCENDING
+        collection = self.get_collection(self.configuration_collection)
+        records = collection.find(
+            {'$and': conditions} if conditions else dict(),
+            projection=self._projection(list(_SUMMARY_FIELDS.values())),
+        ).sort([(field, direction) for field in sort_fields])
+        if limit is not None:
+            records = records.limit(limit)
+        return list(records)
+
+    def model_summaries(
+            self,
+            sort_by: Text = BotStoreSortKey.TIMESTAMP,
+            descending: bool = True,
+            min_scores: Optional[Dict] = None,
+            max_scores: Optional[Dict] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[Text] = None,
+    ) -> Tuple[List, Optional[Text]]:
+        """
+        Lists the final scores of the models in the
+        catalog. sorting, filtering and paging follow the
+        botstore index and are resolved by MongoDB on the
+        final scores of the configuration records, so only
+        the requested page is read
+
+        Returns:
+            list of model scores and the cursor of the
+                next page
+        """
+        try:
+            if sort_by not in BotStoreSortKey.VALID_KEYS:
+                raise InvalidBotStoreQueryException(f"Invalid sort key: {sort_by}")
+            if limit is not None and not 0 < limit <= BOTSTORE_PAGE_MAX_LIMIT:
+                raise InvalidBotStoreQueryException(f"Limit should be between 1 and {BOTSTORE_PAGE_MAX_LIMIT}")
+
+            bounds = dict()
+            for scores, operator in [(min_scores, '$gte'), (max_scores, '$lte')]:
+                for key, bound in (scores or dict()).items():
+                    if key not in BotStoreSortKey.SCORE_KEYS:
+                        raise InvalidBotStoreQueryException(f"Invalid score key: {key}")
+                    bounds.setdefault(_SUMMARY_FIELDS[key], dict())[operator] = bound
+            conditions = [bounds] if bounds else list()
+            last_page = decode_cursor(cursor=cursor, sort_by=sort_by, descending=descending) if cursor else None
+            later = '$lt' if descending else '$gt'
+            page_size = limit + 1 if limit is not None else None
+
+            # models come after the last model of the previous
+            # page in (missing score, score, model_id) order.
+            # models with the score are read first
+            if sort_by == BotStoreSortKey.TIMESTAMP:
+                field = MODEL_ID_TAG
+                if last_page:
+                    conditions.append({MODEL_ID_TAG: {later: last_page[1]}})
+                records = self._find_summaries(conditions, [MODEL_ID_TAG], descending, page_size)
             else:
-                return config_data
+                field = _SUMMARY_FIELDS[sort_by]
+                records = list()
+                if not last_page or last_page[0] is not None:
+                    scored_conditions = conditions + [{field: {'$ne': None}}]
+                    if last_page:
+                        value, model_id = last_page
+                        scored_conditions.append({'$or': [
+                            {field: {later: value}},
+                            {field: value, MODEL_ID_TAG: {later: model_id}},
+                        ]})
+                    records = self._find_summaries(scored_conditions, [field, MODEL_ID_TAG], descending, page_size)
+
+                if page_size is None or len(records) < page_size:
+                    unscored_conditions = conditions + [{field: None}]
+                    if last_page and last_page[0] is None:
+                        unscored_conditions.append({MODEL_ID_TAG: {later: last_page[1]}})
+                    records += self._find_summaries(
+                        unscored_conditions,
+                        [MODEL_ID_TAG],
+                        descending,
+                        page_size - len(records) if page_size is not None else None,
+                    )
+
+            next_cursor = None
+            if limit is not None and len(records) > limit:
+                records = records[:limit]
+                next_cursor = encode_cursor(
+                    sort_by=sort_by,
+                    descending=descending,
+                    value=records[-1].get(field),
+                    model_id=records[-1][MODEL_ID_TAG],
+                )
+            return [self._from_summary_values(record) for record in records], next_cursor
+        except InvalidBotStoreQueryException:
+            raise
         except Exception as e:
-            logger.error(f"Exception occurred while retrieving all model config data. {e}")
-            raise MongoDBBotSoreReadException()
+            logger.error("Exception occurred while retrieving model summaries")
+            raise BotStoreRetrieveException(e)
+
+    def model_performance(
+            self,
+            model_name: Union[Text, List] = None,
+            curve: bool = True,
+            sort: bool = False,
+    ) -> Union[Dict, List]:
+        try:
+            if isinstance(model_name, Text):
+                if not self.model_exists(model_name=model_name):
+                    raise InvalidModelException()
+                record = self.get_model_curve_data(
+                    model_id=model_name,
+                    bson_output=False,
+                    fields=None if curve else _SUMMARY_PROJECTION,
+                )
+                return self._to_scores(model_id=model_name, record=record, curve=curve)
+
+            model_ids = self.get_models()
+            if isinstance(model_name, List):
+                valid_models = set(model_ids)
+                for model in model_name:
+                    if model not in valid_models:
+                        raise InvalidModelException()
+                model_ids = model_name
+            elif not curve:
+                return self.model_summaries()[0]
+
+            scores = {
+                model_scores[MODEL_ID_TAG]: model_scores for model_scores in
+                self.iterate_model_scores(model_ids=model_ids if isinstance(model_name, List) else None, curve=curve)
+            }
+            model_score_list = [
+                scores.get(model_id) or self._to_scores(model_id=model_id, record=None, curve=curve)
+                for model_id in model_ids
+            ]
+            return model_score_list if not sort else sorted(
+                model_score_list, key=lambda x: x[MODEL_ID_TAG], reverse=True
+            )
+        except Exception as e:
+            logger.error("Exception occurred while retrieving model scores")
+            raise BotStoreRetrieveException(e)
+
+    def model_config(self, model_name: Union[Text, List] = None) -> Optional[Dict]:
+        try:
+            if isinstance(model_name, Text):
+                record = self.get_model_config_data(model_id=model_name, bson_output=False, fields=[CONFIG_TAG])
+                if not record:
+                    raise InvalidModelException()
+                return {"config": record.get(CONFIG_TAG)}
+            else:
+                raise NotImplementedError("model_config for list of models is not implemented")
+        except Exception as e:
+            logger.error("Exception occurred while retrieving model configs")
+            raise BotStoreRetrieveException(e)
+
+    def delete_model(self, model_name: Text) -> NoReturn:
+        try:
+            for collection_name in [self.tensorboard_collection, self.configuration_collection]:
+                self.get_collection(collection_name).delete_one({MODEL_ID_TAG: model_name})
+        except Exception as e:
+            raise BotStoreCleanupException(e)
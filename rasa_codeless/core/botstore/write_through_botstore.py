@@ -0,0 +1,344 @@
+import logging
+import threading
+from typing import Text, List, NoReturn, Dict, Union, Optional, Tuple, Iterator
+
+from rasa_codeless.shared.constants import (
+    MODEL_ID_TAG,
+    EPOCHS_TAG,
+    TRAIN_ACCURACY_TAG,
+    VALIDATION_ACCURACY_TAG,
+    TRAIN_LOSS_TAG,
+    VALIDATION_LOSS_TAG,
+    CONFIG_TAG,
+    MONGODB_BULK_BATCH_SIZE,
+    MONGODB_READ_BATCH_SIZE,
+    MONGODB_SYNC_RETRY_INTERVAL,
+    MONGODB_SYNC_MAX_RETRY_INTERVAL,
+    BotStoreSortKey,
+)
+from rasa_codeless.shared.exceptions.botstore import (
+    BotStoreRetrieveException,
+    BotStoreIndexException,
+    ModelNotAvailableException,
+)
+from rasa_codeless.core.botstore.botstore import BotStore
+from rasa_codeless.core.botstore.local_botstore import LocalBotStore
+from rasa_codeless.core.botstore.mongodb_botstore import MongoDBBotStore
+
+logger = logging.getLogger(__name__)
+
+
+class WriteThroughBotStore(BotStore):
+    """
+    Keeps models in a local botstore, which serves as
+    a fast cache, and writes the scores and config of
+    every registered or deleted model through to a
+    MongoDB botstore, the durable catalog shared by
+    RASAC servers. the catalog is read from the local
+    botstore, which takes the scores of models it has
+    not indexed yet from MongoDB instead of parsing
+    their event files, or from MongoDB if remote_reads
+    is set. model files are always served locally
+    """
+
+    supports_records = True
+
+    def __init__(
+            self,
+            local: LocalBotStore,
+            remote: MongoDBBotStore,
+            remote_reads: bool = False,
+    ):
+        self.local = local
+        self.remote = remote
+        self.remote_reads = remote_reads
+
+        # models whose records could not be written to
+        # MongoDB, retried along with the next write
+        # through and by the sync thread
+        self._unsynced = set()
+        self._unsynced_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._stop_sync = threading.Event()
+
+    @property
+    def botstore_path(self) -> Text:
+        return self.local.botstore_path
+
+    @property
+    def models_path(self) -> Text:
+        return self.local.models_path
+
+    @property
+    def catalog(self) -> BotStore:
+        return self.remote if self.remote_reads else self.local
+
+    def get_models(self, latest_only: bool = False) -> Union[List, Text]:
+        return self.catalog.get_models(latest_only=latest_only)
+
+    def model_exists(self, model_name: Text) -> bool:
+        return self.catalog.model_exists(model_name=model_name)
+
+    def _fill_index(self) -> NoReturn:
+        indexed_models = set(self.local.index.model_ids())
+        missing_models = [model for model in self.local.get_models() if model not in indexed_models]
+        if not missing_models:
+            return
+
+        try:
+            for model_scores in self.remote.iterate_model_scores(model_ids=missing_models):
+                epochs = model_scores[EPOCHS_TAG]
+                self.local.index.upsert(summary={
+                    **model_scores,
+                    EPOCHS_TAG: len(epochs) if isinstance(epochs, List) else epochs,
+                })
+        except BotStoreIndexException:
+            raise
+        except Exception as e:
+            # the local botstore indexes the remaining
+            # models from their event files
+            logger.warning(f"Could not read model scores from MongoDB. {e}")
+
+    def model_summaries(
+            self,
+            sort_by: Text = BotStoreSortKey.TIMESTAMP,
+            descending: bool = True,
+            min_scores: Optional[Dict] = None,
+            max_scores: Optional[Dict] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[Text] = None,
+    ) -> Tuple[List, Optional[Text]]:
+        query = {
+            "sort_by": sort_by,
+            "descending": descending,
+            "min_scores": min_scores,
+            "max_scores": max_scores,
+            "limit": limit,
+            "cursor": cursor,
+        }
+        if self.remote_reads:
+            return self.remote.model_summaries(**query)
+
+        try:
+            self._fill_index()
+        except BotStoreIndexException as e:
+            logger.warning(f"Could not index model scores from MongoDB. {e}")
+        return self.local.model_summaries(**query)
+
+    def model_performance(
+            self,
+            model_name: Union[Text, List] = None,
+            curve: bool = True,
+            sort: bool = False,
+    ) -> Union[Dict, List]:
+        if not self.remote_reads and not curve and model_name is None:
+            try:
+                self._fill_index()
+            except BotStoreIndexException as e:
+                logger.warning(f"Could not index model scores from MongoDB. {e}")
+        return self.catalog.model_performance(model_name=model_name, curve=curve, sort=sort)
+
+    def model_config(self, model_name: Union[Text, List] = None) -> Optional[Dict]:
+        if self.remote_reads:
+            return self.remote.model_config(model_name=model_name)
+        try:
+            return self.local.model_config(model_name=model_name)
+        except BotStoreRetrieveException:
+            if not isinstance(model_name, Text) or not self.local.model_exists(model_name=model_name):
+                raise
+            logger.debug(f"Reading the config of model {model_name} from MongoDB")
+            return self.remote.model_config(model_name=model_name)
+
+    def reserve_model_name(self, model_name: Text) -> Text:
+        return self.local.reserve_model_name(model_name=model_name)
+
+    def persist_model(
+            self,
+            model_name: Text,
+            assets: Dict = None,
+            asset_sources: Dict = None,
+    ) -> Dict:
+        return self.local.persist_model(model_name=model_name, assets=assets, asset_sources=asset_sources)
+
+    def register_model(self, model_name: Text) -> NoReturn:
+        # records are written once the model is in the
+        # models dir, so the catalog never lists a model
+        # whose promotion failed
+        self.local.register_model(model_name=model_name)
+        self.write_through(model_names=[model_name])
+
+    def release_model(self, model_name: Text) -> NoReturn:
+        self.local.release_model(model_name=model_name)
+
+    def delete_model(self, model_name: Text) -> NoReturn:
+        # models other servers trained are only in the
+        # catalog, and are deleted from it alone
+        if not self.remote_reads or self.local.model_exists(model_name=model_name):
+            self.local.delete_model(model_name=model_name)
+        with self._unsynced_lock:
+            self._unsynced.discard(model_name)
+        try:
+            self.remote.delete_model(model_name=model_name)
+        except Exception as e:
+            if self.remote_reads:
+                raise
+            logger.warning(f"Could not delete the records of model {model_name} from MongoDB. {e}")
+
+    def clear_cache(self) -> NoReturn:
+        self.local.clear_cache()
+
+    def _check_local_model(self, model_name: Text) -> NoReturn:
+        # the catalog lists models other servers trained,
+        # whose files are not kept on this server
+        if not self.local.model_exists(model_name=model_name):
+            raise ModelNotAvailableException(f"Model {model_name} is not available on this server")
+
+    def get_model_path(self, model_name: Text) -> Text:
+        self._check_local_model(model_name=model_name)
+        return self.local.get_model_path(model_name=model_name)
+
+    def model_digest(self, model_name: Text) -> Text:
+        self._check_local_model(model_name=model_name)
+        return self.local.model_digest(model_name=model_name)
+
+    def export_records(
+            self,
+            record_type: Text,
+            batch_size: int = MONGODB_READ_BATCH_SIZE,
+            fields: Optional[List[Text]] = None,
+            start_after: Optional[Text] = None,
+    ) -> Iterator[Text]:
+        return self.remote.export_records(
+            record_type=record_type,
+            batch_size=batch_size,
+            fields=fields,
+            start_after=start_after,
+        )
+
+    def _records(self, model_names: List[Text]) -> List[Dict]:
+        records = list()
+        for model_scores in self.local.model_performance(model_name=model_names, curve=True):
+            model_name = model_scores[MODEL_ID_TAG]
+            try:
+                config = self.local.model_config(model_name=model_name)["config"]
+            except BotStoreRetrieveException as e:
+                logger.warning(f"Could not read the config of model {model_name}. {e}")
+                config = None
+            record = {MODEL_ID_TAG: model_name, CONFIG_TAG: config}
+            # models without tensorboard results only get
+            # a config record
+            if model_scores[EPOCHS_TAG] != "":
+                record.update({
+                    EPOCHS_TAG: len(model_scores[EPOCHS_TAG]),
+                    TRAIN_ACCURACY_TAG: model_scores["train_acc"],
+                    VALIDATION_ACCURACY_TAG: model_scores["test_acc"],
+                    TRAIN_LOSS_TAG: model_scores["train_loss"],
+                    VALIDATION_LOSS_TAG: model_scores["test_loss"],
+                })
+            records.append(record)
+        return records
+
+    def write_through(self, model_names: List[Text], batch_size: int = MONGODB_BULK_BATCH_SIZE) -> Dict:
+        """
+        Writes the records of local models to MongoDB,
+        along with the models which failed to be written
+        earlier. models which could not be written are
+        retried later
+
+        Returns:
+            bulk_sync report of the written records
+        """
+        with self._unsynced_lock:
+            model_names = list(dict.fromkeys([*model_names, *sorted(self._unsynced)]))
+        try:
+            report = self.remote.bulk_sync(models=self._records(model_names=model_names), batch_size=batch_size)
+            failed_models = {error[MODEL_ID_TAG] for error in report["errors"] if error[MODEL_ID_TAG]}
+        except Exception as e:
+            logger.warning(f"Could not write models {model_names} through to MongoDB. {e}")
+            report = {"errors": [{MODEL_ID_TAG: None, "collection": None, "code": None, "message": str(e)}]}
+            failed_models = set(model_names)
+
+        with self._unsynced_lock:
+            self._unsynced.difference_update(model_names)
+            # models deleted in the meantime are not retried
+            self._unsynced.update(failed_models.intersection(self.local.get_models()))
+        return report
+
+    def sync(self, batch_size: int = MONGODB_BULK_BATCH_SIZE) -> Dict:
+        """
+        Writes the local models which are missing in
+        MongoDB, or failed to be written earlier, through
+        to MongoDB, e.g. models trained before the write
+        through backend was enabled. the final scores of
+        records synced without them are backfilled first
+
+        Returns:
+            bulk_sync report of the written records
+        """
+        with self._sync_lock:
+            # indexes which could not be created are
+            # retried when the collections are used
+            if not self.remote.ensure_indexes():
+                logger.warning("Could not create all indexes of the MongoDB botstore")
+            backfilled = self.remote.backfill_summaries(batch_size=batch_size)
+            if backfilled:
+                logger.info(f"Backfilled the final scores of {backfilled} models in MongoDB")
+            remote_models = set(self.remote.get_models())
+            model_names = [model for model in self.local.get_models() if model not in remote_models]
+            with self._unsynced_lock:
+                if not model_names and not self._unsynced:
+                    return {"errors": list()}
+
+            logger.info(f"Writing {len(model_names)} botstore models through to MongoDB")
+            return self.write_through(model_names=model_names, batch_size=batch_size)
+
+    def retry_unsynced(self) -> Optional[Dict]:
+        """
+        Writes the models which failed to be written
+        earlier through to MongoDB
+
+        Returns:
+            bulk_sync report of the written records, or
+                None if there was nothing to retry
+        """
+        with self._sync_lock:
+            with self._unsynced_lock:
+                if not self._unsynced:
+                    return None
+            return self.write_through(model_names=list())
+
+    def start_sync(
+            self,
+            retry_interval: float = MONGODB_SYNC_RETRY_INTERVAL,
+            max_retry_interval: float = MONGODB_SYNC_MAX_RETRY_INTERVAL,
+    ) -> threading.Thread:
+        """
+        Starts a daemon thread which syncs the botstore
+        with MongoDB, and then keeps retrying the models
+        which could not be written, backing off while
+        MongoDB stays unavailable
+        """
+        def _sync():
+            synced = False
+            interval = retry_interval
+            while True:
+                try:
+                    # the full sync is retried until MongoDB
+                    # has been reachable once
+                    report = self.retry_unsynced() if synced else self.sync()
+                    synced = True
+                    failed = bool(report and report["errors"])
+                except Exception as e:
+                    logger.warning(f"Could not sync the botstore with MongoDB. {e}")
+                    failed = True
+                interval = min(interval * 2, max_retry_interval) if failed else retry_interval
+                if self._stop_sync.wait(timeout=interval):
+                    return
+
+        self._stop_sync.clear()
+        sync_thread = threading.Thread(target=_sync, name="botstore-sync", daemon=True)
+        sync_thread.start()
+        return sync_thread
+
+    def stop_sync(self) -> NoReturn:
+        self._stop_sync.set()
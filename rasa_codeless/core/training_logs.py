@@ -0,0 +1,182 @@
+import logging
+import os
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Text, NoReturn, Callable, Iterator, Optional, Iterable
+
+from rasa_codeless.shared.constants import (
+    TRAINING_LOGS_PATH,
+    TRAINING_LOG_EXTENSION,
+    TRAINING_LOG_MAX_BYTES,
+    TRAINING_LOG_BACKUP_COUNT,
+    TRAINING_LOG_POLL_INTERVAL,
+    TRAINING_LOG_HEARTBEAT_INTERVAL,
+    TRAINING_LOG_RETENTION,
+    Encoding,
+    FilePermission,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_training_log_path(request_id: Text, logs_path: Text = TRAINING_LOGS_PATH) -> Text:
+    return os.path.join(logs_path, f"{request_id}{TRAINING_LOG_EXTENSION}")
+
+
+def prune_training_logs(
+        keep_request_ids: Iterable[Text],
+        logs_path: Text = TRAINING_LOGS_PATH,
+        retention: int = TRAINING_LOG_RETENTION,
+) -> int:
+    """
+    Deletes the logs of the oldest finished training
+    jobs, along with their rotated files, so that at
+    most `retention` finished job logs are kept
+
+    Args:
+        keep_request_ids: jobs whose logs are always
+            kept, e.g. pending and running jobs
+        logs_path: path of the training logs dir
+        retention: number of finished job logs to keep
+
+    Returns:
+        number of job logs deleted
+    """
+    if not os.path.isdir(logs_path):
+        return 0
+
+    keep_request_ids = set(keep_request_ids)
+    job_logs = dict()
+    for file_name in os.listdir(logs_path):
+        # rotated files are named <request_id>.log.<n>
+        request_id, extension, _ = file_name.partition(TRAINING_LOG_EXTENSION)
+        if not extension or request_id in keep_request_ids:
+            continue
+        try:
+            file_path = os.path.join(logs_path, file_name)
+            modified_at = os.stat(file_path).st_mtime
+        except FileNotFoundError:
+            continue
+        files, last_modified_at = job_logs.get(request_id, (list(), 0))
+        job_logs[request_id] = (files + [file_path], max(last_modified_at, modified_at))
+
+    expired_logs = sorted(job_logs.values(), key=lambda x: x[1], reverse=True)[max(retention, 0):]
+    for files, _ in expired_logs:
+        for file_path in files:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+    if expired_logs:
+        logger.debug(f"Deleted the logs of {len(expired_logs)} finished training jobs")
+    return len(expired_logs)
+
+
+class TrainingLogWriter:
+    """
+    Writes the output of a training process line by
+    line to the log file of the training job. the log
+    file is rotated once it grows beyond the maximum
+    size, so a verbose training run neither buffers
+    its output in memory nor fills up the disk
+    """
+
+    def __init__(
+            self,
+            request_id: Text,
+            logs_path: Text = TRAINING_LOGS_PATH,
+            max_bytes: int = TRAINING_LOG_MAX_BYTES,
+            backup_count: int = TRAINING_LOG_BACKUP_COUNT,
+    ):
+        os.makedirs(logs_path, exist_ok=True)
+        self.log_path = get_training_log_path(request_id=request_id, logs_path=logs_path)
+        self._handler = RotatingFileHandler(
+            filename=self.log_path,
+            mode=FilePermission.WRITE,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding=Encoding.UTF8,
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def write(self, line: Text) -> NoReturn:
+        self._handler.handle(logging.makeLogRecord({"msg": line.rstrip("\r\n")}))
+
+    def close(self) -> NoReturn:
+        self._handler.close()
+
+
+def tail_training_log(
+        request_id: Text,
+        is_finished: Callable[[], bool],
+        logs_path: Text = TRAINING_LOGS_PATH,
+        poll_interval: float = TRAINING_LOG_POLL_INTERVAL,
+        heartbeat_interval: float = TRAINING_LOG_HEARTBEAT_INTERVAL,
+) -> Iterator[Optional[Text]]:
+    """
+    Follows the log file of a training job from the
+    beginning and yields lines as they are written,
+    until the job is finished and the whole log has
+    been read. reopens the log file when it has been
+    rotated
+
+    Args:
+        request_id: request id of the training job
+        is_finished: returns True once the training job
+            will not write to its log anymore
+        logs_path: path of the training logs dir
+        poll_interval: seconds to wait for new lines
+        heartbeat_interval: seconds without new lines
+            after which None is yielded, allowing the
+            caller to keep the connection alive
+
+    Returns:
+        generator of log lines, or None as heartbeats
+    """
+    log_path = get_training_log_path(request_id=request_id, logs_path=logs_path)
+    log_file = None
+    log_inode = None
+    partial_line = ""
+    last_output = time.monotonic()
+
+    try:
+        while True:
+            finished = is_finished()
+
+            if log_file is None and os.path.exists(log_path):
+                log_file = open(log_path, mode=FilePermission.READ, encoding=Encoding.UTF8, errors="replace")
+                log_inode = os.fstat(log_file.fileno()).st_ino
+
+            if log_file is not None:
+                chunk = log_file.read()
+                if chunk:
+                    lines = (partial_line + chunk).split("\n")
+                    partial_line = lines.pop()
+                    for line in lines:
+                        yield line
+                    last_output = time.monotonic()
+                    continue
+
+                # the writer moved the file aside and
+                # started a new one under the same name
+                try:
+                    rotated = os.stat(log_path).st_ino != log_inode
+                except FileNotFoundError:
+                    rotated = False
+                if rotated:
+                    log_file.close()
+                    log_file = None
+                    continue
+
+            if finished:
+                if partial_line:
+                    yield partial_line
+                return
+
+            if time.monotonic() - last_output >= heartbeat_interval:
+                last_output = time.monotonic()
+                yield None
+            time.sleep(poll_interval)
+    finally:
+        if log_file is not None:
+            log_file.close()
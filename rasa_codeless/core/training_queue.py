@@ -1,12 +1,16 @@
+import json
 import logging
 import sqlite3
-from typing import NoReturn, Text, List
+from typing import NoReturn, Text, List, Optional, Dict, Iterable
 
 import psutil
 
 from rasa_codeless.shared.constants import (
     TRAINING_QUEUE,
     TRAINING_QUEUE_TABLE,
+    TRAINING_QUEUE_BUSY_TIMEOUT,
+    DEFAULT_TRAINING_PRIORITY,
+    TrainingJobState,
 )
 from rasa_codeless.shared.exceptions.server import (
     TrainingQueueException,
@@ -17,6 +21,7 @@ from rasa_codeless.shared.exceptions.server import (
     TrainingQueueUpdateException,
     ProcessTerminationException,
 )
+from rasa_codeless.utils.sqlite import ThreadLocalConnection
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +29,16 @@ logger = logging.getLogger(__name__)
 def create_in_memory_training_queue(data_source_path: Text = TRAINING_QUEUE) -> NoReturn:
     try:
         with sqlite3.connect(data_source_path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
             conn.execute(f'DROP TABLE IF EXISTS {TRAINING_QUEUE_TABLE};')
             conn.execute(f'CREATE TABLE {TRAINING_QUEUE_TABLE} '
                          f'(request_id TEXT PRIMARY KEY, '
                          f'process_id INT NOT NULL, '
                          f'ttimestamp TIMESTAMP, '
-                         f'metadata TEXT NOT NULL );')
+                         f'metadata TEXT NOT NULL, '
+                         f'state TEXT NOT NULL DEFAULT \'{TrainingJobState.PENDING}\', '
+                         f'priority INT NOT NULL DEFAULT {DEFAULT_TRAINING_PRIORITY}, '
+                         f'enqueued_at TIMESTAMP );')
             conn.commit()
             logger.debug('In-memory training queue was initialized')
     except Exception as e:
@@ -69,29 +78,72 @@ class TrainingQueue:
         else:
             self.training_queue = data_source_path
 
+        self._connections = ThreadLocalConnection(
+            database_path=self.training_queue,
+            timeout=TRAINING_QUEUE_BUSY_TIMEOUT,
+        )
+
     def in_memory_training_queue(self) -> Text:
         return self.training_queue
 
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def close(self) -> NoReturn:
+        self._connections.close()
+
     def push(
             self,
             process_id: int,
             request_id: Text,
             timestamp: float,
             metadata: Text,
+            state: Text = TrainingJobState.PENDING,
+            priority: int = DEFAULT_TRAINING_PRIORITY,
     ) -> bool:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
+            conn = self._connection()
+            with conn:
                 conn.execute(
-                    f'INSERT INTO {TRAINING_QUEUE_TABLE} VALUES (?, ?, ?, ?)',
-                    (request_id, process_id, timestamp, metadata)
+                    f'INSERT INTO {TRAINING_QUEUE_TABLE} (request_id, process_id, ttimestamp, '
+                    f'metadata, state, priority, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (request_id, process_id, timestamp, metadata, state, priority, timestamp)
                 )
-                conn.commit()
             return True
         except Exception as e:
             raise TrainingQueuePushException(e)
 
+    def try_enqueue(
+            self,
+            process_id: int,
+            request_id: Text,
+            timestamp: float,
+            metadata: Text,
+            state: Text = TrainingJobState.PENDING,
+            priority: int = DEFAULT_TRAINING_PRIORITY,
+    ) -> bool:
+        """
+        Admits a training request unless a request with
+        the same request id already exists. the existence
+        check and the insert happen in a single statement,
+        so duplicate requests racing each other cannot
+        both be admitted
+
+        Returns:
+            True if the request was admitted, else False
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    f'INSERT OR IGNORE INTO {TRAINING_QUEUE_TABLE} (request_id, process_id, ttimestamp, '
+                    f'metadata, state, priority, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (request_id, process_id, timestamp, metadata, state, priority, timestamp)
+                )
+            return cursor.rowcount == 1
+        except Exception as e:
+            raise TrainingQueuePushException(e)
+
     def update_pid(
             self,
             process_id: int,
@@ -99,14 +151,12 @@ class TrainingQueue:
             timestamp: float,
     ) -> bool:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
+            conn = self._connection()
+            with conn:
                 conn.execute(
                     f'UPDATE {TRAINING_QUEUE_TABLE} SET process_id = ?, ttimestamp = ? WHERE request_id = ?',
                     (process_id, timestamp, request_id)
                 )
-                conn.commit()
             return True
         except Exception as e:
             raise TrainingQueueUpdateException(e)
@@ -116,14 +166,12 @@ class TrainingQueue:
             request_id: Text
     ) -> bool:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
+            conn = self._connection()
+            with conn:
                 conn.execute(
                     f"DELETE FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
                     (request_id,)
                 )
-                conn.commit()
             return True
         except Exception as e:
             raise TrainingQueueException(e)
@@ -133,14 +181,11 @@ class TrainingQueue:
             request_id: Text
     ) -> int:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
-                process = conn.execute(
-                    f"SELECT process_id FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
-                    (request_id,)
-                ).fetchone()
-                conn.commit()
+            conn = self._connection()
+            process = conn.execute(
+                f"SELECT process_id FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
+                (request_id,)
+            ).fetchone()
 
             if not process:
                 raise ProcessNotExistsException()
@@ -154,14 +199,11 @@ class TrainingQueue:
             request_id: Text
     ) -> bool:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
-                process_id = conn.execute(
-                    f"SELECT process_id FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
-                    (request_id,)
-                ).fetchone()
-                conn.commit()
+            conn = self._connection()
+            process_id = conn.execute(
+                f"SELECT process_id FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
+                (request_id,)
+            ).fetchone()
 
             if process_id:
                 return True
@@ -174,13 +216,11 @@ class TrainingQueue:
             self,
     ) -> bool:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
+            conn = self._connection()
+            with conn:
                 conn.execute(
                     f"DELETE FROM {TRAINING_QUEUE_TABLE}"
                 )
-                conn.commit()
                 return True
         except Exception as e:
             raise TrainingQueueException(e)
@@ -189,30 +229,73 @@ class TrainingQueue:
             self,
     ) -> List:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
-                current_training_queue = conn.execute(
-                    f"SELECT * FROM {TRAINING_QUEUE_TABLE}"
-                ).fetchall()
-                conn.commit()
+            conn = self._connection()
+            current_training_queue = conn.execute(
+                f"SELECT * FROM {TRAINING_QUEUE_TABLE}"
+            ).fetchall()
             return current_training_queue
         except Exception as e:
             raise TrainingQueuePullException(e)
 
+    def prune_finished(
+            self,
+            retention: int,
+            keep_request_ids: Iterable[Text] = (),
+    ) -> int:
+        """
+        Deletes the oldest finished training requests, so
+        that at most `retention` finished requests are kept
+
+        Args:
+            retention: number of finished requests to keep
+            keep_request_ids: requests which are always
+                kept, e.g. aborted jobs whose process has
+                not exited yet
+
+        Returns:
+            number of training requests deleted
+        """
+        try:
+            keep_request_ids = set(keep_request_ids)
+            placeholders = ", ".join(["?"] * len(TrainingJobState.FINISHED))
+            conn = self._connection()
+            finished_requests = conn.execute(
+                f"SELECT request_id, metadata FROM {TRAINING_QUEUE_TABLE} WHERE state IN ({placeholders})",
+                TrainingJobState.FINISHED
+            ).fetchall()
+            if len(finished_requests) <= retention:
+                return 0
+
+            # requests are finished in the order of the
+            # finished_at timestamp in their metadata
+            finished_at = {
+                training_request["request_id"]: json.loads(training_request["metadata"] or "{}").get("finished_at") or 0
+                for training_request in finished_requests
+            }
+            expired_requests = [
+                request_id for request_id in
+                sorted(finished_at, key=lambda request_id: finished_at[request_id], reverse=True)[max(retention, 0):]
+                if request_id not in keep_request_ids
+            ]
+            with conn:
+                conn.executemany(
+                    f"DELETE FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ? AND state IN ({placeholders})",
+                    [(request_id, *TrainingJobState.FINISHED) for request_id in expired_requests]
+                )
+            return len(expired_requests)
+        except Exception as e:
+            raise TrainingQueueException(e)
+
     def get_metadata(
             self,
             request_id: Text
     ) -> Text:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
-                metadata_row = conn.execute(
-                    f"SELECT metadata FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
-                    (request_id,)
-                ).fetchone()
-                conn.commit()
+            conn = self._connection()
+            metadata_row = conn.execute(
+                f"SELECT metadata FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
+                (request_id,)
+            ).fetchone()
 
             if not metadata_row:
                 raise MetadataRetrievalException()
@@ -227,14 +310,133 @@ class TrainingQueue:
             metadata: Text,
     ) -> bool:
         try:
-            training_q = self.training_queue
-            with sqlite3.connect(training_q) as conn:
-                conn.row_factory = sqlite3.Row
+            conn = self._connection()
+            with conn:
                 conn.execute(
                     f'UPDATE {TRAINING_QUEUE_TABLE} SET metadata = ? WHERE request_id = ?',
                     (metadata, request_id)
                 )
-                conn.commit()
             return True
         except Exception as e:
             raise TrainingQueueUpdateException(e)
+
+    def transition_state(
+            self,
+            request_id: Text,
+            from_states: List[Text],
+            to_state: Text,
+            metadata: Optional[Text] = None,
+    ) -> bool:
+        """
+        Moves a training request to a new state only
+        if it currently is in one of the given states.
+        the check and the update happen in a single
+        statement, so concurrent callers cannot both
+        win the same transition
+
+        Args:
+            request_id: request id of the training request
+            from_states: states the request is allowed to
+                be in for the transition to happen
+            to_state: new state of the training request
+            metadata: if specified, the metadata of the
+                request is replaced as part of the transition
+
+        Returns:
+            True if the request was transitioned, else False
+        """
+        try:
+            placeholders = ", ".join(["?"] * len(from_states))
+            conn = self._connection()
+            with conn:
+                if metadata is None:
+                    cursor = conn.execute(
+                        f'UPDATE {TRAINING_QUEUE_TABLE} SET state = ? '
+                        f'WHERE request_id = ? AND state IN ({placeholders})',
+                        (to_state, request_id, *from_states)
+                    )
+                else:
+                    cursor = conn.execute(
+                        f'UPDATE {TRAINING_QUEUE_TABLE} SET state = ?, metadata = ? '
+                        f'WHERE request_id = ? AND state IN ({placeholders})',
+                        (to_state, metadata, request_id, *from_states)
+                    )
+            return cursor.rowcount == 1
+        except Exception as e:
+            raise TrainingQueueUpdateException(e)
+
+    def get_request(
+            self,
+            request_id: Text
+    ) -> Dict:
+        try:
+            conn = self._connection()
+            training_request = conn.execute(
+                f"SELECT * FROM {TRAINING_QUEUE_TABLE} WHERE request_id = ?",
+                (request_id,)
+            ).fetchone()
+
+            if not training_request:
+                raise ProcessNotExistsException()
+            else:
+                return dict(training_request)
+        except ProcessNotExistsException:
+            raise
+        except Exception as e:
+            raise TrainingQueuePullException(e)
+
+    def next_pending(
+            self,
+    ) -> Optional[Dict]:
+        """
+        Returns the pending training request which should
+        be dispatched next. requests with a higher priority
+        go first, and requests sharing the same priority
+        are served in the order they were enqueued
+        """
+        try:
+            conn = self._connection()
+            training_request = conn.execute(
+                f"SELECT * FROM {TRAINING_QUEUE_TABLE} WHERE state = ? "
+                f"ORDER BY priority DESC, enqueued_at ASC, rowid ASC LIMIT 1",
+                (TrainingJobState.PENDING,)
+            ).fetchone()
+            return dict(training_request) if training_request else None
+        except Exception as e:
+            raise TrainingQueuePullException(e)
+
+    def count(
+            self,
+            state: Text,
+    ) -> int:
+        try:
+            conn = self._connection()
+            count_row = conn.execute(
+                f"SELECT COUNT(*) AS request_count FROM {TRAINING_QUEUE_TABLE} WHERE state = ?",
+                (state,)
+            ).fetchone()
+            return count_row['request_count']
+        except Exception as e:
+            raise TrainingQueuePullException(e)
+
+    def queue_position(
+            self,
+            request_id: Text,
+    ) -> int:
+        """
+        Returns the number of pending training requests
+        that will be dispatched before the given request
+        """
+        try:
+            conn = self._connection()
+            position_row = conn.execute(
+                f"SELECT COUNT(*) AS ahead FROM {TRAINING_QUEUE_TABLE} AS pending, "
+                f"{TRAINING_QUEUE_TABLE} AS target WHERE target.request_id = ? "
+                f"AND pending.state = ? AND (pending.priority > target.priority "
+                f"OR (pending.priority = target.priority AND (pending.enqueued_at < target.enqueued_at "
+                f"OR (pending.enqueued_at = target.enqueued_at AND pending.rowid < target.rowid))))",
+                (request_id, TrainingJobState.PENDING)
+            ).fetchone()
+            return position_row['ahead']
+        except Exception as e:
+            raise TrainingQueuePullException(e)
@@ -0,0 +1,415 @@
+import json
+import logging
+import os
+import platform
+import signal
+import subprocess
+import threading
+from datetime import datetime
+from typing import Text, Dict, NoReturn, Optional, Any, Iterator
+
+import psutil
+
+from rasa_codeless.core.training_queue import (
+    TrainingQueue,
+    kill_training_process_tree,
+)
+from rasa_codeless.core.training_logs import (
+    TrainingLogWriter,
+    tail_training_log,
+    prune_training_logs,
+)
+from rasa_codeless.core.training_workspace import (
+    TrainingWorkspace,
+    validate_request_id,
+    get_logged_epochs,
+)
+from rasa_codeless.shared.constants import (
+    DEFAULT_MODEL_PATH,
+    DEFAULT_MAX_CONCURRENT_TRAININGS,
+    DEFAULT_TRAINING_PRIORITY,
+    PROCESS_ID_NONE,
+    TRAINING_WORKSPACES_PATH,
+    TRAINING_LOGS_PATH,
+    TRAINING_LOG_RETENTION,
+    TENSORBOARD_INTENT_ACCURACY_TAG,
+    TENSORBOARD_INTENT_LOSS_TAG,
+    TensorboardDirectories,
+    TrainingJobState,
+)
+from rasa_codeless.shared.exceptions.server import (
+    ModelTrainException,
+    ProcessAlreadyExistsException,
+    ProcessNotExistsException,
+    ProcessTerminationException,
+)
+from rasa_codeless.utils.tensorboard_events import EventFileTailer
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingSupervisor:
+    """
+    Schedules and owns the `rasa train` subprocesses
+    spawned by the RASAC server. Jobs are admitted to
+    the training queue as pending and dispatched in
+    priority order, first in first out, whenever less
+    than `max_concurrent_trainings` jobs are running.
+    Each dispatched job runs on a daemon thread which
+    trains in an isolated workspace, waits for the
+    subprocess, persists the trained model into the
+    botstore and records the outcome in the training
+    queue
+    """
+
+    def __init__(
+            self,
+            training_queue: TrainingQueue,
+            botstore: Any,
+            max_concurrent_trainings: int = DEFAULT_MAX_CONCURRENT_TRAININGS,
+            models_path: Text = DEFAULT_MODEL_PATH,
+            workspaces_path: Text = TRAINING_WORKSPACES_PATH,
+            logs_path: Text = TRAINING_LOGS_PATH,
+    ):
+        self.training_queue = training_queue
+        self.botstore = botstore
+        self.max_concurrent_trainings = max_concurrent_trainings
+        self.models_path = models_path
+        self.workspaces_path = workspaces_path
+        self.logs_path = logs_path
+        self._dispatch_lock = threading.Lock()
+        # jobs whose worker has not exited yet. aborted
+        # jobs hold their training slot until then
+        self._active_jobs = set()
+        self._progress_lock = threading.Lock()
+        self._progress_tailers: Dict[Text, EventFileTailer] = dict()
+
+    def submit(
+            self,
+            request_id: Text,
+            config_content: Any,
+            priority: int = DEFAULT_TRAINING_PRIORITY,
+    ) -> Dict:
+        """
+        Admits a training job to the training queue,
+        dispatches it if a training slot is free and
+        returns its job handle right away
+
+        Args:
+            request_id: unique request id of the job
+            config_content: pipeline and policy configs
+                to train the model with
+            priority: jobs with a higher priority are
+                dispatched first
+
+        Returns:
+            job handle of the submitted job
+        """
+        validate_request_id(request_id=request_id)
+        admitted = self.training_queue.try_enqueue(
+            process_id=PROCESS_ID_NONE,
+            request_id=request_id,
+            timestamp=datetime.now().timestamp(),
+            metadata=json.dumps({"configs": config_content}),
+            state=TrainingJobState.PENDING,
+            priority=priority,
+        )
+        if not admitted:
+            logger.error("Model training request already exists in the Training Queue")
+            raise ProcessAlreadyExistsException()
+        logger.debug(f"Pushed training request {request_id} to training queue")
+
+        self._dispatch()
+        return self.status(request_id=request_id)
+
+    def status(self, request_id: Text) -> Dict:
+        training_request = self.training_queue.get_request(request_id=request_id)
+        metadata = json.loads(training_request["metadata"] or "{}")
+        state = training_request["state"]
+        return {
+            "request_id": request_id,
+            "state": state,
+            "priority": training_request["priority"],
+            "queue_position": self.training_queue.queue_position(request_id=request_id)
+            if state == TrainingJobState.PENDING else None,
+            "submitted_at": training_request["enqueued_at"],
+            "finished_at": metadata.get("finished_at"),
+            "latest_model": metadata.get("latest_model"),
+            "error": metadata.get("error"),
+        }
+
+    def abort(self, request_id: Text) -> NoReturn:
+        training_request = self.training_queue.get_request(request_id=request_id)
+        metadata = json.loads(training_request["metadata"] or "{}")
+        metadata["finished_at"] = datetime.now().timestamp()
+
+        aborted = self.training_queue.transition_state(
+            request_id=request_id,
+            from_states=[TrainingJobState.PENDING, TrainingJobState.RUNNING],
+            to_state=TrainingJobState.ABORTED,
+            metadata=json.dumps(metadata),
+        )
+        if not aborted:
+            logger.error("Removing finished training processes is not allowed")
+            raise ProcessNotExistsException()
+
+        # a job which is already dispatched but has not
+        # spawned its process yet terminates itself once
+        # it notices that it has been aborted. the worker
+        # dispatches the next job once the process exited
+        process_id = self.training_queue.get_pid(request_id=request_id)
+        if process_id != PROCESS_ID_NONE:
+            self._terminate(process_id=process_id)
+            logger.debug(f"Removed the existing process {process_id} with the request id: {request_id}")
+
+    def is_finished(self, request_id: Text) -> bool:
+        return self.training_queue.get_request(request_id=request_id)["state"] in TrainingJobState.FINISHED
+
+    def logs(self, request_id: Text) -> Iterator[Optional[Text]]:
+        """
+        Follows the training output of a job until
+        the job is finished. yields None as heartbeats
+        while the job is not producing any output
+        """
+        # raises if the job does not exist
+        self.training_queue.get_request(request_id=request_id)
+        return tail_training_log(
+            request_id=request_id,
+            is_finished=lambda: self.is_finished(request_id=request_id),
+            logs_path=self.logs_path,
+        )
+
+    def progress(self, request_id: Text) -> Dict:
+        """
+        Returns the epoch level progress of a running
+        training job, read incrementally from the
+        tensorboard event files of its workspace
+        """
+        training_request = self.training_queue.get_request(request_id=request_id)
+        state = training_request["state"]
+        progress = {
+            "request_id": request_id,
+            "state": state,
+            "epoch": None,
+            "total_epochs": None,
+            "train_acc": None,
+            "test_acc": None,
+            "train_loss": None,
+            "test_loss": None,
+            "eta": None,
+        }
+        if state != TrainingJobState.RUNNING:
+            return progress
+
+        with self._progress_lock:
+            tailer = self._progress_tailers.get(request_id)
+            if not tailer:
+                workspace = TrainingWorkspace(request_id=request_id, workspaces_path=self.workspaces_path)
+                tailer = self._progress_tailers[request_id] = EventFileTailer(logdir=workspace.logdir)
+            tailer.poll()
+
+            train_acc = tailer.latest(TensorboardDirectories.TRAIN, TENSORBOARD_INTENT_ACCURACY_TAG)
+            test_acc = tailer.latest(TensorboardDirectories.VALIDATION, TENSORBOARD_INTENT_ACCURACY_TAG)
+            train_loss = tailer.latest(TensorboardDirectories.TRAIN, TENSORBOARD_INTENT_LOSS_TAG)
+            test_loss = tailer.latest(TensorboardDirectories.VALIDATION, TENSORBOARD_INTENT_LOSS_TAG)
+
+        metadata = json.loads(training_request["metadata"] or "{}")
+        total_epochs = get_logged_epochs(config_content=metadata.get("configs"))
+        epoch = train_loss["count"] if train_loss else 0
+
+        progress.update({
+            "epoch": epoch,
+            "total_epochs": total_epochs,
+            "train_acc": train_acc["value"] if train_acc else None,
+            "test_acc": test_acc["value"] if test_acc else None,
+            "train_loss": train_loss["value"] if train_loss else None,
+            "test_loss": test_loss["value"] if test_loss else None,
+        })
+
+        # estimating the remaining time from the average
+        # epoch duration since the process was started
+        if epoch and total_epochs:
+            seconds_per_epoch = (train_loss["wall_time"] - training_request["ttimestamp"]) / epoch
+            seconds_since_last_epoch = datetime.now().timestamp() - train_loss["wall_time"]
+            progress["eta"] = max(
+                0.0,
+                seconds_per_epoch * (total_epochs - epoch) - seconds_since_last_epoch
+            )
+        return progress
+
+    def _prune_finished_jobs(self) -> NoReturn:
+        # the queue keeps as many finished jobs as their
+        # logs are kept for, so every job which can still
+        # be looked up has its log
+        try:
+            # aborted jobs keep writing their logs until
+            # their worker exits
+            with self._dispatch_lock:
+                active_jobs = set(self._active_jobs)
+            self.training_queue.prune_finished(retention=TRAINING_LOG_RETENTION, keep_request_ids=active_jobs)
+            unfinished_jobs = [
+                training_request["request_id"] for training_request in self.training_queue.inspect()
+                if training_request["state"] not in TrainingJobState.FINISHED
+            ]
+            prune_training_logs(
+                keep_request_ids=active_jobs.union(unfinished_jobs),
+                logs_path=self.logs_path,
+                retention=TRAINING_LOG_RETENTION,
+            )
+        except Exception as e:
+            logger.warning(f"Could not prune finished training jobs. {e}")
+
+    @staticmethod
+    def _terminate(process_id: int) -> NoReturn:
+        try:
+            if platform.system() == "Windows":
+                kill_training_process_tree(int(process_id))
+            else:
+                os.killpg(os.getpgid(int(process_id)), signal.SIGTERM)
+        except ProcessLookupError:
+            # the process exited in the meantime
+            logger.debug(f"Training process {process_id} has already exited")
+        except ProcessTerminationException:
+            if psutil.pid_exists(int(process_id)):
+                raise
+            logger.debug(f"Training process {process_id} has already exited")
+
+    def _dispatch(self) -> NoReturn:
+        with self._dispatch_lock:
+            while len(self._active_jobs) < self.max_concurrent_trainings:
+                training_request = self.training_queue.next_pending()
+                if not training_request:
+                    break
+
+                request_id = training_request["request_id"]
+                dispatched = self.training_queue.transition_state(
+                    request_id=request_id,
+                    from_states=[TrainingJobState.PENDING],
+                    to_state=TrainingJobState.RUNNING,
+                )
+                if not dispatched:
+                    continue
+
+                self._active_jobs.add(request_id)
+                config_content = json.loads(training_request["metadata"])["configs"]
+                worker = threading.Thread(
+                    target=self._run,
+                    args=(request_id, config_content),
+                    name=f"rasac-training-{request_id}",
+                    daemon=True,
+                )
+                worker.start()
+                logger.debug(f"Dispatched training job {request_id}")
+
+    def _finish(
+            self,
+            request_id: Text,
+            state: Text,
+            latest_model: Optional[Text] = None,
+            error: Optional[Text] = None,
+    ) -> NoReturn:
+        # an aborted job keeps its state even though
+        # its subprocess exits with an error afterwards
+        self.training_queue.transition_state(
+            request_id=request_id,
+            from_states=[TrainingJobState.RUNNING],
+            to_state=state,
+            metadata=json.dumps({
+                "latest_model": latest_model,
+                "error": error,
+                "finished_at": datetime.now().timestamp(),
+            }),
+        )
+
+    def _run(self, request_id: Text, config_content: Any) -> NoReturn:
+        workspace = None
+        log_writer = None
+        try:
+            # each job trains in its own workspace so that
+            # concurrent jobs do not share config.yml, the
+            # models dir or the tensorboard logdir
+            workspace = TrainingWorkspace(request_id=request_id, workspaces_path=self.workspaces_path)
+            workspace.create()
+            workspace.write_config(config_content=config_content)
+
+            log_writer = TrainingLogWriter(request_id=request_id, logs_path=self.logs_path)
+
+            # creating the training process. stderr is
+            # merged into stdout so that the whole output
+            # can be streamed to the job log in order
+            if platform.system() == "Windows":
+                sub_p = subprocess.Popen(
+                    workspace.train_command(),
+                    shell=True,
+                    stderr=subprocess.STDOUT,
+                    stdout=subprocess.PIPE,
+                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
+                )
+            else:
+                sub_p = subprocess.Popen(
+                    workspace.train_command(),
+                    shell=True,
+                    stderr=subprocess.STDOUT,
+                    stdout=subprocess.PIPE,
+                    preexec_fn=os.setsid
+                )
+
+            # saving request and process id to process queue
+            process_id = sub_p.pid
+            self.training_queue.update_pid(
+                process_id=process_id,
+                request_id=request_id,
+                timestamp=datetime.now().timestamp()
+            )
+            logger.debug(f"Updated training queue of {request_id} with process id {process_id}")
+
+            # the job might have been aborted before
+            # its process id was recorded
+            if self.training_queue.get_request(request_id=request_id)["state"] == TrainingJobState.ABORTED:
+                self._terminate(process_id=process_id)
+
+            # streaming the output to the job log and
+            # grabbing return code from the subprocess
+            for line in sub_p.stdout:
+                log_writer.write(line.decode("utf-8", errors="replace"))
+            return_code = sub_p.wait()
+            logger.debug(f"Training output was written to {log_writer.log_path}. Return Code: {return_code}")
+
+            if return_code != 0:
+                raise ModelTrainException(
+                    "Training was cancelled during execution. Please "
+                    "check if the virtual environment is functioning."
+                )
+
+            # persisting the model files and moving
+            # the model into the models dir
+            latest_model = workspace.promote(
+                botstore=self.botstore,
+                models_path=self.models_path,
+            )
+
+            self._finish(
+                request_id=request_id,
+                state=TrainingJobState.COMPLETED,
+                latest_model=latest_model,
+            )
+            logger.info(f"Training job {request_id} completed. Latest model: {latest_model}")
+        except ModelTrainException as e:
+            logger.exception(f"Exception occurred while training a new model under the "
+                             f"request id {request_id}. {e}")
+            self._finish(request_id=request_id, state=TrainingJobState.FAILED, error="model")
+        except Exception as e:
+            logger.exception(f"Exception occurred while training a new model under the "
+                             f"request id {request_id}. {e}")
+            self._finish(request_id=request_id, state=TrainingJobState.FAILED, error="unknown")
+        finally:
+            with self._progress_lock:
+                self._progress_tailers.pop(request_id, None)
+            if log_writer:
+                log_writer.close()
+            self._prune_finished_jobs()
+            if workspace:
+                workspace.cleanup()
+            with self._dispatch_lock:
+                self._active_jobs.discard(request_id)
+            self._dispatch()
@@ -0,0 +1,174 @@
+import copy
+import logging
+import os
+import re
+import shutil
+from typing import Text, NoReturn, Any, Dict, Optional
+
+from rasa_codeless.shared.constants import (
+    DEFAULT_MODEL_PATH,
+    DEFAULT_RASA_CONFIG_PATH,
+    DEFAULT_TENSORBOARD_LOGDIR,
+    TRAINING_WORKSPACES_PATH,
+    TRAINING_WORKSPACE_CONFIG,
+    TRAINING_REQUEST_ID_REGEX,
+    TENSORBOARD_LOG_DIRECTORY_TAG,
+    EPOCHS_TAG,
+    FilePermission,
+)
+from rasa_codeless.shared.exceptions.server import (
+    InvalidRequestIDException,
+    ModelTrainException,
+)
+from rasa_codeless.utils.io import (
+    write_yaml_file,
+    get_latest_model_name,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def validate_request_id(request_id: Text) -> NoReturn:
+    # request ids end up in workspace and log paths
+    if not request_id or not re.fullmatch(TRAINING_REQUEST_ID_REGEX, str(request_id)):
+        raise InvalidRequestIDException(f"Invalid training request id: {request_id}")
+
+
+def get_logged_epochs(config_content: Any) -> Optional[int]:
+    """
+    Returns the number of epochs the components
+    which log to tensorboard are configured to train
+    for, or None if it is not configured explicitly
+    """
+    logged_epochs = None
+    if isinstance(config_content, Dict):
+        for section in config_content.values():
+            if not isinstance(section, list):
+                continue
+            for component in section:
+                if isinstance(component, Dict) and TENSORBOARD_LOG_DIRECTORY_TAG in component \
+                        and isinstance(component.get(EPOCHS_TAG), int):
+                    logged_epochs = max(logged_epochs or 0, component[EPOCHS_TAG])
+    return logged_epochs
+
+
+class TrainingWorkspace:
+    """
+    Scratch directory of a single training job. A
+    job trains with its own config, model output dir
+    and tensorboard logdir inside the workspace, so
+    that concurrent jobs never write to the shared
+    project files. Only the finished artifacts are
+    moved into the models dir and the botstore
+    """
+
+    def __init__(
+            self,
+            request_id: Text,
+            workspaces_path: Text = TRAINING_WORKSPACES_PATH,
+    ):
+        validate_request_id(request_id=request_id)
+        self.request_id = request_id
+        self.root = os.path.join(workspaces_path, request_id)
+        self.config_path = os.path.join(self.root, DEFAULT_RASA_CONFIG_PATH)
+        self.train_config_path = os.path.join(self.root, TRAINING_WORKSPACE_CONFIG)
+        self.models_path = os.path.join(self.root, DEFAULT_MODEL_PATH)
+        self.logdir = os.path.join(self.root, DEFAULT_TENSORBOARD_LOGDIR)
+
+    def create(self) -> NoReturn:
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root)
+        os.makedirs(self.models_path)
+        os.makedirs(self.logdir)
+        logger.debug(f"Created training workspace {self.root}")
+
+    def write_config(self, config_content: Any) -> NoReturn:
+        """
+        Writes the pipeline and policy configs of the
+        job into the workspace. the config handed to
+        rasa train redirects the tensorboard logs of the
+        components which have logging enabled to the
+        workspace logdir, which is removed after the job.
+        the config persisted with the model is kept as
+        given
+
+        Args:
+            config_content: pipeline and policy configs
+                to train the model with
+        """
+        write_yaml_file(
+            yaml_file=self.config_path,
+            yaml_content=config_content,
+            mode=FilePermission.WRITE_PLUS
+        )
+
+        train_config_content = copy.deepcopy(config_content)
+        if isinstance(train_config_content, Dict):
+            for section in train_config_content.values():
+                if not isinstance(section, list):
+                    continue
+                for component in section:
+                    if isinstance(component, Dict) and TENSORBOARD_LOG_DIRECTORY_TAG in component:
+                        component[TENSORBOARD_LOG_DIRECTORY_TAG] = self.logdir
+
+        write_yaml_file(
+            yaml_file=self.train_config_path,
+            yaml_content=train_config_content,
+            mode=FilePermission.WRITE_PLUS
+        )
+
+    def train_command(self) -> Text:
+        return f"rasa train --config {self.train_config_path} --out {self.models_path}"
+
+    def promote(
+            self,
+            botstore: Any,
+            models_path: Text = DEFAULT_MODEL_PATH,
+    ) -> Text:
+        """
+        Persists the model trained in the workspace
+        into the botstore and moves it into the models
+        dir. the model only becomes visible once its
+        botstore assets are in place
+
+        Args:
+            botstore: botstore to persist the model in
+            models_path: models dir of the project
+
+        Returns:
+            name of the promoted model
+        """
+        trained_model = get_latest_model_name(models_path=self.models_path)
+        if not trained_model:
+            raise ModelTrainException(f"Training job {self.request_id} did not produce a model")
+
+        # models are named after the time they were
+        # trained at, which jobs can share. the name is
+        # reserved, so jobs promoting at once never
+        # overwrite each other's models
+        model_name = botstore.reserve_model_name(model_name=trained_model)
+
+        botstore.persist_model(
+            model_name=model_name,
+            asset_sources={
+                DEFAULT_RASA_CONFIG_PATH: self.config_path,
+                DEFAULT_TENSORBOARD_LOGDIR: self.logdir,
+            }
+        )
+        try:
+            os.makedirs(models_path, exist_ok=True)
+            shutil.move(
+                src=os.path.join(self.models_path, trained_model),
+                dst=os.path.join(models_path, model_name),
+            )
+        except Exception:
+            # leaves the botstore dir to the botstore janitor
+            botstore.release_model(model_name=model_name)
+            raise
+        botstore.register_model(model_name=model_name)
+        logger.debug(f"Promoted model {model_name} from training workspace {self.root}")
+        return model_name
+
+    def cleanup(self) -> NoReturn:
+        shutil.rmtree(self.root, ignore_errors=True)
+        logger.debug(f"Removed training workspace {self.root}")
@@ -15,8 +15,11 @@ from rasa_codeless.shared.constants import (
     TermColor,
     RASA_CODELESS_PROJECT_DIRS,
     LOGGING_FORMAT_STR,
-    DOTENV_FILES
+    DOTENV_FILES,
+    PersistMode,
+    BotStoreBackend,
 )
+from rasa_codeless.shared.exceptions.config import InvalidConfigValueException
 from rasa_codeless.shared.exceptions.server import RASACQueueException
 from rasa_codeless.utils.config import get_init_configs
 from rasa_codeless.utils.io import set_cli_color, dir_exists
@@ -75,6 +78,28 @@ def create_argument_parser():
         type=int,
         help="the port to start the RASAC server at.",
     )
+    parser_server.add_argument(
+        "--max-concurrent-trainings",
+        type=int,
+        help="the maximum number of models the RASAC server trains at once.",
+    )
+    parser_server.add_argument(
+        "--watch-botstore",
+        action="store_true",
+        help="keeps the botstore model list in sync with models added or removed outside the RASAC server.",
+    )
+    parser_server.add_argument(
+        "--persist-mode",
+        choices=PersistMode.VALID_MODES,
+        help="how the RASAC server places project files into the botstore. auto tries reflinks, "
+             "then hard links, then copies.",
+    )
+    parser_server.add_argument(
+        "--botstore-backend",
+        choices=BotStoreBackend.VALID_BACKENDS,
+        help="where the RASAC server keeps the botstore catalog. mongodb and write_through "
+             "also store model scores and configs in MongoDB.",
+    )
     parser_server.add_argument(
         "--debug",
         action="store_true",
@@ -183,6 +208,10 @@ def run_rasac() -> NoReturn:
 
         elif str.lower(interface) == InterfaceType.SERVER:
             server_port = cmdline_args.port
+            max_concurrent_trainings = cmdline_args.max_concurrent_trainings
+            watch_botstore = cmdline_args.watch_botstore
+            persist_mode = cmdline_args.persist_mode
+            botstore_backend = cmdline_args.botstore_backend
             debug_mode = cmdline_args.debug
             quiet_mode = cmdline_args.quiet
 
@@ -197,6 +226,10 @@ def run_rasac() -> NoReturn:
                 rasa_config_path=DEFAULT_RASA_CONFIG_PATH,
                 port=server_port,
                 interface=InterfaceType.SERVER,
+                max_concurrent_trainings=max_concurrent_trainings,
+                watch_botstore=watch_botstore,
+                persist_mode=persist_mode,
+                botstore_backend=botstore_backend,
             )
 
             rasac_server = RASACServer(
@@ -208,6 +241,9 @@ def run_rasac() -> NoReturn:
     except RASACQueueException as e:
         logger.error(f"Failed to Initialize the Training Queue. {e}")
         exit(1)
+    except InvalidConfigValueException as e:
+        logger.error(f"Failed to start the RASAC server. {e}")
+        exit(1)
     except KeyboardInterrupt:
         logger.info(f"Gracefully terminating RASAC CLI...")
 
@@ -44,13 +44,16 @@ def register_blueprints(app):
 
 def create_app(configs: Dict = None):
     app = Flask(__name__, static_folder='frontend', template_folder='frontend')
-    register_blueprints(app=app)
 
-    # updating initial server configs
+    # updating initial server configs. configs
+    # are set before registering blueprints so
+    # that blueprints can configure themselves
     if configs:
         for config_key, config_value in configs.items():
             app.config[config_key] = config_value
 
+    register_blueprints(app=app)
+
     # allowing all cross-origins
     CORS(app)
 
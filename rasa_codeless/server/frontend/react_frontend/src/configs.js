@@ -16,6 +16,7 @@ export const configs = {
   downloadModelEndpoint: `${api}/api/rasac/botstore/models/`,
   deleteModelEndpoint: `${api}/api/rasac/botstore/models/`,
   nluDataEndpoint: `${api}/api/rasac/botstore/nlu/`,
+  trainingJobPollInterval: 2000,
   
   snackbarVerticalPosition: "bottom",
   snackbarHorizontalPostion: "left",
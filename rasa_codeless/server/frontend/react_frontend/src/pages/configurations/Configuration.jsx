@@ -2398,10 +2398,10 @@ export default function Configurations({
               openUnknownModelFailAlert(true);
             }
           } else {
-            // no error
-            setModelTrainLoading(false);
-            setOpenTraingModelSuccessAlert(true);
-            // TODO :update the model list in the models page (must share a global state)
+            // no error. the server returns a job handle
+            // right away, so the job is polled until it
+            // is finished
+            pollTrainingJob(request_id);
           }
         })
         .catch((err) => {
@@ -2416,6 +2416,47 @@ export default function Configurations({
     }
   };
 
+  const pollTrainingJob = (request_id) => {
+    axios
+      .get(`${configs.trainModelEndpoint}/${request_id}`)
+      .then((res) => {
+        const data = res.data;
+
+        if (Object.hasOwn(data, "status")) {
+          // error has occcured
+          setModelTrainLoading(false);
+          setOpenUnknownModelFailAlert(true);
+          return;
+        }
+
+        const job = data["job"];
+        if (job["state"] === "pending" || job["state"] === "running") {
+          setTimeout(
+            () => pollTrainingJob(request_id),
+            configs.trainingJobPollInterval
+          );
+          return;
+        }
+
+        setModelTrainLoading(false);
+        if (job["state"] === "completed") {
+          setOpenTraingModelSuccessAlert(true);
+          // TODO :update the model list in the models page (must share a global state)
+        } else if (job["state"] === "failed") {
+          if (job["error"] === "model") {
+            setOpenTraingModelFailAlert(true);
+          } else {
+            setOpenUnknownModelFailAlert(true);
+          }
+        }
+        // aborted jobs are reported by abortTrain
+      })
+      .catch((err) => {
+        setModelTrainLoading(false);
+        setOpenTraingModelFailAlert(true);
+      });
+  };
+
   let [configData, setConfigData] = React.useState([]);
 
   const setConfigs = async (model) => {
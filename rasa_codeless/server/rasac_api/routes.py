@@ -1,58 +1,95 @@
+import itertools
 import logging
-import os
-import platform
-import signal
-import subprocess
-from datetime import datetime
+import threading
 
 from flask import (
     request,
     send_file,
+    Response,
 )
 from flask_cors import cross_origin
 from ruamel import yaml as yaml
 
+from rasa_codeless.core.botstore.botstore_factory import create_botstore
+from rasa_codeless.core.botstore.botstore_watcher import BotStoreWatcher
 from rasa_codeless.core.botstore.local_botstore import LocalBotStore
-from rasa_codeless.core.training_queue import (
-    TrainingQueue,
-    kill_training_process_tree,
-)
+from rasa_codeless.core.training_queue import TrainingQueue
+from rasa_codeless.core.training_supervisor import TrainingSupervisor
 from rasa_codeless.server.rasac_api import blueprint
 from rasa_codeless.shared.constants import (
-    DEFAULT_RASA_CONFIG_PATH,
-    DEFAULT_MODEL_PATH,
     DEFAULT_TENSORBOARD_LOGDIR,
     DEFAULT_DATA_PATH,
     TRAINING_QUEUE,
 )
 from rasa_codeless.shared.constants import (
-    PROCESS_ID_NONE,
-    FilePermission,
-)
-from rasa_codeless.shared.exceptions.server import (
-    ModelTrainException,
+    DEFAULT_TRAINING_PRIORITY,
+    DEFAULT_PERSIST_MODE,
+    DEFAULT_BOTSTORE_BACKEND,
+    MONGODB_READ_BATCH_SIZE,
+    TRAINING_LOG_MAX_STREAMS,
+    TrainingJobState,
+    Config,
+    BotStoreSortKey,
+    BotStoreSortOrder,
+    BotStoreBackend,
 )
 from rasa_codeless.shared.exceptions.server import (
-    ProcessAlreadyExistsException,
     ProcessNotExistsException,
     InvalidProcessIDException,
     ProcessTerminationException,
     InvalidRequestIDException,
 )
+from rasa_codeless.shared.exceptions.botstore import (
+    InvalidBotStoreQueryException,
+    ModelNotAvailableException,
+)
+from rasa_codeless.shared.exceptions.core import InvalidModelException
 from rasa_codeless.shared.nlu.nlu_data import NLUData
+from rasa_codeless.utils.config import get_max_concurrent_trainings
 from rasa_codeless.utils.io import (
-    dir_cleanup,
     dir_exists,
     create_dir,
-    write_yaml_file,
-    get_latest_model_name,
 )
 
 logger = logging.getLogger()
 yml = yaml.YAML()
 yml.indent(mapping=2, sequence=4, offset=2)
 training_q = TrainingQueue(data_source_path=TRAINING_QUEUE)
-botstore = LocalBotStore()
+local_botstore = LocalBotStore()
+botstore = local_botstore
+training_supervisor = TrainingSupervisor(training_queue=training_q, botstore=botstore)
+botstore_watcher = BotStoreWatcher(botstore=local_botstore)
+log_streams = threading.BoundedSemaphore(TRAINING_LOG_MAX_STREAMS)
+
+
+@blueprint.record_once
+def configure_training_supervisor(setup_state):
+    rasac_configs = setup_state.app.config.get("RASAC") or dict()
+    server_configs = rasac_configs.get(Config.SERVER_CONFIGS_KEY) or dict()
+    training_supervisor.max_concurrent_trainings = \
+        get_max_concurrent_trainings(server_configs.get(Config.MAX_CONCURRENT_TRAININGS_KEY))
+    logger.debug(f"Training supervisor allows {training_supervisor.max_concurrent_trainings} "
+                 f"concurrent trainings")
+
+    local_botstore.persist_mode = server_configs.get(Config.PERSIST_MODE_KEY) or DEFAULT_PERSIST_MODE
+    logger.debug(f"Botstore persists models in {local_botstore.persist_mode} mode")
+
+    # models are always kept in the local botstore, which
+    # other backends use as their cache
+    global botstore
+    backend = server_configs.get(Config.BOTSTORE_BACKEND_KEY) or DEFAULT_BOTSTORE_BACKEND
+    try:
+        botstore = create_botstore(backend=backend, local_botstore=local_botstore)
+        if backend != BotStoreBackend.LOCAL:
+            botstore.start_sync()
+        logger.debug(f"Botstore uses the {backend} backend")
+    except Exception as e:
+        logger.exception(f"Could not create the {backend} botstore backend. Using the local botstore. {e}")
+        botstore = local_botstore
+    training_supervisor.botstore = botstore
+
+    if server_configs.get(Config.WATCH_BOTSTORE_KEY):
+        botstore_watcher.start()
 
 
 @blueprint.route("/bot/train", methods=['POST'])
@@ -79,108 +116,102 @@ def train_model():
         # clearing botstore cache
         botstore.clear_cache()
 
-        # checking if request id is already
-        # present in the process queue
-        process_exists = training_q.check_existence(request_id=request_id)
-        if process_exists:
-            logger.exception("Model training request already exists in the Training Queue")
-            raise ProcessAlreadyExistsException()
-
-        training_q.push(
-            process_id=PROCESS_ID_NONE,
-            request_id=request_id,
-            timestamp=datetime.now().timestamp(),
-            metadata="",
-        )
-        logger.debug(f"Pushed training request {request_id} to training queue")
-
-        # clean up 'tensorboard' dir
-        dir_cleanup(DEFAULT_TENSORBOARD_LOGDIR)
-
-        # overwriting the config.yml file with the
-        # new pipeline and policy configurations
-        write_yaml_file(
-            yaml_file=DEFAULT_RASA_CONFIG_PATH,
-            yaml_content=config_content,
-            mode=FilePermission.WRITE_PLUS
-        )
-
-        # creating the training process
-        if platform.system() == "Windows":
-            sub_p = subprocess.Popen(
-                "rasa train",
-                shell=True,
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
-            )
-        else:
-            sub_p = subprocess.Popen(
-                "rasa train",
-                shell=True,
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                preexec_fn=os.setsid
-            )
-
-        # saving request and process id to process queue
-        process_id = sub_p.pid
-        training_q.update_pid(
-            process_id=process_id,
-            request_id=request_id,
-            timestamp=datetime.now().timestamp()
-        )
-        logger.debug(f"Updated training queue of {request_id} with process id {process_id}")
-
-        # grabbing return code from the subprocess
-        out, err = sub_p.communicate()
-        out, err = out.decode("utf-8"), err.decode("utf-8")
-        return_code = sub_p.returncode
-        logger.debug(f"Stdout: {out} \nStderr: {err} \nReturn Code: {return_code}")
-
-        if return_code != 0:
-            raise ModelTrainException(
-                "Training was cancelled during execution. Please "
-                "check if the virtual environment is functioning."
-            )
-
-        # removing from process queue after process is executed
-        training_q.remove(request_id=request_id)
-        logger.debug(f"Process {process_id} under request id "
-                     f"{request_id} was removed from training queue")
-
-        # retrieving the latest model
-        latest_model = get_latest_model_name(models_path=DEFAULT_MODEL_PATH)
-
-        # persisting the model files
-        botstore.persist_model(model_name=latest_model)
+        priority = int(request_data['priority']) \
+            if 'priority' in request_data else DEFAULT_TRAINING_PRIORITY
 
+        # the training supervisor queues the request
+        # and owns the training process once it is
+        # dispatched. progress can be polled using
+        # /bot/train/<request_id>
         return {
-                   "model_list": botstore.model_performance(curve=False, sort=True),
-                   "latest_model": latest_model
+                   "job": training_supervisor.submit(
+                       request_id=request_id,
+                       config_content=config_content,
+                       priority=priority,
+                   )
                }, 200
-    except ModelTrainException as e:
-        # removing the inserted process from the training queue
-        if request_id_for_exception_handling:
-            training_q.remove(request_id=request_id_for_exception_handling)
-
-        logger.exception(f"Exception occurred while training a new model under the "
+    except Exception as e:
+        logger.exception(f"Exception occurred while submitting a new training job under the "
                          f"request id {request_id_for_exception_handling}. {e}")
         return {
                    "status": "error",
-                   "response": "model"
+                   "response": "unknown"
                }, 200
+
+
+@blueprint.route("/bot/train/<request_id>", methods=['GET'])
+@cross_origin()
+def training_status(request_id):
+    try:
+        job = training_supervisor.status(request_id=request_id)
+        if job["state"] == TrainingJobState.COMPLETED:
+            return {
+                       "job": job,
+                       "model_list": botstore.model_performance(curve=False, sort=True),
+                       "latest_model": job["latest_model"]
+                   }, 200
+        return {"job": job}, 200
+    except ProcessNotExistsException as e:
+        logger.exception(f"Training job {request_id} does not exist. {e}")
+        return {"status": "error"}, 200
     except Exception as e:
-        # removing the inserted process from the training queue
-        if request_id_for_exception_handling:
-            training_q.remove(request_id=request_id_for_exception_handling)
+        logger.exception(f"Exception occurred while retrieving the training job status. {e}")
+        return {"status": "error"}, 200
 
-        logger.exception(f"Exception occurred while training a new model under the "
-                         f"request id {request_id_for_exception_handling}. {e}")
+
+@blueprint.route("/bot/train/<request_id>/progress", methods=['GET'])
+@cross_origin()
+def training_progress(request_id):
+    try:
+        return {"progress": training_supervisor.progress(request_id=request_id)}, 200
+    except ProcessNotExistsException as e:
+        logger.exception(f"Training job {request_id} does not exist. {e}")
+        return {"status": "error"}, 200
+    except Exception as e:
+        logger.exception(f"Exception occurred while retrieving the training progress. {e}")
+        return {"status": "error"}, 200
+
+
+@blueprint.route("/bot/train/<request_id>/logs", methods=['GET'])
+@cross_origin()
+def training_logs(request_id):
+    # each stream holds a server thread until the job
+    # is finished or the client disconnects
+    if not log_streams.acquire(blocking=False):
+        logger.error(f"Refused to stream the training logs of {request_id}. "
+                     f"{TRAINING_LOG_MAX_STREAMS} log streams are already open")
         return {
                    "status": "error",
-                   "response": "unknown"
-               }, 200
+                   "response": "too many log streams"
+               }, 429
+
+    try:
+        log_lines = training_supervisor.logs(request_id=request_id)
+
+        def stream_logs():
+            for line in log_lines:
+                # comments keep idle connections alive
+                yield ": heartbeat\n\n" if line is None else f"data: {line}\n\n"
+            yield f"event: end\ndata: {training_supervisor.status(request_id=request_id)['state']}\n\n"
+
+        response = Response(
+            stream_logs(),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            }
+        )
+        response.call_on_close(log_streams.release)
+        return response
+    except ProcessNotExistsException as e:
+        log_streams.release()
+        logger.exception(f"Training job {request_id} does not exist. {e}")
+        return {"status": "error"}, 200
+    except Exception as e:
+        log_streams.release()
+        logger.exception(f"Exception occurred while streaming the training logs. {e}")
+        return {"status": "error"}, 200
 
 
 @blueprint.route("/bot/abort", methods=['POST'])
@@ -200,21 +231,11 @@ def abort_train():
             logger.exception("Removing non-existing training processes is not allowed")
             raise ProcessNotExistsException()
 
-        # retrieving process_id
-        training_process_id = training_q.get_pid(request_id=request_id)
-        logger.debug(f"Confirmed the existence of the process {training_process_id} "
-                     f"with the request id: {request_id}")
+        logger.debug(f"Confirmed the existence of the training request: {request_id}")
 
-        if platform.system() == "Windows":
-            kill_training_process_tree(int(training_process_id))
-        else:
-            os.killpg(os.getpgid(int(training_process_id)), signal.SIGTERM)
-        logger.debug(f"Removed the existing process {training_process_id} with the request id: {request_id}")
-
-        # updating the training queue
-        training_q.remove(request_id=request_id)
-        logger.debug(f"Removed process from training queue. [process id: "
-                     f"{training_process_id}, request id: {request_id}]")
+        # terminating the process and updating
+        # the training queue
+        training_supervisor.abort(request_id=request_id)
 
         # clearing cached botstore models
         botstore.clear_cache()
@@ -235,19 +256,86 @@ def abort_train():
         return {"status": "error"}, 200
 
 
+def get_botstore_query(query_args) -> dict:
+    # limit, cursor, sort_by, order and min_<score> /
+    # max_<score> thresholds of the botstore model list
+    order = query_args.get("order", BotStoreSortOrder.DESC)
+    if order not in BotStoreSortOrder.VALID_ORDERS:
+        raise InvalidBotStoreQueryException(f"Invalid order: {order}")
+
+    try:
+        limit = query_args.get("limit", type=int)
+        if "limit" in query_args and limit is None:
+            raise ValueError(query_args.get("limit"))
+        min_scores, max_scores = dict(), dict()
+        for score_key in BotStoreSortKey.SCORE_KEYS:
+            if f"min_{score_key}" in query_args:
+                min_scores[score_key] = float(query_args[f"min_{score_key}"])
+            if f"max_{score_key}" in query_args:
+                max_scores[score_key] = float(query_args[f"max_{score_key}"])
+    except ValueError as e:
+        raise InvalidBotStoreQueryException(f"Invalid botstore query parameter: {e}")
+
+    return {
+        "sort_by": query_args.get("sort_by", BotStoreSortKey.TIMESTAMP),
+        "descending": order == BotStoreSortOrder.DESC,
+        "min_scores": min_scores,
+        "max_scores": max_scores,
+        "limit": limit,
+        "cursor": query_args.get("cursor"),
+    }
+
+
 @blueprint.route("/botstore/models", methods=['GET'])
 @cross_origin()
 def botstore_models():
     try:
+        model_list, next_cursor = botstore.model_summaries(**get_botstore_query(query_args=request.args))
         return {
-                   "model_list": botstore.model_performance(curve=False, sort=True),
+                   "model_list": model_list,
+                   "next_cursor": next_cursor,
                    "latest_model": botstore.get_models(latest_only=True)
                }, 200
+    except InvalidBotStoreQueryException as e:
+        logger.error(f"Invalid botstore model list query. {e}")
+        return {"status": "error"}, 200
     except Exception as e:
         logger.exception(f"Exception occurred while retrieving the list of models. {e}")
         return {"status": "error"}, 200
 
 
+@blueprint.route("/botstore/records/<record_type>", methods=['GET'])
+@cross_origin()
+def botstore_records(record_type):
+    if not botstore.supports_records:
+        logger.error(f"The {type(botstore).__name__} backend does not keep records")
+        return {"status": "error"}, 200
+
+    try:
+        batch_size = request.args.get("batch_size", default=MONGODB_READ_BATCH_SIZE, type=int)
+        fields = request.args.get("fields")
+        records = botstore.export_records(
+            record_type=record_type,
+            batch_size=batch_size,
+            fields=fields.split(",") if fields else None,
+            start_after=request.args.get("start_after"),
+        )
+
+        # the first record is read before responding, so
+        # that a failing query still returns an error
+        first_record = next(records, None)
+        return Response(
+            itertools.chain([first_record] if first_record else [], records),
+            mimetype="application/x-ndjson",
+        )
+    except InvalidBotStoreQueryException as e:
+        logger.error(f"Invalid botstore record query. {e}")
+        return {"status": "error"}, 200
+    except Exception as e:
+        logger.exception(f"Exception occurred while streaming botstore records. {e}")
+        return {"status": "error"}, 200
+
+
 @blueprint.route("/botstore/curve/<model>", methods=['POST'])
 @cross_origin()
 def botstore_curves(model):
@@ -278,7 +366,31 @@ def botstore_configs(model):
 def delete_model(model):
     if request.method == 'GET':
         try:
-            return send_file(botstore.get_model_path(model_name=model), as_attachment=True)
+            if not botstore.model_exists(model_name=model):
+                raise InvalidModelException()
+
+            # conditional responses answer Range and If-Range
+            # requests, and the file is streamed through
+            # wsgi.file_wrapper
+            return send_file(
+                botstore.get_model_path(model_name=model),
+                as_attachment=True,
+                conditional=True,
+                etag=botstore.model_digest(model_name=model),
+            )
+        except InvalidModelException as e:
+            logger.error(f"Model {model} does not exist. {e}")
+            return {
+                       "status": "error",
+                       "response": "model not found"
+                   }, 404
+        except ModelNotAvailableException as e:
+            # the catalog lists models other servers trained
+            logger.error(f"{e}")
+            return {
+                       "status": "error",
+                       "response": "model not available on this server"
+                   }, 404
         except Exception as e:
             logger.exception(f"Exception occurred while attempting to download the specified model. {e}")
             return {"status": "error"}, 200
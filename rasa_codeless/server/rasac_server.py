@@ -8,6 +8,7 @@ from rasa_codeless.server import create_app
 from rasa_codeless.shared.constants import (
     DEFAULT_PORT,
     DEFAULT_HOST_LOCAL,
+    DEFAULT_SERVER_THREADS,
     RASAC_ASCII_LOGO,
     ServerEnv,
     Config,
@@ -70,10 +71,13 @@ class RASACServer:
             else:
                 logger.info("Deploying RASAC Server in production mode...")
                 print(RASAC_ASCII_LOGO)
+                # training log streams hold a thread each
+                # for as long as they are followed
                 waitress_serve(
                     create_app(configs=app_config),
                     host=self.host,
-                    port=self.port
+                    port=self.port,
+                    threads=DEFAULT_SERVER_THREADS,
                 )
 
                 # # Run as a shell command if required
@@ -31,6 +31,9 @@ class LoggingLevel:
 
 # SERVER
 DEFAULT_PORT = 6069
+# should exceed TRAINING_LOG_MAX_STREAMS by the number
+# of requests expected to be served at the same time
+DEFAULT_SERVER_THREADS = 8
 DEFAULT_HOST_DEC = "0.0.0.0"
 DEFAULT_HOST_LOCAL = "localhost"
 RASAC_ASCII_LOGO = """
@@ -106,6 +109,9 @@ class Encoding:
     UTF8 = "utf8"
 
 
+FILE_DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
 # TERMINAL
 class TermColor:
     # source:
@@ -158,9 +164,15 @@ class Config:
     CONFIG_PATH_KEY = "rasa_config_path"
     HOST_KEY = "host"
     PORT_KEY = "port"
+    MAX_CONCURRENT_TRAININGS_KEY = "max_concurrent_trainings"
+    WATCH_BOTSTORE_KEY = "watch_botstore"
+    PERSIST_MODE_KEY = "persist_mode"
+    BOTSTORE_BACKEND_KEY = "botstore_backend"
     VALID_MAIN_KEYS = ["rasac_base_configs", "rasac_server_configs"]
     VALID_BASE_KEYS = ["config_path"]
-    VALID_SERVER_KEYS = ["host", "port"]
+    VALID_SERVER_KEYS = [
+        "host", "port", "max_concurrent_trainings", "watch_botstore", "persist_mode", "botstore_backend"
+    ]
 
 
 class ConfigType:
@@ -194,16 +206,61 @@ TENSORBOARD_INTENT_ACCURACY_TAG = "epoch_i_acc"
 TENSORBOARD_INTENT_LOSS_TAG = "epoch_t_loss"
 TENSORBOARD_SIMPLE_VALUE_TAG = "simple_value"
 TENSORBOARD_RESULTS_FILE_EXTENSION = "*.v2"
+TENSORBOARD_LOG_DIRECTORY_TAG = "tensorboard_log_directory"
+TENSORBOARD_SCALARS_CACHE_FILE = ".rasac_scalars.json"
+TENSORBOARD_SCALARS_CACHE_VERSION = 1
 
 
 # TRAINING QUEUE
 PROCESS_ID_NONE = -99
 TRAINING_QUEUE = os.path.join("rasac_cache", "training_queue.db")
 TRAINING_QUEUE_TABLE = "training_queue"
+TRAINING_QUEUE_BUSY_TIMEOUT = 10
+DEFAULT_MAX_CONCURRENT_TRAININGS = 1
+DEFAULT_TRAINING_PRIORITY = 0
+TRAINING_WORKSPACES_PATH = os.path.join("rasac_cache", "workspaces")
+TRAINING_WORKSPACE_CONFIG = "train_config.yml"  # config handed to rasa train
+TRAINING_REQUEST_ID_REGEX = "^[A-Za-z0-9_\\-]{1,128}$"
+TRAINING_LOGS_PATH = os.path.join("rasac_cache", "training_logs")
+TRAINING_LOG_EXTENSION = ".log"
+TRAINING_LOG_MAX_BYTES = 10 * 1024 * 1024
+TRAINING_LOG_BACKUP_COUNT = 3
+TRAINING_LOG_POLL_INTERVAL = 0.5
+TRAINING_LOG_HEARTBEAT_INTERVAL = 15
+TRAINING_LOG_RETENTION = 100  # finished jobs kept in the queue, with their logs
+# followed log streams hold a server thread each, so
+# they are capped below DEFAULT_SERVER_THREADS to keep
+# threads free for the other routes
+TRAINING_LOG_MAX_STREAMS = 4
+
+
+class TrainingJobState:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    ABORTED = "aborted"
+    FINISHED = ["completed", "failed", "aborted"]
 
 
 # BOTSTORE
 BOTSTORE_PATH = "bot_store"
+BOTSTORE_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+BOTSTORE_INDEX = os.path.join("rasac_cache", "botstore_index.db")
+BOTSTORE_INDEX_TABLE = "botstore_index"
+BOTSTORE_INDEX_VERSION = 1
+BOTSTORE_INDEX_BUSY_TIMEOUT = 10
+BOTSTORE_PAGE_MAX_LIMIT = 500
+DEFAULT_WATCH_BOTSTORE = False
+BOTSTORE_WATCH_POLL_INTERVAL = 2
+BOTSTORE_TRASH_PATH = os.path.join("rasac_cache", "botstore_trash")
+BOTSTORE_GC_INTERVAL = 10
+BOTSTORE_MODEL_DIGEST_FILE = ".rasac_model_digest.json"
+BOTSTORE_BLOBS_DIR = ".blobs"
+BOTSTORE_MANIFEST_FILE = ".rasac_manifest.json"
+BLOB_STORE_GRACE_PERIOD = 60 * 60
+DEFAULT_PERSIST_MODE = "auto"
+DEFAULT_BOTSTORE_BACKEND = "local"
 BOTSTORE_ASSETS = {
     "duplicate": [
         "actions",
@@ -246,6 +303,71 @@ class AssetType:
     MOVE_DIR_CONTENT = "move_dir_content"
 
 
+class BotStoreSortKey:
+    TIMESTAMP = "timestamp"
+    TRAIN_ACC = "train_acc"
+    TEST_ACC = "test_acc"
+    TRAIN_LOSS = "train_loss"
+    TEST_LOSS = "test_loss"
+    EPOCHS = "epochs"
+    VALID_KEYS = ["timestamp", "train_acc", "test_acc", "train_loss", "test_loss", "epochs"]
+    SCORE_KEYS = ["train_acc", "test_acc", "train_loss", "test_loss", "epochs"]
+
+
+class BotStoreSortOrder:
+    ASC = "asc"
+    DESC = "desc"
+    VALID_ORDERS = ["asc", "desc"]
+
+
+class PersistMode:
+    AUTO = "auto"  # reflink, then hard link, then copy
+    REFLINK = "reflink"
+    LINK = "link"
+    COPY = "copy"
+    VALID_MODES = ["auto", "reflink", "link", "copy"]
+
+
+class BotStoreBackend:
+    LOCAL = "local"
+    MONGODB = "mongodb"  # catalog is read from mongodb
+    WRITE_THROUGH = "write_through"  # catalog is read locally
+    VALID_BACKENDS = ["local", "mongodb", "write_through"]
+
+
+class BotStoreRecordType:
+    CURVES = "curves"
+    CONFIGS = "configs"
+    VALID_TYPES = ["curves", "configs"]
+
+
+class PersistStrategy:
+    REFLINK = "reflink"
+    LINK = "link"
+    COPY = "copy"
+    REUSED = "reused"
+
+
 class SourceType:
     FILE = "file"
     DIRECTORY = "dir"
+
+
+# MONGODB BOTSTORE
+MONGODB_MAX_POOL_SIZE = 50
+MONGODB_MIN_POOL_SIZE = 0
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = 10000
+MONGODB_CONNECT_TIMEOUT_MS = 10000
+MONGODB_SOCKET_TIMEOUT_MS = 30000
+MONGODB_BULK_BATCH_SIZE = 500
+MONGODB_READ_BATCH_SIZE = 100
+MONGODB_SYNC_RETRY_INTERVAL = 30
+MONGODB_SYNC_MAX_RETRY_INTERVAL = 900
+MONGODB_DUPLICATE_KEY_ERROR_CODE = 11000
+MONGODB_TENSORBOARD_FIELDS = [
+    EPOCHS_TAG,
+    TRAIN_ACCURACY_TAG,
+    VALIDATION_ACCURACY_TAG,
+    TRAIN_LOSS_TAG,
+    VALIDATION_LOSS_TAG,
+]
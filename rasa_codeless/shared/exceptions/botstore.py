@@ -35,3 +35,19 @@ class BotStoreCacheException(RASACException):
 
 class BotStoreCleanupException(RASACException):
     pass
+
+
+class BotStoreIndexException(RASACException):
+    pass
+
+
+class InvalidBotStoreQueryException(RASACException):
+    pass
+
+
+class InvalidBotStoreBackendException(RASACException):
+    pass
+
+
+class ModelNotAvailableException(RASACException):
+    pass
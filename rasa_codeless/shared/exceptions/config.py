@@ -11,3 +11,7 @@ class InvalidInterfaceException(RASACConfigException):
 
 class InvalidConfigKeyException(RASACConfigException):
     pass
+
+
+class InvalidConfigValueException(RASACConfigException):
+    pass
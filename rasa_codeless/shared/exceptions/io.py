@@ -95,3 +95,7 @@ class InvalidTensorboardMetricException(RASACIOException):
 
 class TensorboardScalarsException(RASACIOException):
     pass
+
+
+class TensorboardEventFileException(RASACIOException):
+    pass
@@ -0,0 +1,294 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Text, Dict, Tuple, NoReturn, Set, Optional
+from uuid import uuid4
+
+from rasa_codeless.shared.constants import (
+    BLOB_STORE_GRACE_PERIOD,
+    FILE_DIGEST_CHUNK_SIZE,
+    PersistMode,
+    PersistStrategy,
+)
+
+logger = logging.getLogger(__name__)
+
+# ioctl request of linux to clone the extents of a file
+# into another, on filesystems supporting copy-on-write
+_FICLONE = 0x40049409
+
+_STRATEGIES = {
+    PersistMode.AUTO: [PersistStrategy.REFLINK, PersistStrategy.LINK, PersistStrategy.COPY],
+    PersistMode.REFLINK: [PersistStrategy.REFLINK, PersistStrategy.COPY],
+    PersistMode.LINK: [PersistStrategy.LINK, PersistStrategy.COPY],
+    PersistMode.COPY: [PersistStrategy.COPY],
+}
+
+
+def reflink_file(src: Text, dst: Text) -> NoReturn:
+    """
+    Clones a file without copying its data, which only
+    works on copy-on-write filesystems such as btrfs
+    and xfs
+
+    Raises:
+        OSError: if the platform or filesystem does not
+            support cloning files
+    """
+    try:
+        import fcntl
+    except ImportError as e:
+        raise OSError(e)
+
+    try:
+        with open(src, mode="rb") as src_stream, open(dst, mode="wb") as dst_stream:
+            fcntl.ioctl(dst_stream.fileno(), _FICLONE, src_stream.fileno())
+        shutil.copystat(src, dst)
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+
+
+def share_file(src: Text, dst: Text, mode: Text = PersistMode.AUTO) -> Text:
+    """
+    Places a file at the given path without copying
+    its data, as a reflink or a hard link, whichever
+    the persist mode allows and the filesystem supports
+
+    Returns:
+        strategy the file was placed with
+
+    Raises:
+        OSError: if the file could not be shared
+    """
+    if mode not in _STRATEGIES:
+        raise ValueError(f"Invalid persist mode: {mode}")
+
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+    error = OSError(f"Persist mode {mode} does not allow sharing {src}")
+    for strategy in _STRATEGIES[mode]:
+        try:
+            if strategy == PersistStrategy.REFLINK:
+                reflink_file(src=src, dst=dst)
+            elif strategy == PersistStrategy.LINK:
+                os.link(src, dst)
+            else:
+                continue
+            return strategy
+        except OSError as e:
+            logger.debug(f"Could not {strategy} {src}. {e}")
+            error = e
+    raise error
+
+
+def clone_file(src: Text, dst: Text, mode: Text = PersistMode.AUTO) -> Text:
+    """
+    Places a copy of a file at the given path, using
+    the cheapest strategy the persist mode allows and
+    the filesystem supports
+
+    Args:
+        src: path of the file to clone
+        dst: path to place the file at
+        mode: one of PersistMode.VALID_MODES
+
+    Returns:
+        strategy the file was placed with
+    """
+    try:
+        return share_file(src=src, dst=dst, mode=mode)
+    except ValueError:
+        raise
+    except OSError:
+        shutil.copy2(src, dst)
+        return PersistStrategy.COPY
+
+
+class BlobStore:
+    """
+    Content-addressed store of the files persisted
+    into the botstore. each distinct file content is
+    stored once under its sha256 digest, and model
+    dirs reflink or hard link to the blobs, so files
+    which do not change between trainings take no
+    extra space. blobs are removed once the manifest
+    of no model refers to them
+    """
+
+    def __init__(self, blobs_path: Text):
+        self.blobs_path = blobs_path
+
+        # digests of source files, keyed by path and
+        # validated against their size, mtime and inode,
+        # so unchanged files are not read again
+        self._digests: Dict[Text, Tuple[int, int, int, Text]] = dict()
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest: Text) -> Text:
+        return os.path.join(self.blobs_path, digest[:2], digest)
+
+    def _cached_digest(self, file_path: Text, file_stat: os.stat_result):
+        with self._lock:
+            cached = self._digests.get(os.path.abspath(file_path))
+        if cached and cached[:3] == (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino):
+            return cached[3]
+        return None
+
+    @staticmethod
+    def _hash_file(file_path: Text) -> Text:
+        file_digest = hashlib.sha256()
+        with open(file_path, mode="rb") as file_stream:
+            for chunk in iter(lambda: file_stream.read(FILE_DIGEST_CHUNK_SIZE), b""):
+                file_digest.update(chunk)
+        return file_digest.hexdigest()
+
+    @staticmethod
+    def _copy_and_hash_file(src: Text, dst: Text) -> Text:
+        file_digest = hashlib.sha256()
+        with open(src, mode="rb") as src_stream, open(dst, mode="wb") as dst_stream:
+            for chunk in iter(lambda: src_stream.read(FILE_DIGEST_CHUNK_SIZE), b""):
+                file_digest.update(chunk)
+                dst_stream.write(chunk)
+        shutil.copymode(src, dst)
+        return file_digest.hexdigest()
+
+    def _share_into_place(self, src: Text, dst: Text, mode: Text) -> Text:
+        # replaces a file with a shared copy of another
+        temp_path = f"{dst}.{uuid4().hex}.tmp"
+        try:
+            strategy = share_file(src=src, dst=temp_path, mode=mode)
+            os.replace(temp_path, dst)
+            return strategy
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def place(
+            self,
+            file_path: Text,
+            dst: Text,
+            mode: Text = PersistMode.AUTO,
+    ) -> Tuple[Text, Optional[Text], Optional[Text]]:
+        """
+        Places a file at the given path, sharing its data
+        with the blob of its content if the persist mode
+        and the filesystem allow it. data is written at
+        most once: a file whose content is already stored
+        is reflinked or hard linked from its blob, and a
+        new file is placed from the source and then shared
+        into the store. the source is never hard linked,
+        since project files may still be edited in place
+
+        Args:
+            file_path: path of the file to place
+            dst: path to place the file at
+            mode: one of PersistMode.VALID_MODES
+
+        Returns:
+            strategy the file was placed with, and the
+                strategy and digest of the blob it shares
+                its data with, which are None if it does
+                not share a blob
+        """
+        if mode not in _STRATEGIES:
+            raise ValueError(f"Invalid persist mode: {mode}")
+        if mode == PersistMode.COPY:
+            return clone_file(src=file_path, dst=dst, mode=mode), None, None
+
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        if os.path.lexists(dst):
+            # dst may be a hard link of a blob
+            os.remove(dst)
+
+        file_stat = os.stat(file_path)
+        digest = self._cached_digest(file_path=file_path, file_stat=file_stat)
+        if digest is not None and os.path.exists(self.blob_path(digest)):
+            try:
+                strategy = share_file(src=self.blob_path(digest), dst=dst, mode=mode)
+                os.utime(self.blob_path(digest))
+                return strategy, PersistStrategy.REUSED, digest
+            except OSError as e:
+                logger.debug(f"Could not share blob {digest}. {e}")
+
+        strategy = None
+        if PersistStrategy.REFLINK in _STRATEGIES[mode]:
+            try:
+                reflink_file(src=file_path, dst=dst)
+                strategy = PersistStrategy.REFLINK
+            except OSError as e:
+                logger.debug(f"Could not reflink {file_path}. {e}")
+
+        # a copied file is hashed while it is copied,
+        # so new files are only read once
+        if strategy is None:
+            digest = self._copy_and_hash_file(src=file_path, dst=dst)
+            shutil.copystat(file_path, dst)
+            strategy = PersistStrategy.COPY
+        elif digest is None:
+            digest = self._hash_file(dst)
+        with self._lock:
+            self._digests[os.path.abspath(file_path)] = (
+                file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino, digest
+            )
+
+        blob_path = self.blob_path(digest)
+        try:
+            if os.path.exists(blob_path):
+                # the content is stored under another path
+                strategy = self._share_into_place(src=blob_path, dst=dst, mode=mode)
+                blob_strategy = PersistStrategy.REUSED
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                blob_strategy = self._share_into_place(src=dst, dst=blob_path, mode=mode)
+            # a blob must not be collected before the
+            # manifest of its model dir is written
+            os.utime(blob_path)
+        except OSError as e:
+            logger.debug(f"Could not share {dst} with the blob store. {e}")
+            return strategy, None, None
+        return strategy, blob_strategy, digest
+
+    def collect(self, referenced: Set[Text], grace_period: float = BLOB_STORE_GRACE_PERIOD) -> int:
+        """
+        Removes the blobs no model refers to anymore,
+        along with leftover temporary files. reflinked
+        and copied files do not raise the link count of
+        a blob, so references are taken from the model
+        manifests rather than from the filesystem
+
+        Args:
+            referenced: digests listed in the manifests of
+                the model dirs
+            grace_period: blobs which were stored or reused
+                within the grace period are kept, since the
+                model dirs they are placed into may not have
+                a manifest yet
+
+        Returns:
+            number of removed blobs
+        """
+        removed_blobs = 0
+        if not os.path.isdir(self.blobs_path):
+            return removed_blobs
+
+        threshold = time.time() - grace_period
+        for dir_path, _, file_names in os.walk(self.blobs_path):
+            for file_name in file_names:
+                if file_name in referenced:
+                    continue
+                blob_path = os.path.join(dir_path, file_name)
+                try:
+                    if os.stat(blob_path).st_mtime < threshold:
+                        os.remove(blob_path)
+                        removed_blobs += 1
+                except OSError as e:
+                    logger.debug(f"Could not collect blob {blob_path}. {e}")
+        return removed_blobs
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Text
+from typing import Any, Dict, Text
 
 from rasa_codeless.shared.constants import (
     InterfaceType,
@@ -7,10 +7,17 @@ from rasa_codeless.shared.constants import (
     DEFAULT_RASA_CONFIG_PATH,
     DEFAULT_PORT,
     DEFAULT_HOST_LOCAL,
+    DEFAULT_MAX_CONCURRENT_TRAININGS,
+    DEFAULT_WATCH_BOTSTORE,
+    DEFAULT_PERSIST_MODE,
+    PersistMode,
+    DEFAULT_BOTSTORE_BACKEND,
+    BotStoreBackend,
     ConfigType,
 )
 from rasa_codeless.shared.exceptions.config import (
     InvalidInterfaceException,
+    InvalidConfigValueException,
 )
 
 logger = logging.getLogger(__name__)
@@ -20,6 +27,10 @@ def get_init_configs(
         rasa_config_path: Text = None,
         port: int = None,
         interface: Text = None,
+        max_concurrent_trainings: int = None,
+        watch_botstore: bool = None,
+        persist_mode: Text = None,
+        botstore_backend: Text = None,
 ) -> Dict:
     # setting default config file
     # path if not specified
@@ -46,10 +57,45 @@ def get_init_configs(
             default_configs[Config.SERVER_CONFIGS_KEY][Config.PORT_KEY] = port
             logger.warning("Port specified in the config file will be ignored "
                            "since --port argument was set via the CLI")
+    if max_concurrent_trainings is not None and interface == InterfaceType.SERVER:
+        default_configs[Config.SERVER_CONFIGS_KEY][Config.MAX_CONCURRENT_TRAININGS_KEY] = \
+            get_max_concurrent_trainings(max_concurrent_trainings)
+        logger.warning("Max concurrent trainings specified in the config file will be ignored "
+                       "since --max-concurrent-trainings argument was set via the CLI")
+    if watch_botstore and interface == InterfaceType.SERVER:
+        default_configs[Config.SERVER_CONFIGS_KEY][Config.WATCH_BOTSTORE_KEY] = True
+    if persist_mode and interface == InterfaceType.SERVER:
+        if persist_mode in PersistMode.VALID_MODES:
+            default_configs[Config.SERVER_CONFIGS_KEY][Config.PERSIST_MODE_KEY] = persist_mode
+            logger.warning("Persist mode specified in the config file will be ignored "
+                           "since --persist-mode argument was set via the CLI")
+    if botstore_backend and interface == InterfaceType.SERVER:
+        if botstore_backend in BotStoreBackend.VALID_BACKENDS:
+            default_configs[Config.SERVER_CONFIGS_KEY][Config.BOTSTORE_BACKEND_KEY] = botstore_backend
+            logger.warning("Botstore backend specified in the config file will be ignored "
+                           "since --botstore-backend argument was set via the CLI")
 
     return default_configs
 
 
+def get_max_concurrent_trainings(value: Any) -> int:
+    """
+    Validates the number of trainings the server runs
+    at once, which is read from the CLI or the config
+    file. the default is used if it is not set
+
+    Raises:
+        InvalidConfigValueException: if the value is
+            not a positive integer
+    """
+    if value is None:
+        return DEFAULT_MAX_CONCURRENT_TRAININGS
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        logger.error(f"Invalid max concurrent trainings: {value!r}. It should be a positive integer")
+        raise InvalidConfigValueException(f"Invalid {Config.MAX_CONCURRENT_TRAININGS_KEY}: {value!r}")
+    return value
+
+
 def get_default_configs(section: Text = ConfigType.ALL) -> Dict:
     default_configs = {
         "rasac_base_configs": {
@@ -58,6 +104,10 @@ def get_default_configs(section: Text = ConfigType.ALL) -> Dict:
         "rasac_server_configs": {
             "host": DEFAULT_HOST_LOCAL,
             "port": DEFAULT_PORT,
+            "max_concurrent_trainings": DEFAULT_MAX_CONCURRENT_TRAININGS,
+            "watch_botstore": DEFAULT_WATCH_BOTSTORE,
+            "persist_mode": DEFAULT_PERSIST_MODE,
+            "botstore_backend": DEFAULT_BOTSTORE_BACKEND,
         }
     }
 
@@ -1,3 +1,6 @@
+import copy
+import hashlib
+import json
 import logging
 import os
 import pathlib
@@ -5,7 +8,7 @@ import re
 import shutil
 import sys
 from collections import OrderedDict as OrderedDictColl
-from datetime import datetime
+from datetime import datetime, timedelta
 from os import path
 from typing import List, Optional, Text, OrderedDict, Dict, NoReturn, Union, Tuple, Any
 from uuid import uuid4
@@ -28,6 +31,7 @@ from rasa_codeless.shared.constants import (
     TermColor,
     RASA_MODEL_EXTENSIONS,
     RASA_MODEL_REGEX,
+    RASA_MODEL_TIMESTAMP_PATTERN,
     DEFAULT_CASE_SENSITIVE_MODE,
     DEFAULT_LATEST_TAG,
     DEFAULT_INIT_DEST_DIR_NAME,
@@ -38,7 +42,10 @@ from rasa_codeless.shared.constants import (
     RASA_BOTSTORE_DIR_REGEX,
     BOTSTORE_ASSETS,
     AssetType,
-    SourceType,
+    FILE_DIGEST_CHUNK_SIZE,
+    BOTSTORE_MANIFEST_FILE,
+    DEFAULT_PERSIST_MODE,
+    PersistMode,
 )
 from rasa_codeless.shared.exceptions.io import (
     YAMLFormatException,
@@ -52,6 +59,8 @@ from rasa_codeless.shared.exceptions.io import (
     ModelPersistException,
     InvalidAssetTypeException,
 )
+from rasa_codeless.utils.blob_store import BlobStore, clone_file
+from rasa_codeless.utils.model_names import model_timestamp_key
 from ruamel import yaml as yaml
 from ruamel.yaml.error import YAMLError
 
@@ -262,6 +271,19 @@ def file_size(file_path: Union[Text, List], reverese: bool = False) -> Union[Dic
         raise FileSizeInspectingException(e)
 
 
+def file_digest(file_path: Text, chunk_size: int = FILE_DIGEST_CHUNK_SIZE) -> Text:
+    """
+    Returns the sha256 hex digest of a file, reading
+    it in chunks so that large models are never
+    loaded into memory at once
+    """
+    digest = hashlib.sha256()
+    with open(file_path, mode="rb") as file_stream:
+        for chunk in iter(lambda: file_stream.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def is_bot_root() -> bool:
     """
     Checks if DIME CLI is running inside a RASA
@@ -548,18 +570,13 @@ def get_latest_model_name(models_path: Union[Text, List]) -> Text:
     else:
         model_list = models_path
 
-    models_dict = {
-        os.path.split(model_path)[-1]:
-            int(''.join(list(re.findall(RASA_MODEL_REGEX, os.path.split(model_path)[-1])[0])))
-        for model_path in model_list
-        if re.findall(RASA_MODEL_REGEX, os.path.split(model_path)[-1])
-    }
-
     latest_model = None
     max_timestamp = 0
 
-    for model_name, timestamp in models_dict.items():
-        if timestamp > max_timestamp:
+    for model_path in model_list:
+        model_name = os.path.split(model_path)[-1]
+        timestamp = model_timestamp_key(model_name=model_name)
+        if timestamp is not None and timestamp > max_timestamp:
             max_timestamp = timestamp
             latest_model = model_name
 
@@ -567,6 +584,52 @@ def get_latest_model_name(models_path: Union[Text, List]) -> Text:
     return latest_model
 
 
+def get_available_model_name(
+        model_name: Text,
+        models_path: Text = DEFAULT_MODEL_PATH,
+        botstore_path: Text = BOTSTORE_PATH,
+        reserve: bool = False,
+) -> Text:
+    """
+    RASA names models after the time they were
+    trained at, hence models trained in parallel
+    can end up with the same name. Returns the given
+    model name if it is not taken, or else the name
+    of the closest later second which is free
+
+    Args:
+        model_name: name of the trained model
+        models_path: path of the RASA models dir
+        botstore_path: path of the botstore dir
+        reserve: reserve the name by creating its
+            botstore dir, which only one caller can
+            create, so concurrent callers never get
+            the same name
+
+    Returns:
+        model name which is not taken by an existing
+            model or botstore entry
+    """
+    model_timestamp = datetime.strptime(model_name, RASA_MODEL_TIMESTAMP_PATTERN)
+    available_model_name = model_name
+    if reserve:
+        os.makedirs(botstore_path, exist_ok=True)
+
+    while True:
+        botstore_dir = os.path.join(botstore_path, available_model_name.replace(RASA_MODEL_EXTENSIONS[0], ""))
+        if not file_exists(os.path.join(models_path, available_model_name)):
+            if not reserve and not dir_exists(botstore_dir):
+                return available_model_name
+            if reserve:
+                try:
+                    os.mkdir(botstore_dir)
+                    return available_model_name
+                except FileExistsError:
+                    pass
+        model_timestamp += timedelta(seconds=1)
+        available_model_name = model_timestamp.strftime(RASA_MODEL_TIMESTAMP_PATTERN)
+
+
 def update_sys_path(path_to_add: Text) -> NoReturn:
     """
     Appends a given path to the list of system
@@ -708,15 +771,65 @@ def write_yaml_file(
         yml.dump(yaml_content, yaml_file_)
 
 
+def _list_asset_files(src: Text, dst: Text) -> Dict[Text, Text]:
+    asset_files = dict()
+    if os.path.isdir(src):
+        for dir_path, _, file_names in os.walk(src, followlinks=True):
+            dst_dir = os.path.normpath(os.path.join(dst, os.path.relpath(dir_path, src)))
+            os.makedirs(dst_dir, exist_ok=True)
+            for file_name in file_names:
+                asset_files[os.path.join(dir_path, file_name)] = os.path.join(dst_dir, file_name)
+    else:
+        asset_files[src] = dst
+    return asset_files
+
+
 def persist_model_data(
         model_name: Text,
         botstore_path: Text = BOTSTORE_PATH,
-        assets: Dict = None
-) -> NoReturn:
+        assets: Dict = None,
+        asset_sources: Dict = None,
+        blob_store: Optional[BlobStore] = None,
+        persist_mode: Text = DEFAULT_PERSIST_MODE,
+) -> Dict:
+    """
+    Persists the project assets a model was trained
+    with into the botstore directory of the model
+
+    Args:
+        model_name: name of the model to persist
+        botstore_path: path of the botstore dir
+        assets: additional assets to persist, listed
+            under their asset type
+        asset_sources: maps asset paths to the paths
+            they should be persisted from, if they are
+            not read from the project root. e.g. the
+            config and tensorboard logdir of a training
+            workspace
+        blob_store: if specified, duplicated assets are
+            deduplicated through the blob store and a
+            manifest of the blobs they share is written
+            into the botstore directory of the model
+        persist_mode: one of PersistMode.VALID_MODES.
+            decides whether duplicated files are placed
+            as reflinks, hard links or copies
+
+    Returns:
+        number of duplicated files placed with each
+            strategy, and the number of blobs stored or
+            reused with each strategy
+    """
     try:
+        if persist_mode not in PersistMode.VALID_MODES:
+            raise ValueError(f"Invalid persist mode: {persist_mode}")
+
         model_timestamp = model_name.replace(RASA_MODEL_EXTENSIONS[0], "")
-        os.makedirs(os.path.join(botstore_path, model_timestamp), exist_ok=True)
-        assets_to_persist = BOTSTORE_ASSETS
+        model_dir = os.path.join(botstore_path, model_timestamp)
+        os.makedirs(model_dir, exist_ok=True)
+        assets_to_persist = copy.deepcopy(BOTSTORE_ASSETS)
+        asset_sources = asset_sources or dict()
+        manifest = dict()
+        persist_report = {"files": dict(), "blobs": dict()}
 
         if assets:
             for asset_type in assets.keys():
@@ -725,25 +838,48 @@ def persist_model_data(
 
         for asset_type, assets_paths in assets_to_persist.items():
             for path_ in assets_paths:
-                src_ = path_
-                dst_ = os.path.join(botstore_path, model_timestamp, path_)
+                src_ = asset_sources.get(path_, path_)
+                dst_ = os.path.join(model_dir, path_)
                 if not os.path.exists(path=src_):
                     continue
 
-                src_type = SourceType.DIRECTORY if os.path.isdir(src_) else SourceType.FILE
-
                 if asset_type == AssetType.DUPLICATE:
-                    shutil.copytree(src=src_, dst=dst_, dirs_exist_ok=True) \
-                        if src_type == SourceType.DIRECTORY \
-                        else shutil.copyfile(src=src_, dst=dst_)
+                    for file_src, file_dst in _list_asset_files(src=src_, dst=dst_).items():
+                        if blob_store is not None:
+                            strategy, blob_strategy, digest = blob_store.place(
+                                file_path=file_src,
+                                dst=file_dst,
+                                mode=persist_mode,
+                            )
+                            if digest is not None:
+                                manifest[os.path.relpath(file_dst, model_dir)] = digest
+                                persist_report["blobs"][blob_strategy] = \
+                                    persist_report["blobs"].get(blob_strategy, 0) + 1
+                        else:
+                            # project files are still edited in place,
+                            # so they are never hard linked
+                            strategy = clone_file(
+                                src=file_src,
+                                dst=file_dst,
+                                mode=PersistMode.COPY if persist_mode in [PersistMode.LINK, PersistMode.COPY]
+                                else PersistMode.REFLINK,
+                            )
+                        persist_report["files"][strategy] = persist_report["files"].get(strategy, 0) + 1
                 elif asset_type == AssetType.MOVE_DIR:
                     shutil.move(src=src_, dst=dst_)
                 elif asset_type == AssetType.MOVE_DIR_CONTENT:
                     dir_content = get_existing_toplevel_file_list(src_)
+                    os.makedirs(dst_, exist_ok=True)
                     for content in dir_content:
                         shutil.move(os.path.join(src_, content), os.path.join(dst_, content))
                 else:
                     raise InvalidAssetTypeException()
+
+        if blob_store is not None:
+            with open(os.path.join(model_dir, BOTSTORE_MANIFEST_FILE), mode=FilePermission.WRITE,
+                      encoding=Encoding.UTF8) as manifest_file:
+                json.dump({"files": manifest, "persist_report": persist_report}, manifest_file, indent=2)
+        return persist_report
     except InvalidAssetTypeException as e:
         raise InvalidAssetTypeException(e)
     except Exception as e:
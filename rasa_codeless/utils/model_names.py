@@ -0,0 +1,24 @@
+import re
+from typing import Text, Optional
+
+from rasa_codeless.shared.constants import RASA_MODEL_REGEX
+
+
+def model_timestamp_key(model_name: Text) -> Optional[int]:
+    """
+    Returns the timestamp a RASA model is named
+    after as an integer, e.g. 20220101101010 for
+    20220101-101010.tar.gz, which orders models by
+    the time they were trained at
+
+    Args:
+        model_name: name of the RASA model
+
+    Returns:
+        timestamp key, or None if the model is not
+            named after a timestamp
+    """
+    model_timestamp = re.match(RASA_MODEL_REGEX, model_name)
+    if not model_timestamp:
+        return None
+    return int(''.join(model_timestamp.groups()))
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import threading
+from typing import Text, NoReturn, Callable, Optional
+
+
+class ThreadLocalConnection:
+    """
+    Caches one connection to a sqlite database per
+    thread, since sqlite connections cannot be shared
+    between threads. connections run in WAL mode, which
+    lets readers proceed while another thread holds a
+    write
+    """
+
+    def __init__(
+            self,
+            database_path: Text,
+            timeout: float,
+            on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+    ):
+        """
+        Args:
+            database_path: path of the sqlite database
+            timeout: seconds to wait for a lock held by
+                another connection
+            on_connect: called with each new connection,
+                e.g. to create the tables of the database
+        """
+        self.database_path = database_path
+        self.timeout = timeout
+        self.on_connect = on_connect
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            database_dir = os.path.dirname(self.database_path)
+            if database_dir:
+                os.makedirs(database_dir, exist_ok=True)
+            conn = sqlite3.connect(self.database_path, timeout=self.timeout)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.on_connect:
+                self.on_connect(conn)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> NoReturn:
+        # only closes the connection of the calling thread
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -1,9 +1,9 @@
 import fnmatch
+import json
 import logging
 import os
-from typing import Text, List, Tuple
-
-import tensorflow as tf
+import threading
+from typing import Text, List, Tuple, Iterator, Dict, Optional, NoReturn
 
 from rasa_codeless.shared.constants import (
     DEFAULT_TENSORBOARD_LOGDIR,
@@ -11,6 +11,8 @@ from rasa_codeless.shared.constants import (
     TENSORBOARD_INTENT_LOSS_TAG,
     TENSORBOARD_SIMPLE_VALUE_TAG,
     TENSORBOARD_RESULTS_FILE_EXTENSION,
+    TENSORBOARD_SCALARS_CACHE_FILE,
+    TENSORBOARD_SCALARS_CACHE_VERSION,
     TensorboardDirectories,
     TensorboardMetrics,
     RASA_MODEL_EXTENSIONS,
@@ -18,11 +20,45 @@ from rasa_codeless.shared.constants import (
 from rasa_codeless.shared.exceptions.io import (
     InvalidTensorboardMetricException,
     TensorboardScalarsException,
+    TensorboardEventFileException,
 )
+from rasa_codeless.utils.tensorboard_events import iterate_event_file
 
 logger = logging.getLogger(__name__)
 
 
+def _iterate_event_file_with_tensorflow(event_file: Text) -> Iterator[Tuple[Text, float]]:
+    # tensorflow is imported lazily since it takes seconds
+    # to import and is only needed when the native reader
+    # fails to decode an event file
+    try:
+        import tensorflow as tf
+    except ImportError as e:
+        raise TensorboardEventFileException(e)
+
+    for event in tf.compat.v1.train.summary_iterator(path=event_file):
+        for value in event.summary.value:
+            if value.HasField(TENSORBOARD_SIMPLE_VALUE_TAG):
+                yield value.tag, value.simple_value
+
+
+def iterate_scalars(event_file: Text) -> Iterator[Tuple[Text, float]]:
+    """
+    Yields the (tag, value) scalars of a tensorboard
+    event file. event files are decoded natively, and
+    tensorflow is used as a fallback if it is installed
+    """
+    try:
+        scalars = [(tag, value) for _, _, tag, value in iterate_event_file(event_file=event_file)]
+    except Exception as e:
+        logger.debug(f"Native tensorboard reader failed for {event_file}, falling back "
+                     f"to tensorflow. {e}")
+        scalars = _iterate_event_file_with_tensorflow(event_file=event_file)
+
+    for tag, value in scalars:
+        yield tag, value
+
+
 class TensorBoardResults:
     def __init__(self, logdir: Text = DEFAULT_TENSORBOARD_LOGDIR):
         self.logdir = logdir
@@ -31,44 +67,178 @@ class TensorBoardResults:
     def generate_epoch_list(total_epochs: int):
         return list(range(1, total_epochs+1))
 
+    @staticmethod
+    def _metric_tag(metric: Text) -> Text:
+        if metric == TensorboardMetrics.ACCURACY:
+            return TENSORBOARD_INTENT_ACCURACY_TAG
+        elif metric == TensorboardMetrics.LOSS:
+            return TENSORBOARD_INTENT_LOSS_TAG
+        else:
+            raise InvalidTensorboardMetricException()
+
+    def _list_event_files(self, results_dir: Text, botstore_model: Text) -> List[Text]:
+        results_path = os.path.join(botstore_model, self.logdir, results_dir)
+        return [
+            os.path.join(results_path, file) for file in sorted(os.listdir(results_path))
+            if fnmatch.fnmatch(file, TENSORBOARD_RESULTS_FILE_EXTENSION)
+        ]
+
+    def _read_results_dir(self, results_dir: Text, botstore_model: Text) -> Dict[Text, List]:
+        series = dict()
+        for event_file in self._list_event_files(results_dir=results_dir, botstore_model=botstore_model):
+            for value_tag, value in iterate_scalars(event_file=event_file):
+                series.setdefault(value_tag, list()).append(value)
+        return series
+
+    def _fingerprint(self, botstore_model: Text) -> List:
+        # event files of persisted models do not change,
+        # so their sizes and modification times are
+        # enough to tell whether a cache is still valid
+        fingerprint = list()
+        for results_dir in [TensorboardDirectories.TRAIN, TensorboardDirectories.VALIDATION]:
+            try:
+                event_files = self._list_event_files(results_dir=results_dir, botstore_model=botstore_model)
+            except FileNotFoundError:
+                continue
+            for event_file in event_files:
+                event_file_stat = os.stat(event_file)
+                fingerprint.append([
+                    os.path.relpath(event_file, botstore_model),
+                    event_file_stat.st_size,
+                    event_file_stat.st_mtime_ns,
+                ])
+        return fingerprint
+
+    @staticmethod
+    def _load_cached_scalars(botstore_model: Text, fingerprint: List) -> Optional[Dict]:
+        cache_path = os.path.join(botstore_model, TENSORBOARD_SCALARS_CACHE_FILE)
+        try:
+            with open(cache_path, mode="r", encoding="utf8") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(cache, Dict) \
+                or cache.get("version") != TENSORBOARD_SCALARS_CACHE_VERSION \
+                or cache.get("fingerprint") != fingerprint:
+            return None
+        return cache.get("scalars")
+
+    @staticmethod
+    def _store_cached_scalars(botstore_model: Text, fingerprint: List, scalars: Dict) -> NoReturn:
+        cache_path = os.path.join(botstore_model, TENSORBOARD_SCALARS_CACHE_FILE)
+        temp_cache_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_cache_path, mode="w", encoding="utf8") as cache_file:
+                json.dump({
+                    "version": TENSORBOARD_SCALARS_CACHE_VERSION,
+                    "fingerprint": fingerprint,
+                    "scalars": scalars,
+                }, cache_file, separators=(",", ":"))
+
+            # readers never see a partially written cache
+            os.replace(temp_cache_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Could not write tensorboard scalars cache {cache_path}. {e}")
+            try:
+                os.remove(temp_cache_path)
+            except OSError:
+                pass
+
     def _iterate_through_results(
             self,
             results_dir: Text,
             metric: Text,
             botstore_model: Text = ""
     ) -> Tuple[List, int]:
-        score = list()
-        epochs = 0
         botstore_model = "" if not botstore_model else botstore_model
 
         # replace model extension
         botstore_model = botstore_model.replace(RASA_MODEL_EXTENSIONS[0], "")
 
         try:
-            if metric == TensorboardMetrics.ACCURACY:
-                tag = TENSORBOARD_INTENT_ACCURACY_TAG
-            elif metric == TensorboardMetrics.LOSS:
-                tag = TENSORBOARD_INTENT_LOSS_TAG
-            else:
-                raise InvalidTensorboardMetricException()
-
-            for file in os.listdir(os.path.join(botstore_model, self.logdir, results_dir)):
-                if fnmatch.fnmatch(file, TENSORBOARD_RESULTS_FILE_EXTENSION):
-                    for event in tf.compat.v1.train.summary_iterator(
-                            path=os.path.join(botstore_model, self.logdir, results_dir, file)
-                    ):
-                        for value in event.summary.value:
-                            if value.tag == tag:
-                                if value.HasField(TENSORBOARD_SIMPLE_VALUE_TAG):
-                                    score.append(value.simple_value)
-                                    # count to get the number of epochs
-                                    epochs += 1
-
-            return score, epochs
+            tag = self._metric_tag(metric=metric)
+            score = self._read_results_dir(results_dir=results_dir, botstore_model=botstore_model).get(tag, list())
+
+            # count to get the number of epochs
+            return score, len(score)
         except Exception as e:
             logger.debug(f"Exception occurred while iterating through tensorboard scalars. {e}")
             raise TensorboardScalarsException(e)
 
+    def read_scalars(self, botstore_model: Text = "", cached: bool = True) -> Dict[Text, Dict[Text, Dict]]:
+        """
+        Reads the train and validation results of a
+        model in a single pass over their event files
+        and returns every scalar tag found. results are
+        cached next to the model and reused as long as
+        its event files are unchanged
+
+        Args:
+            botstore_model: botstore model to read the
+                tensorboard results of
+            cached: whether to use the scalars cache
+
+        Returns:
+            series and number of epochs of each tag,
+                under the results dir they belong to
+        """
+        botstore_model = "" if not botstore_model else botstore_model
+
+        # replace model extension
+        botstore_model = botstore_model.replace(RASA_MODEL_EXTENSIONS[0], "")
+
+        try:
+            fingerprint = None
+            if cached:
+                fingerprint = self._fingerprint(botstore_model=botstore_model)
+                scalars = self._load_cached_scalars(botstore_model=botstore_model, fingerprint=fingerprint)
+                if scalars is not None:
+                    return scalars
+
+            scalars = {
+                results_dir: {
+                    tag: {
+                        "series": series,
+                        "epochs": len(series),
+                    }
+                    for tag, series in self._read_results_dir(
+                        results_dir=results_dir,
+                        botstore_model=botstore_model
+                    ).items()
+                }
+                for results_dir in [TensorboardDirectories.TRAIN, TensorboardDirectories.VALIDATION]
+            }
+        except Exception as e:
+            logger.debug(f"Exception occurred while reading tensorboard scalars. {e}")
+            raise TensorboardScalarsException(e)
+
+        if cached:
+            self._store_cached_scalars(botstore_model=botstore_model, fingerprint=fingerprint, scalars=scalars)
+        return scalars
+
+    def get_scores(
+            self,
+            scalars: Dict[Text, Dict[Text, Dict]],
+            results_dir: Text,
+            metric: Text,
+    ) -> Tuple[List, int]:
+        """
+        Picks the scores of a metric out of the
+        scalars returned by read_scalars
+
+        Returns:
+            list of scores and the number of epochs
+
+        Raises:
+            TensorboardScalarsException: if the metric
+                was not logged
+        """
+        tag = self._metric_tag(metric=metric)
+        if tag not in scalars.get(results_dir, dict()):
+            raise TensorboardScalarsException(f"`{tag}` was not logged under `{results_dir}`")
+        return scalars[results_dir][tag]["series"], scalars[results_dir][tag]["epochs"]
+
     def training_acc(self, botstore_model: Text = ""):
         return self._iterate_through_results(
             results_dir=TensorboardDirectories.TRAIN,
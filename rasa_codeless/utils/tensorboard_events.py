@@ -0,0 +1,326 @@
+import fnmatch
+import logging
+import os
+import struct
+from typing import Text, List, Tuple, Dict, Iterator, Optional, NoReturn
+
+from rasa_codeless.shared.constants import (
+    TENSORBOARD_RESULTS_FILE_EXTENSION,
+    TensorboardDirectories,
+)
+from rasa_codeless.shared.exceptions.io import TensorboardEventFileException
+
+logger = logging.getLogger(__name__)
+
+# TFRecord framing: uint64 length, uint32 masked crc
+# of the length, data, uint32 masked crc of the data
+_RECORD_HEADER_SIZE = 12
+_RECORD_FOOTER_SIZE = 4
+_CRC_MASK_DELTA = 0xA282EAD8
+
+# protobuf wire types
+_WIRE_VARINT = 0
+_WIRE_64BIT = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_32BIT = 5
+
+# field numbers of the tensorflow Event, Summary,
+# Summary.Value and TensorProto messages
+_EVENT_WALL_TIME = 1
+_EVENT_STEP = 2
+_EVENT_SUMMARY = 5
+_SUMMARY_VALUE = 1
+_VALUE_TAG = 1
+_VALUE_SIMPLE_VALUE = 2
+_VALUE_TENSOR = 8
+_TENSOR_DTYPE = 1
+_TENSOR_CONTENT = 4
+_TENSOR_FLOAT_VAL = 5
+_TENSOR_DOUBLE_VAL = 6
+_DT_FLOAT = 1
+_DT_DOUBLE = 2
+
+
+def _crc32c_table() -> List[int]:
+    table = list()
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _crc32c_table()
+
+
+def masked_crc32c(data: bytes) -> int:
+    """
+    Returns the masked crc32c checksum TFRecord frames
+    carry for their length and data
+    """
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc = _CRC32C_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    crc ^= 0xFFFFFFFF
+    return (((crc >> 15) | (crc << 17)) + _CRC_MASK_DELTA) & 0xFFFFFFFF
+
+
+def _valid_header(buffer: bytes, position: int) -> bool:
+    length_crc = struct.unpack("<I", buffer[position + 8:position + _RECORD_HEADER_SIZE])[0]
+    return masked_crc32c(buffer[position:position + 8]) == length_crc
+
+
+def _read_varint(buffer: bytes, position: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(buffer):
+            raise TensorboardEventFileException("Truncated protobuf varint")
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _iterate_fields(buffer: bytes) -> Iterator[Tuple[int, int, object]]:
+    position = 0
+    while position < len(buffer):
+        key, position = _read_varint(buffer, position)
+        field_number, wire_type = key >> 3, key & 0x07
+
+        if wire_type == _WIRE_VARINT:
+            value, position = _read_varint(buffer, position)
+        elif wire_type == _WIRE_64BIT:
+            value = buffer[position:position + 8]
+            position += 8
+        elif wire_type == _WIRE_LENGTH_DELIMITED:
+            length, position = _read_varint(buffer, position)
+            value = buffer[position:position + length]
+            position += length
+        elif wire_type == _WIRE_32BIT:
+            value = buffer[position:position + 4]
+            position += 4
+        else:
+            raise TensorboardEventFileException(f"Unsupported protobuf wire type {wire_type}")
+
+        if position > len(buffer):
+            raise TensorboardEventFileException("Truncated protobuf message")
+        yield field_number, wire_type, value
+
+
+def _parse_tensor_scalar(buffer: bytes) -> Optional[float]:
+    dtype = None
+    content = None
+    values = list()
+
+    for field_number, wire_type, value in _iterate_fields(buffer):
+        if field_number == _TENSOR_DTYPE:
+            dtype = value
+        elif field_number == _TENSOR_CONTENT:
+            content = value
+        elif field_number == _TENSOR_FLOAT_VAL:
+            values += struct.unpack(f"<{len(value) // 4}f", value) \
+                if wire_type == _WIRE_LENGTH_DELIMITED else struct.unpack("<f", value)
+        elif field_number == _TENSOR_DOUBLE_VAL:
+            values += struct.unpack(f"<{len(value) // 8}d", value) \
+                if wire_type == _WIRE_LENGTH_DELIMITED else struct.unpack("<d", value)
+
+    if values:
+        return float(values[0])
+    if content and dtype == _DT_FLOAT and len(content) >= 4:
+        return float(struct.unpack("<f", content[:4])[0])
+    if content and dtype == _DT_DOUBLE and len(content) >= 8:
+        return float(struct.unpack("<d", content[:8])[0])
+    return None
+
+
+def _parse_summary_value(buffer: bytes) -> Optional[Tuple[Text, float]]:
+    tag = None
+    simple_value = None
+    tensor_value = None
+
+    for field_number, _, value in _iterate_fields(buffer):
+        if field_number == _VALUE_TAG:
+            tag = value.decode("utf-8", errors="replace")
+        elif field_number == _VALUE_SIMPLE_VALUE:
+            simple_value = struct.unpack("<f", value)[0]
+        elif field_number == _VALUE_TENSOR:
+            tensor_value = _parse_tensor_scalar(value)
+
+    scalar = simple_value if simple_value is not None else tensor_value
+    if tag is None or scalar is None:
+        return None
+    return tag, float(scalar)
+
+
+def parse_event(record: bytes) -> Tuple[float, int, List[Tuple[Text, float]]]:
+    """
+    Decodes a serialized tensorflow Event and
+    extracts its scalar summary values
+
+    Args:
+        record: serialized Event protobuf message
+
+    Returns:
+        wall time, step and a list of (tag, value)
+            tuples of the scalars in the event
+    """
+    wall_time = 0.0
+    step = 0
+    scalars = list()
+
+    for field_number, _, value in _iterate_fields(record):
+        if field_number == _EVENT_WALL_TIME:
+            wall_time = struct.unpack("<d", value)[0]
+        elif field_number == _EVENT_STEP:
+            step = value
+        elif field_number == _EVENT_SUMMARY:
+            for summary_field, _, summary_value in _iterate_fields(value):
+                if summary_field == _SUMMARY_VALUE:
+                    scalar = _parse_summary_value(summary_value)
+                    if scalar:
+                        scalars.append(scalar)
+
+    return wall_time, step, scalars
+
+
+def read_records(buffer: bytes) -> Tuple[List[bytes], int]:
+    """
+    Splits TFRecord framed data into records. a
+    trailing record which is not fully written yet
+    is left for the next read. records whose data does
+    not match its checksum are skipped, and reading
+    stops at a length which does not match its
+    checksum, since the records after it cannot be
+    framed
+
+    Args:
+        buffer: TFRecord framed bytes, starting at the
+            beginning of a record
+
+    Returns:
+        list of complete records and the number of
+            bytes they occupy in the buffer
+    """
+    records = list()
+    position = 0
+
+    while len(buffer) - position >= _RECORD_HEADER_SIZE:
+        if not _valid_header(buffer, position):
+            logger.debug("Corrupt tensorboard event record length, stopped reading the event file")
+            break
+        length = struct.unpack("<Q", buffer[position:position + 8])[0]
+        record_end = position + _RECORD_HEADER_SIZE + length + _RECORD_FOOTER_SIZE
+        if record_end > len(buffer):
+            break
+        record = buffer[position + _RECORD_HEADER_SIZE:record_end - _RECORD_FOOTER_SIZE]
+        if masked_crc32c(record) == struct.unpack("<I", buffer[record_end - _RECORD_FOOTER_SIZE:record_end])[0]:
+            records.append(record)
+        else:
+            logger.warning("Skipped a corrupt tensorboard event record")
+        position = record_end
+
+    return records, position
+
+
+def iterate_event_file(event_file: Text) -> Iterator[Tuple[float, int, Text, float]]:
+    """
+    Reads a complete tensorboard event file without
+    tensorflow and yields every scalar in it
+
+    Args:
+        event_file: path of the event file
+
+    Returns:
+        generator of (wall time, step, tag, value) tuples
+    """
+    with open(event_file, mode="rb") as event_stream:
+        buffer = event_stream.read()
+
+    records, consumed = read_records(buffer)
+    if len(buffer) - consumed >= _RECORD_HEADER_SIZE and not _valid_header(buffer, consumed):
+        raise TensorboardEventFileException(f"Corrupt record in tensorboard event file {event_file}")
+    if consumed != len(buffer):
+        logger.debug(f"Ignored {len(buffer) - consumed} trailing bytes of a truncated "
+                     f"record in tensorboard event file {event_file}")
+
+    for record in records:
+        wall_time, step, scalars = parse_event(record)
+        for tag, value in scalars:
+            yield wall_time, step, tag, value
+
+
+def get_event_files(logdir: Text) -> Dict[Text, List[Text]]:
+    """
+    Returns the event files in the train and
+    validation results dirs under a logdir
+    """
+    event_files = {
+        TensorboardDirectories.TRAIN: list(),
+        TensorboardDirectories.VALIDATION: list(),
+    }
+    for dir_path, _, file_names in os.walk(logdir):
+        results_dir = os.path.basename(dir_path)
+        if results_dir not in event_files:
+            continue
+        event_files[results_dir] += sorted(
+            os.path.join(dir_path, file_name) for file_name in file_names
+            if fnmatch.fnmatch(file_name, TENSORBOARD_RESULTS_FILE_EXTENSION)
+        )
+    return event_files
+
+
+class EventFileTailer:
+    """
+    Follows the tensorboard event files of a running
+    training and keeps the latest value, the number
+    of values and the wall times of every scalar tag.
+    each poll only reads the bytes appended to the
+    event files since the previous poll
+    """
+
+    def __init__(self, logdir: Text):
+        self.logdir = logdir
+        self._offsets: Dict[Text, int] = dict()
+        self.scalars: Dict[Text, Dict[Text, Dict]] = {
+            TensorboardDirectories.TRAIN: dict(),
+            TensorboardDirectories.VALIDATION: dict(),
+        }
+
+    def poll(self) -> NoReturn:
+        for results_dir, event_files in get_event_files(self.logdir).items():
+            for event_file in event_files:
+                self._read_appended(results_dir=results_dir, event_file=event_file)
+
+    def _read_appended(self, results_dir: Text, event_file: Text) -> NoReturn:
+        offset = self._offsets.get(event_file, 0)
+        try:
+            if os.path.getsize(event_file) <= offset:
+                return
+            with open(event_file, mode="rb") as event_stream:
+                event_stream.seek(offset)
+                buffer = event_stream.read()
+        except OSError as e:
+            logger.debug(f"Could not read tensorboard event file {event_file}. {e}")
+            return
+
+        records, consumed = read_records(buffer)
+        self._offsets[event_file] = offset + consumed
+
+        for record in records:
+            wall_time, step, scalars = parse_event(record)
+            for tag, value in scalars:
+                scalar = self.scalars[results_dir].setdefault(tag, {
+                    "count": 0,
+                    "first_wall_time": wall_time,
+                })
+                scalar["count"] += 1
+                scalar["value"] = value
+                scalar["step"] = step
+                scalar["wall_time"] = wall_time
+
+    def latest(self, results_dir: Text, tag: Text) -> Optional[Dict]:
+        return self.scalars[results_dir].get(tag)
@@ -0,0 +1,36 @@
+import struct
+
+import pytest
+
+from rasa_codeless.utils.tensorboard_events import masked_crc32c
+
+
+def _field(field_number, wire_type, payload):
+    return bytes([field_number << 3 | wire_type]) + payload
+
+
+def _length_delimited(field_number, payload):
+    return _field(field_number, 2, bytes([len(payload)]) + payload)
+
+
+def _append_events(event_file, events):
+    # appends a TFRecord framed tensorflow Event per
+    # (wall_time, step, scalars) entry, holding the
+    # scalars as simple values
+    event_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(event_file, mode="ab") as event_stream:
+        for wall_time, step, scalars in events:
+            summary = b"".join(
+                _length_delimited(1, _length_delimited(1, tag.encode()) + _field(2, 5, struct.pack("<f", value)))
+                for tag, value in scalars.items()
+            )
+            event = _field(1, 1, struct.pack("<d", float(wall_time))) + _field(2, 0, bytes([step])) \
+                + _length_delimited(5, summary)
+            length = struct.pack("<Q", len(event))
+            event_stream.write(length + struct.pack("<I", masked_crc32c(length)))
+            event_stream.write(event + struct.pack("<I", masked_crc32c(event)))
+
+
+@pytest.fixture
+def append_events():
+    return _append_events
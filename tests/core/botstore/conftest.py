@@ -0,0 +1,92 @@
+import copy
+
+import pytest
+
+from rasa_codeless.core.botstore import mongodb_botstore
+from rasa_codeless.core.botstore.mongodb_botstore import MongoDBBotStore
+from rasa_codeless.shared.constants import BotStoreSortKey
+
+# ties on every score, and models without results
+SUMMARIES = [
+    {"model_id": "20220101-000000.tar.gz", "test_acc": 0.8, "train_acc": 0.9, "test_loss": 0.3,
+     "train_loss": 0.2, "epochs": 10},
+    {"model_id": "20220102-000000.tar.gz", "test_acc": 0.8, "train_acc": 0.7, "test_loss": 0.3,
+     "train_loss": 0.4, "epochs": 20},
+    {"model_id": "20220103-000000.tar.gz", "test_acc": "", "train_acc": "", "test_loss": "",
+     "train_loss": "", "epochs": ""},
+    {"model_id": "20220104-000000.tar.gz", "test_acc": 0.6, "train_acc": 0.9, "test_loss": 0.5,
+     "train_loss": 0.2, "epochs": 10},
+    {"model_id": "20220105-000000.tar.gz", "test_acc": "", "train_acc": "", "test_loss": "",
+     "train_loss": "", "epochs": ""},
+    {"model_id": "20220106-000000.tar.gz", "test_acc": 0.8, "train_acc": 0.9, "test_loss": 0.1,
+     "train_loss": 0.2, "epochs": 20},
+]
+
+
+def _expected_order(sort_by, descending, min_scores=None, max_scores=None):
+    # models without the score go last, ties are
+    # broken by model_id in the same direction
+    def value(summary):
+        return summary["model_id"] if sort_by == BotStoreSortKey.TIMESTAMP else summary[sort_by]
+
+    summaries = [
+        summary for summary in SUMMARIES
+        if all(summary[key] != "" and summary[key] >= bound for key, bound in (min_scores or dict()).items())
+        and all(summary[key] != "" and summary[key] <= bound for key, bound in (max_scores or dict()).items())
+    ]
+    scored = sorted(
+        [summary for summary in summaries if value(summary) != ""],
+        key=lambda summary: (value(summary), summary["model_id"]),
+        reverse=descending,
+    )
+    unscored = sorted(
+        [summary for summary in summaries if value(summary) == ""],
+        key=lambda summary: summary["model_id"],
+        reverse=descending,
+    )
+    return [summary["model_id"] for summary in scored + unscored]
+
+
+def _read_pages(query, limit, **query_args):
+    # follows the cursors of a summaries query to
+    # the last page
+    model_ids, cursor = list(), None
+    while True:
+        summaries, cursor = query(limit=limit, cursor=cursor, **query_args)
+        assert len(summaries) <= limit
+        model_ids += [summary["model_id"] for summary in summaries]
+        if cursor is None:
+            return model_ids
+
+
+@pytest.fixture
+def summaries():
+    return copy.deepcopy(SUMMARIES)
+
+
+@pytest.fixture
+def expected_order():
+    return _expected_order
+
+
+@pytest.fixture
+def read_pages():
+    return _read_pages
+
+
+@pytest.fixture
+def mongo_client():
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient()
+
+
+@pytest.fixture
+def mongo_botstore(mongo_client, monkeypatch):
+    # a MongoDB botstore whose records are kept in the
+    # botstore database of an in-memory client
+    monkeypatch.setenv("MONGODB_BOTSTORE_INSTANCE", "botstore")
+    monkeypatch.setenv("MONGODB_COLLECTION_TENSORBOARD", "tensorboard")
+    monkeypatch.setenv("MONGODB_COLLECTION_CONFIGURATION", "configuration")
+    monkeypatch.setattr(mongodb_botstore, "get_client", lambda cluster_url: mongo_client)
+    monkeypatch.setattr(mongodb_botstore, "_indexed_collections", set())
+    return MongoDBBotStore()
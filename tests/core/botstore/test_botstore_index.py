@@ -0,0 +1,144 @@
+import sqlite3
+
+import pytest
+
+from rasa_codeless.core.botstore.botstore_index import (
+    BotStoreIndex,
+    encode_cursor,
+)
+from rasa_codeless.shared.constants import BotStoreSortKey
+from rasa_codeless.shared.exceptions.botstore import (
+    BotStoreIndexException,
+    InvalidBotStoreQueryException,
+)
+
+
+@pytest.fixture
+def index(tmp_path, summaries):
+    botstore_index = BotStoreIndex(index_path=str(tmp_path / "botstore_index.db"))
+    for summary in summaries:
+        botstore_index.upsert(summary=summary)
+    yield botstore_index
+    botstore_index.close()
+
+
+@pytest.mark.parametrize("sort_by", BotStoreSortKey.VALID_KEYS)
+@pytest.mark.parametrize("descending", [True, False])
+def test_query_sorts_ties_by_model_id_and_missing_scores_last(index, expected_order, sort_by, descending):
+    summaries, cursor = index.query(sort_by=sort_by, descending=descending)
+
+    assert [summary["model_id"] for summary in summaries] == expected_order(sort_by, descending)
+    assert cursor is None
+
+
+@pytest.mark.parametrize("sort_by", BotStoreSortKey.VALID_KEYS)
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_query_pages_follow_the_full_order(index, expected_order, read_pages, sort_by, descending, limit):
+    model_ids = read_pages(index.query, limit, sort_by=sort_by, descending=descending)
+
+    assert model_ids == expected_order(sort_by, descending)
+
+
+@pytest.mark.parametrize("limit", [1, 3])
+def test_query_pages_apply_score_bounds(index, expected_order, read_pages, limit):
+    query = {
+        "sort_by": BotStoreSortKey.TEST_LOSS,
+        "descending": False,
+        "min_scores": {"test_acc": 0.8},
+        "max_scores": {"epochs": 20},
+    }
+    model_ids = read_pages(index.query, limit, **query)
+
+    assert model_ids == expected_order(
+        BotStoreSortKey.TEST_LOSS, False, min_scores={"test_acc": 0.8}, max_scores={"epochs": 20}
+    )
+    assert model_ids == ["20220106-000000.tar.gz", "20220101-000000.tar.gz", "20220102-000000.tar.gz"]
+
+
+def test_query_returns_no_cursor_on_an_exactly_full_last_page(index, summaries):
+    page, cursor = index.query(limit=len(summaries))
+
+    assert len(page) == len(summaries)
+    assert cursor is None
+
+
+def test_missing_scores_are_listed_as_empty(index):
+    assert index.get(model_id="20220103-000000.tar.gz") == {
+        "model_id": "20220103-000000.tar.gz",
+        "test_acc": "",
+        "train_acc": "",
+        "test_loss": "",
+        "train_loss": "",
+        "epochs": "",
+    }
+
+
+def test_query_rejects_cursors_of_another_sort_order(index):
+    _, cursor = index.query(sort_by=BotStoreSortKey.TEST_ACC, descending=True, limit=1)
+
+    with pytest.raises(InvalidBotStoreQueryException):
+        index.query(sort_by=BotStoreSortKey.TEST_ACC, descending=False, limit=1, cursor=cursor)
+    with pytest.raises(InvalidBotStoreQueryException):
+        index.query(sort_by=BotStoreSortKey.TRAIN_ACC, descending=True, limit=1, cursor=cursor)
+    with pytest.raises(InvalidBotStoreQueryException):
+        index.query(limit=1, cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize("query", [
+    {"limit": 0},
+    {"sort_by": "model_id"},
+    {"min_scores": {"model_id": 1}},
+])
+def test_query_rejects_invalid_parameters(index, query):
+    with pytest.raises(InvalidBotStoreQueryException):
+        index.query(**query)
+
+
+def test_cursor_resumes_after_a_removed_model(index):
+    cursor = encode_cursor(
+        sort_by=BotStoreSortKey.TEST_ACC,
+        descending=True,
+        value=0.8,
+        model_id="20220102-000000.tar.gz",
+    )
+    index.remove(model_ids=["20220102-000000.tar.gz"])
+
+    summaries, _ = index.query(sort_by=BotStoreSortKey.TEST_ACC, descending=True, cursor=cursor)
+    assert [summary["model_id"] for summary in summaries] == [
+        "20220101-000000.tar.gz",
+        "20220104-000000.tar.gz",
+        "20220105-000000.tar.gz",
+        "20220103-000000.tar.gz",
+    ]
+
+
+def test_upsert_rejects_models_not_named_after_a_timestamp(index):
+    with pytest.raises(BotStoreIndexException):
+        index.upsert(summary={"model_id": "model.tar.gz", "test_acc": "", "train_acc": "", "test_loss": "",
+                              "train_loss": "", "epochs": ""})
+
+
+def test_index_of_an_older_version_is_rebuilt(tmp_path):
+    # the first version stored the model timestamps as
+    # epoch seconds
+    index_path = str(tmp_path / "botstore_index.db")
+    with sqlite3.connect(index_path) as conn:
+        conn.execute("CREATE TABLE botstore_index (model_id TEXT PRIMARY KEY, model_timestamp INT NOT NULL, "
+                     "train_acc REAL, test_acc REAL, train_loss REAL, test_loss REAL, epochs INT)")
+        conn.execute("INSERT INTO botstore_index (model_id, model_timestamp) VALUES (?, ?)",
+                     ("20220101-000000.tar.gz", 1640995200))
+    conn.close()
+
+    index = BotStoreIndex(index_path=index_path)
+    assert index.model_ids() == []
+    index.upsert(summary={"model_id": "20220101-000000.tar.gz", "test_acc": 0.5, "train_acc": 0.5,
+                          "test_loss": 0.5, "train_loss": 0.5, "epochs": 1})
+    index.close()
+
+    # the rebuilt index is kept
+    index = BotStoreIndex(index_path=index_path)
+    assert index.model_ids() == ["20220101-000000.tar.gz"]
+    assert index._connection().execute("SELECT model_timestamp FROM botstore_index").fetchone()[0] == \
+        20220101000000
+    index.close()
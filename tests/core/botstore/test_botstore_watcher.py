@@ -0,0 +1,92 @@
+import os
+import shutil
+import time
+
+import pytest
+
+pytest.importorskip("rasa")
+
+from rasa_codeless.core.botstore import botstore_watcher  # noqa: E402
+from rasa_codeless.core.botstore.botstore_watcher import BotStoreWatcher  # noqa: E402
+from rasa_codeless.core.botstore.local_botstore import LocalBotStore  # noqa: E402
+
+MODEL_NAME = "20220101-000000.tar.gz"
+
+
+@pytest.fixture
+def local_botstore(tmp_path):
+    botstore = LocalBotStore(
+        botstore_path=str(tmp_path / "bot_store"),
+        models_path=str(tmp_path / "models"),
+        index_path=str(tmp_path / "botstore_index.db"),
+    )
+    yield botstore
+    botstore.index.close()
+
+
+@pytest.fixture
+def polling_watcher(local_botstore, monkeypatch):
+    # polls the dirs the way the watcher does without
+    # watchdog
+    monkeypatch.setattr(botstore_watcher, "Observer", None)
+    watcher = BotStoreWatcher(botstore=local_botstore, poll_interval=0.01)
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+
+def bump_mtime(dir_path):
+    # filesystems with a coarse mtime resolution would
+    # not tell changes within the same tick apart
+    mtime_ns = os.stat(dir_path).st_mtime_ns + 1_000_000
+    os.utime(dir_path, ns=(mtime_ns, mtime_ns))
+
+
+def wait_for_models(botstore, models, timeout=5):
+    deadline = time.monotonic() + timeout
+    while botstore.registry.models() != models and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return botstore.registry.models()
+
+
+def test_polling_watcher_picks_up_external_changes(polling_watcher, local_botstore, tmp_path):
+    assert local_botstore.registry.watched
+    assert local_botstore.get_models() == []
+
+    # a model copied in by hand
+    (tmp_path / "bot_store" / MODEL_NAME[:-len(".tar.gz")]).mkdir()
+    bump_mtime(tmp_path / "bot_store")
+    (tmp_path / "models" / MODEL_NAME).write_bytes(b"model")
+    bump_mtime(tmp_path / "models")
+    assert wait_for_models(local_botstore, [MODEL_NAME]) == [MODEL_NAME]
+
+    # and removed by hand
+    shutil.rmtree(tmp_path / "bot_store" / MODEL_NAME[:-len(".tar.gz")])
+    bump_mtime(tmp_path / "bot_store")
+    assert wait_for_models(local_botstore, []) == []
+    assert not local_botstore.model_exists(MODEL_NAME)
+
+    polling_watcher.stop()
+    assert not local_botstore.registry.watched
+
+
+def test_filesystem_events_update_the_registry(local_botstore, tmp_path):
+    watcher = BotStoreWatcher(botstore=local_botstore)
+    local_botstore.registry.refresh(force=True)
+    model_dir = str(tmp_path / "bot_store" / MODEL_NAME[:-len(".tar.gz")])
+    model_file = str(tmp_path / "models" / "archive" / MODEL_NAME)
+
+    watcher.path_added(path=model_dir, is_directory=True)
+    watcher.path_added(path=model_file, is_directory=False)
+    watcher.path_added(path=str(tmp_path / "bot_store" / "not_a_model"), is_directory=True)
+    assert local_botstore.registry.models() == [MODEL_NAME]
+
+    local_botstore.index.upsert(summary={
+        "model_id": MODEL_NAME, "test_acc": 0.5, "train_acc": 0.5, "test_loss": 0.5, "train_loss": 0.5, "epochs": 1,
+    })
+    # changed event files drop the scores of the model
+    watcher.path_modified(path=os.path.join(model_dir, "tensorboard", "train", "events.out.tfevents.0.test.v2"))
+    assert local_botstore.index.model_ids() == []
+
+    watcher.path_removed(path=model_file, is_directory=False)
+    assert local_botstore.registry.models() == []
@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from rasa_codeless.core.botstore import model_registry
+from rasa_codeless.core.botstore.model_registry import ModelRegistry
+
+MODELS = ["20220101-000000.tar.gz", "20220103-000000.tar.gz", "20220102-000000.tar.gz"]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "models").mkdir()
+    (tmp_path / "bot_store").mkdir()
+    return ModelRegistry(botstore_path=str(tmp_path / "bot_store"), models_path=str(tmp_path / "models"))
+
+
+def add_model(tmp_path, model_name, model_file=True, botstore_dir=True):
+    # copies a model in by hand, the way the registry
+    # has to pick up by rescanning
+    if model_file:
+        (tmp_path / "models" / model_name).write_bytes(b"model")
+    if botstore_dir:
+        (tmp_path / "bot_store" / model_name[:-len(".tar.gz")]).mkdir()
+
+
+def touch(dir_path, mtime_ns):
+    os.utime(dir_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_refresh_finds_models_in_both_dirs(registry, tmp_path):
+    for model_name in MODELS:
+        add_model(tmp_path, model_name)
+    add_model(tmp_path, "20220104-000000.tar.gz", botstore_dir=False)
+    add_model(tmp_path, "20220105-000000.tar.gz", model_file=False)
+    (tmp_path / "bot_store" / "not_a_model").mkdir()
+
+    assert registry.models() == ["20220103-000000.tar.gz", "20220102-000000.tar.gz", "20220101-000000.tar.gz"]
+    assert registry.latest() == "20220103-000000.tar.gz"
+    assert registry.contains("20220101-000000.tar.gz")
+    assert not registry.contains("20220104-000000.tar.gz")
+    assert registry.timestamp("20220102-000000.tar.gz") == 20220102000000
+
+
+def test_refresh_finds_nested_model_files(registry, tmp_path):
+    (tmp_path / "models" / "archive").mkdir()
+    (tmp_path / "models" / "archive" / MODELS[0]).write_bytes(b"model")
+    add_model(tmp_path, MODELS[0], model_file=False)
+
+    assert registry.models() == [MODELS[0]]
+
+
+def test_register_and_unregister_models(registry):
+    # the first scan reads the dirs, the models are
+    # registered after it
+    assert registry.models() == []
+
+    # a model is valid once it is in both dirs
+    for model_name in MODELS:
+        registry.add_botstore_model(model_name)
+    assert registry.models() == []
+    registry.add_model_file(MODELS[0])
+    registry.add_model_file(MODELS[1])
+    assert registry.models() == [MODELS[1], MODELS[0]]
+    registry.add_model_file(MODELS[2])
+    registry.add_model_file(MODELS[2])
+    assert registry.models() == ["20220103-000000.tar.gz", "20220102-000000.tar.gz", "20220101-000000.tar.gz"]
+
+    registry.remove_model_file(MODELS[1])
+    assert registry.models() == ["20220102-000000.tar.gz", "20220101-000000.tar.gz"]
+    registry.remove_botstore_model(MODELS[0])
+    registry.remove_botstore_model(MODELS[0])
+    assert registry.models() == ["20220102-000000.tar.gz"]
+    assert registry.timestamp(MODELS[0]) is None
+
+    # the model file is kept, and is valid again once
+    # its botstore dir is back
+    registry.add_botstore_model(MODELS[0])
+    assert registry.models() == ["20220102-000000.tar.gz", "20220101-000000.tar.gz"]
+
+
+def test_models_with_equal_timestamp_keys_are_ordered_by_name(registry, monkeypatch):
+    # keys of the day a model was trained on, so that
+    # models of the same day tie
+    monkeypatch.setattr(model_registry, "model_timestamp_key", lambda model_name: int(model_name[:8]))
+    models = ["20220101-120000.tar.gz", "20220102-000000.tar.gz", "20220101-000000.tar.gz", "20220101-060000.tar.gz"]
+    registry.refresh()
+    for model_name in models:
+        registry.add_botstore_model(model_name)
+        registry.add_model_file(model_name)
+
+    assert registry.models() == [
+        "20220102-000000.tar.gz", "20220101-120000.tar.gz", "20220101-060000.tar.gz", "20220101-000000.tar.gz",
+    ]
+
+    # only the removed model leaves, not the ones it ties with
+    registry.remove_model_file("20220101-060000.tar.gz")
+    assert registry.models() == ["20220102-000000.tar.gz", "20220101-120000.tar.gz", "20220101-000000.tar.gz"]
+    registry.remove_model_file("20220101-000000.tar.gz")
+    registry.remove_model_file("20220101-120000.tar.gz")
+    assert registry.models() == ["20220102-000000.tar.gz"]
+
+
+def test_refresh_skips_dirs_with_unchanged_mtime(registry, tmp_path, monkeypatch):
+    add_model(tmp_path, MODELS[0])
+    scans = list()
+    for scan in ["_scan_model_files", "_scan_botstore"]:
+        def counted_scan(scan=scan, original=getattr(registry, scan)):
+            scans.append(scan)
+            original()
+        monkeypatch.setattr(registry, scan, counted_scan)
+
+    assert registry.models() == [MODELS[0]]
+    assert scans == ["_scan_model_files", "_scan_botstore"]
+
+    assert registry.models() == [MODELS[0]]
+    assert scans == ["_scan_model_files", "_scan_botstore"]
+
+    # a model copied into the models dir only rescans it
+    (tmp_path / "models" / MODELS[1]).write_bytes(b"model")
+    touch(tmp_path / "models", os.stat(tmp_path / "models").st_mtime_ns + 1)
+    assert registry.models() == [MODELS[0]]
+    assert scans == ["_scan_model_files", "_scan_botstore", "_scan_model_files"]
+
+    add_model(tmp_path, MODELS[1], model_file=False)
+    touch(tmp_path / "bot_store", os.stat(tmp_path / "bot_store").st_mtime_ns + 1)
+    assert registry.models() == [MODELS[1], MODELS[0]]
+    assert scans == ["_scan_model_files", "_scan_botstore", "_scan_model_files", "_scan_botstore"]
+
+    registry.refresh(force=True)
+    assert scans[4:] == ["_scan_model_files", "_scan_botstore"]
+
+
+def test_refresh_is_skipped_while_watched(registry, tmp_path):
+    assert registry.models() == []
+    registry.watched = True
+
+    add_model(tmp_path, MODELS[0])
+    touch(tmp_path / "models", os.stat(tmp_path / "models").st_mtime_ns + 1)
+    touch(tmp_path / "bot_store", os.stat(tmp_path / "bot_store").st_mtime_ns + 1)
+    assert registry.models() == []
+
+    # the watcher polls the registry itself
+    registry.poll()
+    assert registry.models() == [MODELS[0]]
@@ -0,0 +1,289 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from rasa_codeless.shared.constants import BotStoreSortKey
+from rasa_codeless.shared.exceptions.botstore import (
+    MongoDBBotStoreUpdateException,
+    MongoDBBotSoreReadException,
+)
+
+mongomock = pytest.importorskip("mongomock")
+
+# collections of the mongo_botstore fixture
+DATABASE = "botstore"
+TENSORBOARD_COLLECTION = "tensorboard"
+CONFIGURATION_COLLECTION = "configuration"
+
+
+def model_record(model_id, test_acc=0.8, epochs=3):
+    return {
+        "model_id": model_id,
+        "epochs": epochs,
+        "train": [0.5] * (epochs - 1) + [0.9],
+        "test": [0.5] * (epochs - 1) + [test_acc],
+        "train_loss": [0.5] * (epochs - 1) + [0.2],
+        "test_loss": [0.5] * (epochs - 1) + [0.3],
+        "config": {"pipeline": [{"name": "DIETClassifier", "epochs": epochs}]},
+    }
+
+
+def read_collection(mongo_client, collection_name):
+    return {
+        record["model_id"]: record
+        for record in mongo_client[DATABASE][collection_name].find(dict(), projection={"_id": 0})
+    }
+
+
+def test_bulk_sync_upserts_both_collections(mongo_botstore, mongo_client):
+    models = [model_record("20220101-000000.tar.gz"), model_record("20220102-000000.tar.gz", test_acc=0.7)]
+
+    report = mongo_botstore.bulk_sync(models=models)
+
+    assert report["errors"] == []
+    assert report[TENSORBOARD_COLLECTION]["upserted"] == 2
+    assert report[CONFIGURATION_COLLECTION]["upserted"] == 2
+    assert read_collection(mongo_client, TENSORBOARD_COLLECTION)["20220102-000000.tar.gz"]["test"] == [0.5, 0.5, 0.7]
+    config_record = read_collection(mongo_client, CONFIGURATION_COLLECTION)["20220102-000000.tar.gz"]
+    assert config_record["config"] == models[1]["config"]
+    # final scores are kept with the config for the
+    # model summaries
+    assert (config_record["final_test_acc"], config_record["final_epochs"]) == (0.7, 3)
+
+
+def test_bulk_sync_matches_existing_records(mongo_botstore):
+    models = [model_record("20220101-000000.tar.gz")]
+    mongo_botstore.bulk_sync(models=models)
+
+    report = mongo_botstore.bulk_sync(models=models)
+
+    assert report["errors"] == []
+    assert report[TENSORBOARD_COLLECTION]["matched"] == 1
+    assert report[TENSORBOARD_COLLECTION]["upserted"] == 0
+
+
+def test_bulk_sync_unsets_final_scores_of_partial_updates(mongo_botstore, mongo_client):
+    mongo_botstore.bulk_sync(models=[model_record("20220101-000000.tar.gz")])
+
+    mongo_botstore.bulk_sync(models=[{"model_id": "20220101-000000.tar.gz", "epochs": 4}])
+
+    config_record = read_collection(mongo_client, CONFIGURATION_COLLECTION)["20220101-000000.tar.gz"]
+    assert not any(field.startswith("final_") for field in config_record)
+
+
+def test_bulk_sync_reports_records_without_model_id(mongo_botstore, mongo_client):
+    models = [{"epochs": 3, "config": None}, model_record("20220101-000000.tar.gz")]
+
+    report = mongo_botstore.bulk_sync(models=models)
+
+    assert report["errors"] == [
+        {"model_id": None, "collection": None, "code": None, "message": "Record has no model_id"}
+    ]
+    assert list(read_collection(mongo_client, TENSORBOARD_COLLECTION)) == ["20220101-000000.tar.gz"]
+
+
+def test_bulk_sync_maps_write_errors_to_model_ids(mongo_botstore, monkeypatch):
+    def bulk_write(collection, requests, ordered=True):
+        raise BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+            "writeConcernErrors": [],
+            "nMatched": 0,
+            "nModified": 0,
+            "nUpserted": 1,
+        })
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", bulk_write)
+    models = [model_record("20220101-000000.tar.gz"), model_record("20220102-000000.tar.gz")]
+
+    report = mongo_botstore.bulk_sync(models=models)
+
+    assert [(error["model_id"], error["collection"], error["code"]) for error in report["errors"]] == [
+        ("20220102-000000.tar.gz", TENSORBOARD_COLLECTION, 11000),
+        ("20220102-000000.tar.gz", CONFIGURATION_COLLECTION, 11000),
+    ]
+    assert report[TENSORBOARD_COLLECTION] == {"matched": 0, "modified": 0, "upserted": 1, "failed": 1}
+
+
+def test_bulk_sync_reports_every_model_of_a_failed_batch(mongo_botstore, mongo_client, monkeypatch):
+    bulk_write = mongomock.collection.Collection.bulk_write
+    calls = list()
+
+    def fail_first_batch(collection, requests, ordered=True):
+        calls.append(collection.name)
+        if len(calls) == 1:
+            raise ConnectionError("connection reset")
+        return bulk_write(collection, requests, ordered=ordered)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", fail_first_batch)
+    models = [model_record(f"2022010{day}-000000.tar.gz") for day in range(1, 4)]
+
+    report = mongo_botstore.bulk_sync(models=models, batch_size=2)
+
+    assert [(error["model_id"], error["message"]) for error in report["errors"]] == [
+        ("20220101-000000.tar.gz", "connection reset"),
+        ("20220102-000000.tar.gz", "connection reset"),
+    ]
+    assert report[TENSORBOARD_COLLECTION]["failed"] == 2
+    assert list(read_collection(mongo_client, TENSORBOARD_COLLECTION)) == ["20220103-000000.tar.gz"]
+    assert len(read_collection(mongo_client, CONFIGURATION_COLLECTION)) == 3
+
+
+@pytest.mark.parametrize("batch_size", [0, -1, None])
+def test_bulk_sync_with_invalid_batch_size(mongo_botstore, batch_size):
+    with pytest.raises(MongoDBBotStoreUpdateException):
+        mongo_botstore.bulk_sync(models=[model_record("20220101-000000.tar.gz")], batch_size=batch_size)
+
+
+@pytest.fixture
+def synced_botstore(mongo_botstore):
+    # synced in reverse, so records are not read in
+    # insertion order by chance
+    mongo_botstore.bulk_sync(models=[model_record(f"2022010{day}-000000.tar.gz") for day in range(5, 0, -1)])
+    return mongo_botstore
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5, 10])
+def test_iterate_records_pages_in_model_id_order(synced_botstore, batch_size, monkeypatch):
+    find = mongomock.collection.Collection.find
+    pages = list()
+
+    def count_pages(collection, *args, **kwargs):
+        pages.append(collection.name)
+        return find(collection, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "find", count_pages)
+    records = list(synced_botstore.iterate_records(collection_name=TENSORBOARD_COLLECTION, batch_size=batch_size))
+
+    assert [record["model_id"] for record in records] == [f"2022010{day}-000000.tar.gz" for day in range(1, 6)]
+    # the last page is short, or empty if the records
+    # fill the previous page
+    assert len(pages) == 5 // batch_size + 1
+
+
+def test_iterate_records_resumes_after_model_id(synced_botstore):
+    records = synced_botstore.iterate_records(
+        collection_name=TENSORBOARD_COLLECTION,
+        batch_size=2,
+        start_after="20220102-000000.tar.gz",
+    )
+
+    assert [record["model_id"] for record in records] == [
+        "20220103-000000.tar.gz", "20220104-000000.tar.gz", "20220105-000000.tar.gz"
+    ]
+
+
+def test_iterate_records_fetches_only_requested_fields(synced_botstore):
+    records = list(synced_botstore.iterate_records(
+        collection_name=TENSORBOARD_COLLECTION,
+        batch_size=2,
+        fields=["epochs"],
+    ))
+
+    assert len(records) == 5
+    assert all(set(record) == {"model_id", "epochs"} for record in records)
+
+
+def test_iterate_records_filters_by_query(synced_botstore):
+    synced_botstore.bulk_sync(models=[model_record("20220103-000000.tar.gz", epochs=7)])
+
+    records = synced_botstore.iterate_records(
+        collection_name=TENSORBOARD_COLLECTION,
+        batch_size=1,
+        start_after="20220101-000000.tar.gz",
+        query={"epochs": {"$lt": 5}},
+    )
+
+    assert [record["model_id"] for record in records] == [
+        "20220102-000000.tar.gz", "20220104-000000.tar.gz", "20220105-000000.tar.gz"
+    ]
+
+
+def test_iterate_records_with_invalid_batch_size(synced_botstore):
+    with pytest.raises(MongoDBBotSoreReadException):
+        next(synced_botstore.iterate_records(collection_name=TENSORBOARD_COLLECTION, batch_size=0))
+
+
+def summary_record(summary):
+    if summary["epochs"] == "":
+        # models without results only get a config record
+        return {"model_id": summary["model_id"], "config": None}
+    return {
+        "model_id": summary["model_id"],
+        "epochs": summary["epochs"],
+        "train": [0.0, summary["train_acc"]],
+        "test": [0.0, summary["test_acc"]],
+        "train_loss": [1.0, summary["train_loss"]],
+        "test_loss": [1.0, summary["test_loss"]],
+        "config": None,
+    }
+
+
+@pytest.fixture
+def summaries_botstore(mongo_botstore, summaries):
+    mongo_botstore.bulk_sync(models=[summary_record(summary) for summary in summaries])
+    return mongo_botstore
+
+
+@pytest.mark.parametrize("sort_by", BotStoreSortKey.VALID_KEYS)
+@pytest.mark.parametrize("descending", [True, False])
+def test_model_summaries_sort_like_the_botstore_index(summaries_botstore, expected_order, sort_by, descending):
+    page, cursor = summaries_botstore.model_summaries(sort_by=sort_by, descending=descending)
+
+    assert [summary["model_id"] for summary in page] == expected_order(sort_by, descending)
+    assert cursor is None
+
+
+@pytest.mark.parametrize("sort_by", BotStoreSortKey.VALID_KEYS)
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_model_summaries_pages_across_ties_and_missing_scores(
+        summaries_botstore, expected_order, read_pages, sort_by, descending, limit
+):
+    model_ids = read_pages(summaries_botstore.model_summaries, limit=limit, sort_by=sort_by, descending=descending)
+
+    assert model_ids == expected_order(sort_by, descending)
+
+
+def test_model_summaries_filter_by_score_bounds(summaries_botstore, expected_order, read_pages):
+    query = {"min_scores": {"test_acc": 0.8}, "max_scores": {"test_loss": 0.3}}
+
+    model_ids = read_pages(
+        summaries_botstore.model_summaries, limit=1, sort_by=BotStoreSortKey.TRAIN_ACC, descending=True, **query
+    )
+
+    assert model_ids == expected_order(BotStoreSortKey.TRAIN_ACC, True, **query)
+
+
+def test_model_summaries_return_final_scores(summaries_botstore):
+    page, _ = summaries_botstore.model_summaries(sort_by=BotStoreSortKey.TIMESTAMP, descending=False, limit=3)
+
+    assert page[0] == {
+        "model_id": "20220101-000000.tar.gz",
+        "test_acc": 0.8,
+        "train_acc": 0.9,
+        "test_loss": 0.3,
+        "train_loss": 0.2,
+        "epochs": list(range(1, 11)),
+    }
+    assert page[2]["test_acc"] == page[2]["epochs"] == ""
+
+
+def test_backfill_summaries_fills_records_synced_without_them(
+        mongo_botstore, mongo_client, summaries, expected_order, read_pages
+):
+    # records synced before the final scores were kept
+    # with the config
+    for summary in summaries:
+        record = summary_record(summary)
+        mongo_client[DATABASE][CONFIGURATION_COLLECTION].insert_one(
+            {"model_id": record["model_id"], "config": record.pop("config")}
+        )
+        if "epochs" in record:
+            mongo_client[DATABASE][TENSORBOARD_COLLECTION].insert_one(record)
+
+    assert mongo_botstore.backfill_summaries(batch_size=4) == len(summaries)
+    assert mongo_botstore.backfill_summaries(batch_size=4) == 0
+
+    model_ids = read_pages(
+        mongo_botstore.model_summaries, limit=2, sort_by=BotStoreSortKey.TEST_LOSS, descending=False
+    )
+    assert model_ids == expected_order(BotStoreSortKey.TEST_LOSS, False)
@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+pytest.importorskip("rasa")
+
+from rasa_codeless.core.botstore.local_botstore import LocalBotStore  # noqa: E402
+from rasa_codeless.core.botstore.write_through_botstore import WriteThroughBotStore  # noqa: E402
+
+MODEL_NAME = "20220101-000000.tar.gz"
+
+
+@pytest.fixture
+def local_botstore(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models").mkdir()
+    botstore = LocalBotStore(
+        botstore_path="bot_store",
+        models_path="models",
+        index_path=str(tmp_path / "botstore_index.db"),
+    )
+    yield botstore
+    botstore.index.close()
+
+
+@pytest.fixture
+def write_through(local_botstore, mongo_botstore):
+    return WriteThroughBotStore(local=local_botstore, remote=mongo_botstore)
+
+
+@pytest.fixture
+def train_model(tmp_path, append_events):
+    def _train_model(botstore, model_name=MODEL_NAME, accuracy=0.5):
+        # persists and registers a model the way a
+        # training job promotes it, with the intent
+        # accuracy and loss of two epochs
+        workspace = tmp_path / "workspaces" / model_name
+        for results_dir in ["train", "validation"]:
+            append_events(workspace / "tensorboard" / results_dir / "events.out.tfevents.0.test.v2", [
+                (epoch, epoch, {"epoch_i_acc": value, "epoch_t_loss": 1 - value})
+                for epoch, value in enumerate([0.25, accuracy])
+            ])
+        (workspace / "config.yml").write_text("pipeline: []\n")
+
+        botstore.persist_model(model_name=model_name, asset_sources={
+            "config.yml": str(workspace / "config.yml"),
+            "tensorboard": str(workspace / "tensorboard"),
+        })
+        (tmp_path / "models" / model_name).write_bytes(b"model")
+        botstore.register_model(model_name=model_name)
+
+    return _train_model
+
+
+def test_register_model_writes_records_through(write_through, mongo_botstore, train_model):
+    train_model(write_through, accuracy=0.75)
+
+    assert mongo_botstore.get_models() == [MODEL_NAME]
+    scores = mongo_botstore.model_performance(model_name=MODEL_NAME, curve=False)
+    assert (scores["test_acc"], scores["epochs"]) == (0.75, [1, 2])
+    assert write_through._unsynced == set()
+
+
+def test_failed_write_through_is_retried(write_through, mongo_botstore, train_model, monkeypatch):
+    bulk_sync = mongo_botstore.bulk_sync
+
+    def unavailable(**kwargs):
+        raise ConnectionError("MongoDB is unavailable")
+
+    monkeypatch.setattr(mongo_botstore, "bulk_sync", unavailable)
+    train_model(write_through)
+
+    # the model is kept locally and retried later
+    assert write_through.get_models() == [MODEL_NAME]
+    assert write_through._unsynced == {MODEL_NAME}
+
+    monkeypatch.setattr(mongo_botstore, "bulk_sync", bulk_sync)
+    assert write_through.retry_unsynced()["errors"] == []
+    assert mongo_botstore.get_models() == [MODEL_NAME]
+    assert write_through._unsynced == set()
+    assert write_through.retry_unsynced() is None
+
+
+def test_sync_writes_models_missing_in_mongodb(write_through, local_botstore, mongo_botstore, train_model):
+    # models trained before write through was enabled
+    train_model(local_botstore)
+    assert mongo_botstore.get_models() == []
+
+    assert write_through.sync()["errors"] == []
+    assert mongo_botstore.get_models() == [MODEL_NAME]
+    assert write_through.sync() == {"errors": []}
+
+
+def test_delete_model_is_propagated(write_through, mongo_botstore, train_model):
+    train_model(write_through)
+
+    write_through.delete_model(model_name=MODEL_NAME)
+
+    assert write_through.get_models() == []
+    assert mongo_botstore.get_models() == []
+
+
+def test_deleted_models_are_not_retried(write_through, mongo_botstore, train_model, monkeypatch):
+    monkeypatch.setattr(mongo_botstore, "bulk_sync", lambda **kwargs: {"errors": [
+        {"model_id": MODEL_NAME, "collection": None, "code": None, "message": "failed"}
+    ]})
+    train_model(write_through)
+    assert write_through._unsynced == {MODEL_NAME}
+
+    write_through.delete_model(model_name=MODEL_NAME)
+
+    assert write_through._unsynced == set()
+
+
+def test_sync_thread_backs_off_while_mongodb_is_unavailable(write_through, local_botstore, mongo_botstore,
+                                                            train_model, monkeypatch):
+    train_model(local_botstore)
+    bulk_sync = mongo_botstore.bulk_sync
+    attempts = list()
+
+    def recovering_bulk_sync(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) <= 3:
+            raise ConnectionError("MongoDB is unavailable")
+        return bulk_sync(**kwargs)
+
+    intervals = list()
+
+    class RecordingEvent(threading.Event):
+        def wait(self, timeout=None):
+            intervals.append(timeout)
+            return len(intervals) == 5
+
+    monkeypatch.setattr(mongo_botstore, "bulk_sync", recovering_bulk_sync)
+    write_through._stop_sync = RecordingEvent()
+    write_through.start_sync(retry_interval=1, max_retry_interval=4).join(timeout=10)
+
+    # the interval doubles on each failure up to the
+    # maximum, and is reset once the models are written
+    assert intervals == [2, 4, 4, 1, 1]
+    assert len(attempts) == 4
+    assert mongo_botstore.get_models() == [MODEL_NAME]
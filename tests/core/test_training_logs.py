@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from rasa_codeless.core.training_logs import (
+    TrainingLogWriter,
+    get_training_log_path,
+    prune_training_logs,
+    tail_training_log,
+)
+
+REQUEST_ID = "job-1"
+
+
+@pytest.fixture
+def logs_path(tmp_path):
+    return str(tmp_path / "training_logs")
+
+
+class JobState:
+    def __init__(self):
+        self.finished = False
+
+    def is_finished(self):
+        return self.finished
+
+
+@pytest.fixture
+def job():
+    return JobState()
+
+
+def tail(logs_path, job, heartbeat_interval=3600):
+    return tail_training_log(
+        request_id=REQUEST_ID,
+        is_finished=job.is_finished,
+        logs_path=logs_path,
+        poll_interval=0,
+        heartbeat_interval=heartbeat_interval,
+    )
+
+
+def test_tail_training_log_follows_appended_lines(logs_path, job):
+    writer = TrainingLogWriter(request_id=REQUEST_ID, logs_path=logs_path)
+    writer.write("Epoch 1/2\n")
+    log_lines = tail(logs_path, job)
+
+    assert next(log_lines) == "Epoch 1/2"
+    writer.write("Epoch 2/2\n")
+    assert next(log_lines) == "Epoch 2/2"
+
+    writer.close()
+    job.finished = True
+    assert list(log_lines) == []
+
+
+def test_tail_training_log_yields_partial_last_line_once_finished(logs_path, job):
+    os.makedirs(logs_path)
+    log_path = get_training_log_path(request_id=REQUEST_ID, logs_path=logs_path)
+    with open(log_path, mode="w", encoding="utf8") as log_file:
+        log_file.write("Training\nSaving the mod")
+    log_lines = tail(logs_path, job)
+
+    assert next(log_lines) == "Training"
+    with open(log_path, mode="a", encoding="utf8") as log_file:
+        log_file.write("el")
+    job.finished = True
+    assert list(log_lines) == ["Saving the model"]
+
+
+def test_tail_training_log_sends_heartbeats_until_the_log_is_written(logs_path, job):
+    log_lines = tail(logs_path, job, heartbeat_interval=0)
+
+    assert next(log_lines) is None
+    assert next(log_lines) is None
+
+    writer = TrainingLogWriter(request_id=REQUEST_ID, logs_path=logs_path)
+    writer.write("Training\n")
+    writer.close()
+    assert next(log_lines) == "Training"
+
+
+def test_tail_training_log_ends_for_finished_job_without_log(logs_path, job):
+    job.finished = True
+
+    assert list(tail(logs_path, job)) == []
+
+
+def test_tail_training_log_reopens_rotated_log(logs_path, job):
+    # two lines fit into a log file before it is rotated
+    writer = TrainingLogWriter(request_id=REQUEST_ID, logs_path=logs_path, max_bytes=25, backup_count=3)
+    writer.write("line-0001")
+    log_lines = tail(logs_path, job)
+    assert next(log_lines) == "line-0001"
+
+    log_path = get_training_log_path(request_id=REQUEST_ID, logs_path=logs_path)
+    log_inode = os.stat(log_path).st_ino
+    # the second line is written before the rotation,
+    # and is still read from the rotated file
+    for line in ["line-0002", "line-0003", "line-0004"]:
+        writer.write(line)
+    assert os.stat(log_path).st_ino != log_inode
+    assert os.path.exists(f"{log_path}.1")
+
+    writer.close()
+    job.finished = True
+    assert list(log_lines) == ["line-0002", "line-0003", "line-0004"]
+
+
+def write_job_log(logs_path, request_id, modified_at, rotated_files=0):
+    os.makedirs(logs_path, exist_ok=True)
+    log_path = get_training_log_path(request_id=request_id, logs_path=logs_path)
+    for file_path in [log_path] + [f"{log_path}.{index}" for index in range(1, rotated_files + 1)]:
+        with open(file_path, mode="w", encoding="utf8") as log_file:
+            log_file.write(request_id)
+        os.utime(file_path, (modified_at, modified_at))
+
+
+def test_prune_training_logs_deletes_oldest_finished_logs(logs_path):
+    write_job_log(logs_path, "oldest", modified_at=100, rotated_files=2)
+    write_job_log(logs_path, "older", modified_at=200)
+    write_job_log(logs_path, "latest", modified_at=300)
+    write_job_log(logs_path, "running", modified_at=50)
+
+    assert prune_training_logs(keep_request_ids={"running"}, logs_path=logs_path, retention=1) == 2
+    assert sorted(os.listdir(logs_path)) == ["latest.log", "running.log"]
+
+
+def test_prune_training_logs_without_logs_dir(logs_path):
+    assert prune_training_logs(keep_request_ids=set(), logs_path=logs_path) == 0
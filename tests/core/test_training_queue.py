@@ -0,0 +1,222 @@
+import json
+import threading
+
+import pytest
+
+from rasa_codeless.core.training_queue import (
+    TrainingQueue,
+    create_in_memory_training_queue,
+)
+from rasa_codeless.shared.constants import (
+    PROCESS_ID_NONE,
+    TrainingJobState,
+)
+from rasa_codeless.shared.exceptions.server import ProcessNotExistsException
+
+
+@pytest.fixture
+def training_queue(tmp_path):
+    data_source_path = str(tmp_path / "training_queue.db")
+    create_in_memory_training_queue(data_source_path=data_source_path)
+    queue = TrainingQueue(data_source_path=data_source_path)
+    yield queue
+    queue.close()
+
+
+def push(training_queue, request_id, timestamp, priority=0, state=TrainingJobState.PENDING):
+    training_queue.push(
+        process_id=PROCESS_ID_NONE,
+        request_id=request_id,
+        timestamp=timestamp,
+        metadata=json.dumps({"configs": {}}),
+        state=state,
+        priority=priority,
+    )
+
+
+def test_transition_state_only_moves_from_allowed_states(training_queue):
+    push(training_queue, "job", timestamp=1)
+
+    assert not training_queue.transition_state(
+        request_id="job",
+        from_states=[TrainingJobState.RUNNING],
+        to_state=TrainingJobState.COMPLETED,
+    )
+    assert training_queue.get_request(request_id="job")["state"] == TrainingJobState.PENDING
+
+    assert training_queue.transition_state(
+        request_id="job",
+        from_states=[TrainingJobState.PENDING],
+        to_state=TrainingJobState.RUNNING,
+    )
+    assert training_queue.get_request(request_id="job")["state"] == TrainingJobState.RUNNING
+
+
+def test_transition_state_replaces_metadata_with_the_state(training_queue):
+    push(training_queue, "job", timestamp=1, state=TrainingJobState.RUNNING)
+
+    assert training_queue.transition_state(
+        request_id="job",
+        from_states=[TrainingJobState.RUNNING],
+        to_state=TrainingJobState.FAILED,
+        metadata=json.dumps({"error": "model"}),
+    )
+    assert not training_queue.transition_state(
+        request_id="job",
+        from_states=[TrainingJobState.RUNNING],
+        to_state=TrainingJobState.COMPLETED,
+        metadata=json.dumps({"latest_model": "model.tar.gz"}),
+    )
+
+    training_request = training_queue.get_request(request_id="job")
+    assert training_request["state"] == TrainingJobState.FAILED
+    assert json.loads(training_request["metadata"]) == {"error": "model"}
+
+
+def test_transition_state_of_unknown_request_fails(training_queue):
+    assert not training_queue.transition_state(
+        request_id="unknown",
+        from_states=[TrainingJobState.PENDING],
+        to_state=TrainingJobState.RUNNING,
+    )
+    with pytest.raises(ProcessNotExistsException):
+        training_queue.get_request(request_id="unknown")
+
+
+def test_concurrent_transitions_have_a_single_winner(training_queue):
+    push(training_queue, "job", timestamp=1)
+    barrier = threading.Barrier(8)
+    results = list()
+
+    def dispatch():
+        barrier.wait()
+        results.append(training_queue.transition_state(
+            request_id="job",
+            from_states=[TrainingJobState.PENDING],
+            to_state=TrainingJobState.RUNNING,
+        ))
+
+    threads = [threading.Thread(target=dispatch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+
+
+def test_next_pending_orders_by_priority_then_enqueue_time(training_queue):
+    push(training_queue, "low", timestamp=1)
+    push(training_queue, "high-late", timestamp=3, priority=5)
+    push(training_queue, "high-early", timestamp=2, priority=5)
+    push(training_queue, "running", timestamp=0, priority=10, state=TrainingJobState.RUNNING)
+
+    dispatched = list()
+    while True:
+        training_request = training_queue.next_pending()
+        if not training_request:
+            break
+        training_queue.transition_state(
+            request_id=training_request["request_id"],
+            from_states=[TrainingJobState.PENDING],
+            to_state=TrainingJobState.RUNNING,
+        )
+        dispatched.append(training_request["request_id"])
+
+    assert dispatched == ["high-early", "high-late", "low"]
+    assert training_queue.count(state=TrainingJobState.RUNNING) == 4
+    assert training_queue.count(state=TrainingJobState.PENDING) == 0
+
+
+def test_jobs_sharing_priority_and_time_keep_their_enqueue_order(training_queue):
+    for request_id in ["first", "second", "third"]:
+        push(training_queue, request_id, timestamp=1)
+
+    assert training_queue.next_pending()["request_id"] == "first"
+    assert [
+        training_queue.queue_position(request_id=request_id) for request_id in ["first", "second", "third"]
+    ] == [0, 1, 2]
+
+
+def test_queue_position_counts_pending_jobs_ahead(training_queue):
+    push(training_queue, "a", timestamp=1)
+    push(training_queue, "b", timestamp=2, priority=1)
+    push(training_queue, "c", timestamp=3)
+    push(training_queue, "done", timestamp=0, priority=9, state=TrainingJobState.COMPLETED)
+
+    assert training_queue.queue_position(request_id="b") == 0
+    assert training_queue.queue_position(request_id="a") == 1
+    assert training_queue.queue_position(request_id="c") == 2
+
+
+def test_try_enqueue_admits_a_request_once(training_queue):
+    admitted = [
+        training_queue.try_enqueue(
+            process_id=PROCESS_ID_NONE,
+            request_id="job",
+            timestamp=timestamp,
+            metadata=json.dumps({"configs": {"attempt": timestamp}}),
+        )
+        for timestamp in [1, 2]
+    ]
+
+    assert admitted == [True, False]
+    training_request = training_queue.get_request(request_id="job")
+    assert training_request["state"] == TrainingJobState.PENDING
+    assert json.loads(training_request["metadata"]) == {"configs": {"attempt": 1}}
+
+
+def test_racing_duplicate_requests_are_admitted_once(training_queue):
+    barrier = threading.Barrier(8)
+    results = list()
+
+    def submit():
+        barrier.wait()
+        results.append(training_queue.try_enqueue(
+            process_id=PROCESS_ID_NONE,
+            request_id="job",
+            timestamp=1,
+            metadata=json.dumps({"configs": {}}),
+        ))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert training_queue.count(state=TrainingJobState.PENDING) == 1
+
+
+def finish(training_queue, request_id, finished_at, state=TrainingJobState.COMPLETED):
+    training_queue.transition_state(
+        request_id=request_id,
+        from_states=[TrainingJobState.PENDING, TrainingJobState.RUNNING],
+        to_state=state,
+        metadata=json.dumps({"finished_at": finished_at}),
+    )
+
+
+def test_prune_finished_keeps_the_latest_finished_requests(training_queue):
+    for index, state in enumerate([TrainingJobState.COMPLETED, TrainingJobState.FAILED, TrainingJobState.ABORTED]):
+        push(training_queue, f"finished-{index}", timestamp=index)
+        # finished in reverse order of submission
+        finish(training_queue, f"finished-{index}", finished_at=10 - index, state=state)
+    push(training_queue, "pending", timestamp=3)
+    push(training_queue, "running", timestamp=4, state=TrainingJobState.RUNNING)
+
+    assert training_queue.prune_finished(retention=1) == 2
+    assert sorted(request["request_id"] for request in training_queue.inspect()) == [
+        "finished-0", "pending", "running"
+    ]
+
+
+def test_prune_finished_keeps_requested_jobs(training_queue):
+    for index in range(3):
+        push(training_queue, f"finished-{index}", timestamp=index)
+        finish(training_queue, f"finished-{index}", finished_at=index)
+
+    assert training_queue.prune_finished(retention=1, keep_request_ids={"finished-0"}) == 1
+    assert sorted(request["request_id"] for request in training_queue.inspect()) == ["finished-0", "finished-2"]
+    assert training_queue.prune_finished(retention=2) == 0
@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("rasa")
+
+from rasa_codeless.core import training_supervisor  # noqa: E402
+from rasa_codeless.core.training_queue import (  # noqa: E402
+    TrainingQueue,
+    create_in_memory_training_queue,
+)
+from rasa_codeless.core.training_supervisor import TrainingSupervisor  # noqa: E402
+from rasa_codeless.shared.constants import (  # noqa: E402
+    PROCESS_ID_NONE,
+    TrainingJobState,
+)
+
+CONFIGS = {
+    "pipeline": [
+        {"name": "DIETClassifier", "epochs": 4, "tensorboard_log_directory": "./tensorboard"},
+    ],
+    "policies": [{"name": "RulePolicy"}],
+}
+
+
+@pytest.fixture
+def training_queue(tmp_path):
+    data_source_path = str(tmp_path / "training_queue.db")
+    create_in_memory_training_queue(data_source_path=data_source_path)
+    queue = TrainingQueue(data_source_path=data_source_path)
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def supervisor(tmp_path, training_queue):
+    return TrainingSupervisor(
+        training_queue=training_queue,
+        botstore=None,
+        workspaces_path=str(tmp_path / "workspaces"),
+        logs_path=str(tmp_path / "training_logs"),
+    )
+
+
+@pytest.fixture
+def now(monkeypatch):
+    # the current time the remaining time is estimated at
+    clock = {"timestamp": 0.0}
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock["timestamp"], tz)
+
+    monkeypatch.setattr(training_supervisor, "datetime", FrozenDatetime)
+    return clock
+
+
+def test_progress_of_running_job(tmp_path, training_queue, supervisor, now, append_events):
+    training_queue.push(
+        process_id=PROCESS_ID_NONE,
+        request_id="job",
+        timestamp=1000,
+        metadata=json.dumps({"configs": CONFIGS}),
+        state=TrainingJobState.RUNNING,
+    )
+    results_path = tmp_path / "workspaces" / "job" / "tensorboard" / "DIETClassifier"
+    train_events = results_path / "train" / "events.out.tfevents.1000.test.v2"
+    validation_events = results_path / "validation" / "events.out.tfevents.1000.test.v2"
+
+    now["timestamp"] = 1005
+    progress = supervisor.progress(request_id="job")
+    assert (progress["epoch"], progress["total_epochs"], progress["eta"]) == (0, 4, None)
+
+    append_events(train_events, [(1010, 0, {"epoch_i_acc": 0.5, "epoch_t_loss": 0.75})])
+    append_events(validation_events, [(1010, 0, {"epoch_i_acc": 0.25, "epoch_t_loss": 1.0})])
+    now["timestamp"] = 1012
+    progress = supervisor.progress(request_id="job")
+
+    # an epoch took 10 seconds, 3 epochs are left, and
+    # 2 seconds have passed since the last one
+    assert progress == {
+        "request_id": "job",
+        "state": TrainingJobState.RUNNING,
+        "epoch": 1,
+        "total_epochs": 4,
+        "train_acc": 0.5,
+        "test_acc": 0.25,
+        "train_loss": 0.75,
+        "test_loss": 1.0,
+        "eta": 28.0,
+    }
+
+    append_events(train_events, [(1030, 1, {"epoch_i_acc": 0.75, "epoch_t_loss": 0.5})])
+    now["timestamp"] = 1035
+    progress = supervisor.progress(request_id="job")
+
+    # 15 seconds per epoch over the 2 epochs, less the
+    # 5 seconds since the last one
+    assert (progress["epoch"], progress["train_acc"], progress["test_acc"]) == (2, 0.75, 0.25)
+    assert progress["eta"] == 25.0
+
+    now["timestamp"] = 1100
+    assert supervisor.progress(request_id="job")["eta"] == 0.0
+
+
+def test_progress_of_finished_job(training_queue, supervisor):
+    training_queue.push(
+        process_id=PROCESS_ID_NONE,
+        request_id="job",
+        timestamp=1000,
+        metadata=json.dumps({"finished_at": 1100}),
+        state=TrainingJobState.COMPLETED,
+    )
+
+    progress = supervisor.progress(request_id="job")
+
+    assert progress["state"] == TrainingJobState.COMPLETED
+    assert progress["epoch"] is None and progress["eta"] is None
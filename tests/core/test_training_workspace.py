@@ -0,0 +1,39 @@
+import pytest
+import yaml
+
+pytest.importorskip("rasa")
+
+from rasa_codeless.core.training_workspace import TrainingWorkspace  # noqa: E402
+
+CONFIG = {
+    "language": "en",
+    "pipeline": [
+        {"name": "WhitespaceTokenizer"},
+        {"name": "DIETClassifier", "epochs": 5, "tensorboard_log_directory": ".tensorboard"},
+    ],
+}
+
+
+def read_config(config_path):
+    with open(config_path, mode="r", encoding="utf8") as config_file:
+        return yaml.safe_load(config_file)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    training_workspace = TrainingWorkspace(request_id="job-1", workspaces_path=str(tmp_path / "workspaces"))
+    training_workspace.create()
+    return training_workspace
+
+
+def test_write_config_redirects_tensorboard_logs_only_for_training(workspace):
+    workspace.write_config(config_content=CONFIG)
+
+    train_config = read_config(workspace.train_config_path)
+    assert train_config["pipeline"][1]["tensorboard_log_directory"] == workspace.logdir
+    assert workspace.train_config_path in workspace.train_command()
+
+    # the persisted config does not point at the
+    # workspace, which is removed after the job
+    assert read_config(workspace.config_path) == CONFIG
+    assert CONFIG["pipeline"][1]["tensorboard_log_directory"] == ".tensorboard"
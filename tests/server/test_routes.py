@@ -0,0 +1,191 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("rasa")
+
+from rasa_codeless.core.botstore.botstore import BotStore  # noqa: E402
+from rasa_codeless.core.botstore.local_botstore import LocalBotStore  # noqa: E402
+from rasa_codeless.core.botstore.write_through_botstore import WriteThroughBotStore  # noqa: E402
+from rasa_codeless.core.training_queue import (  # noqa: E402
+    TrainingQueue,
+    create_in_memory_training_queue,
+)
+from rasa_codeless.core.training_supervisor import TrainingSupervisor  # noqa: E402
+from rasa_codeless.server import create_app  # noqa: E402
+from rasa_codeless.server.rasac_api import routes  # noqa: E402
+from rasa_codeless.shared.constants import (  # noqa: E402
+    PROCESS_ID_NONE,
+    TRAINING_LOG_MAX_STREAMS,
+    TrainingJobState,
+)
+
+API = "/api/rasac"
+MODEL_NAME = "20220101-000000.tar.gz"
+MODEL_CONTENT = b"rasa model archive"
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def training_queue(project):
+    data_source_path = str(project / "training_queue.db")
+    create_in_memory_training_queue(data_source_path=data_source_path)
+    queue = TrainingQueue(data_source_path=data_source_path)
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def local_botstore(project):
+    botstore = LocalBotStore(
+        botstore_path="bot_store",
+        models_path="models",
+        index_path=str(project / "botstore_index.db"),
+    )
+    yield botstore
+    botstore.index.close()
+
+
+@pytest.fixture
+def client(project, training_queue, local_botstore, monkeypatch):
+    # the routes serve the queue, botstore and supervisor
+    # of the project, and configure them on registration
+    supervisor = TrainingSupervisor(
+        training_queue=training_queue,
+        botstore=local_botstore,
+        workspaces_path=str(project / "workspaces"),
+        logs_path=str(project / "training_logs"),
+    )
+    monkeypatch.setattr(routes, "training_q", training_queue)
+    monkeypatch.setattr(routes, "local_botstore", local_botstore)
+    monkeypatch.setattr(routes, "botstore", local_botstore)
+    monkeypatch.setattr(routes, "training_supervisor", supervisor)
+    monkeypatch.setattr(routes, "log_streams", threading.BoundedSemaphore(TRAINING_LOG_MAX_STREAMS))
+    app = create_app(configs={"RASAC": {"rasac_server_configs": dict()}})
+    return app.test_client()
+
+
+def add_job(training_queue, request_id, state):
+    training_queue.push(
+        process_id=PROCESS_ID_NONE,
+        request_id=request_id,
+        timestamp=1,
+        metadata=json.dumps({"finished_at": 2} if state in TrainingJobState.FINISHED else {}),
+        state=state,
+    )
+
+
+def write_job_log(project, request_id, lines):
+    (project / "training_logs").mkdir(exist_ok=True)
+    (project / "training_logs" / f"{request_id}.log").write_text("".join(f"{line}\n" for line in lines))
+
+
+def add_model(project, local_botstore, model_name=MODEL_NAME):
+    (project / "bot_store" / model_name.replace(".tar.gz", "")).mkdir(parents=True)
+    (project / "models" / model_name).write_bytes(MODEL_CONTENT)
+    local_botstore.registry.refresh(force=True)
+
+
+def test_training_logs_stream_ends_with_the_job_state(client, project, training_queue):
+    add_job(training_queue, "job-1", TrainingJobState.COMPLETED)
+    write_job_log(project, "job-1", ["Epoch 1/2", "Epoch 2/2"])
+
+    response = client.get(f"{API}/bot/train/job-1/logs")
+
+    assert response.mimetype == "text/event-stream"
+    assert response.get_data(as_text=True) == \
+        "data: Epoch 1/2\n\ndata: Epoch 2/2\n\nevent: end\ndata: completed\n\n"
+    response.close()
+
+
+def test_training_logs_of_unknown_job(client):
+    response = client.get(f"{API}/bot/train/unknown/logs")
+
+    assert response.json["status"] == "error"
+    # the stream slot is released again
+    assert routes.log_streams.acquire(blocking=False)
+
+
+def test_training_logs_refuse_streams_beyond_the_limit(client, project, training_queue):
+    add_job(training_queue, "job-1", TrainingJobState.COMPLETED)
+    write_job_log(project, "job-1", ["Epoch 1/2"])
+    streams = [client.get(f"{API}/bot/train/job-1/logs", buffered=False) for _ in range(TRAINING_LOG_MAX_STREAMS)]
+
+    response = client.get(f"{API}/bot/train/job-1/logs")
+    assert response.status_code == 429
+
+    streams[0].close()
+    response = client.get(f"{API}/bot/train/job-1/logs")
+    assert response.status_code == 200
+    response.close()
+    for stream in streams[1:]:
+        stream.close()
+
+
+def test_download_model_with_etag(client, project, local_botstore):
+    add_model(project, local_botstore)
+
+    response = client.get(f"{API}/botstore/models/{MODEL_NAME}")
+
+    assert response.status_code == 200
+    assert response.data == MODEL_CONTENT
+    assert response.headers["ETag"] == f'"{local_botstore.model_digest(model_name=MODEL_NAME)}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert f"filename={MODEL_NAME}" in response.headers["Content-Disposition"]
+    response.close()
+
+
+def test_download_model_if_none_match(client, project, local_botstore):
+    add_model(project, local_botstore)
+    etag = client.get(f"{API}/botstore/models/{MODEL_NAME}").headers["ETag"]
+
+    response = client.get(f"{API}/botstore/models/{MODEL_NAME}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_download_model_range(client, project, local_botstore):
+    add_model(project, local_botstore)
+
+    response = client.get(f"{API}/botstore/models/{MODEL_NAME}", headers={"Range": "bytes=5-9"})
+
+    assert response.status_code == 206
+    assert response.data == MODEL_CONTENT[5:10]
+    assert response.headers["Content-Range"] == f"bytes 5-9/{len(MODEL_CONTENT)}"
+    response.close()
+
+    # resumed downloads of a changed model get it whole
+    response = client.get(f"{API}/botstore/models/{MODEL_NAME}", headers={"Range": "bytes=5-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.data == MODEL_CONTENT
+    response.close()
+
+
+def test_download_unknown_model(client):
+    response = client.get(f"{API}/botstore/models/{MODEL_NAME}")
+
+    assert response.status_code == 404
+    assert response.json == {"status": "error", "response": "model not found"}
+
+
+def test_download_model_not_kept_on_this_server(client, local_botstore, monkeypatch):
+    # the catalog of other servers lists the model
+    class Catalog(BotStore):
+        def model_exists(self, model_name):
+            return True
+
+    write_through = WriteThroughBotStore(local=local_botstore, remote=Catalog(), remote_reads=True)
+    monkeypatch.setattr(routes, "botstore", write_through)
+
+    response = client.get(f"{API}/botstore/models/{MODEL_NAME}")
+
+    assert response.status_code == 404
+    assert response.json == {"status": "error", "response": "model not available on this server"}
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from rasa_codeless.shared.constants import PersistMode, PersistStrategy
+from rasa_codeless.utils.blob_store import BlobStore
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return BlobStore(blobs_path=str(tmp_path / "bot_store" / ".blobs"))
+
+
+def write_file(file_path, content):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(content)
+    return str(file_path)
+
+
+def blob_files(blob_store):
+    return [
+        os.path.join(dir_path, file_name)
+        for dir_path, _, file_names in os.walk(blob_store.blobs_path)
+        for file_name in file_names
+    ]
+
+
+def store_blob(blob_store, content, age=0.0):
+    digest = hashlib.sha256(content).hexdigest()
+    blob_path = blob_store.blob_path(digest)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    with open(blob_path, mode="wb") as blob:
+        blob.write(content)
+    modified_at = time.time() - age
+    os.utime(blob_path, (modified_at, modified_at))
+    return digest
+
+
+def test_collect_removes_unreferenced_blobs_past_the_grace_period(blob_store):
+    referenced = store_blob(blob_store, b"referenced", age=7200)
+    unreferenced = store_blob(blob_store, b"unreferenced", age=7200)
+
+    assert blob_store.collect(referenced={referenced}, grace_period=3600) == 1
+    assert os.path.exists(blob_store.blob_path(referenced))
+    assert not os.path.exists(blob_store.blob_path(unreferenced))
+
+
+def test_collect_keeps_blobs_within_the_grace_period(blob_store):
+    # the model dir of a new blob may not have its
+    # manifest yet
+    recent = store_blob(blob_store, b"recent", age=60)
+
+    assert blob_store.collect(referenced=set(), grace_period=3600) == 0
+    assert os.path.exists(blob_store.blob_path(recent))
+
+
+def test_collect_ignores_the_link_count_of_blobs(blob_store, tmp_path):
+    # a model dir may hard link a blob that no manifest
+    # refers to anymore, e.g. a model being deleted
+    digest = store_blob(blob_store, b"linked", age=7200)
+    os.link(blob_store.blob_path(digest), str(tmp_path / "model_file"))
+
+    assert blob_store.collect(referenced=set(), grace_period=3600) == 1
+    assert not os.path.exists(blob_store.blob_path(digest))
+    assert (tmp_path / "model_file").read_bytes() == b"linked"
+
+
+def test_collect_removes_leftover_temporary_files(blob_store):
+    digest = store_blob(blob_store, b"content", age=7200)
+    leftover_path = blob_store.blob_path(digest) + ".tmp"
+    os.rename(blob_store.blob_path(digest), leftover_path)
+
+    assert blob_store.collect(referenced={digest}, grace_period=3600) == 1
+    assert not os.path.exists(leftover_path)
+
+
+def test_collect_without_blobs_dir(blob_store):
+    assert blob_store.collect(referenced=set()) == 0
+
+
+def test_place_in_copy_mode_does_not_store_blobs(blob_store, tmp_path):
+    src = write_file(tmp_path / "project" / "config.yml", b"pipeline: []")
+    dst = str(tmp_path / "model" / "config.yml")
+
+    assert blob_store.place(file_path=src, dst=dst, mode=PersistMode.COPY) == (PersistStrategy.COPY, None, None)
+    assert open(dst, mode="rb").read() == b"pipeline: []"
+    assert blob_files(blob_store) == []
+
+
+def test_place_in_link_mode_shares_the_placed_file_with_its_blob(blob_store, tmp_path):
+    src = write_file(tmp_path / "project" / "config.yml", b"pipeline: []")
+    dst = str(tmp_path / "model" / "config.yml")
+
+    strategy, blob_strategy, digest = blob_store.place(file_path=src, dst=dst, mode=PersistMode.LINK)
+
+    assert (strategy, blob_strategy) == (PersistStrategy.COPY, PersistStrategy.LINK)
+    assert digest == hashlib.sha256(b"pipeline: []").hexdigest()
+    assert os.stat(dst).st_ino == os.stat(blob_store.blob_path(digest)).st_ino
+    # the source is never linked, since it may still
+    # be edited in place
+    assert os.stat(src).st_nlink == 1
+
+
+def test_place_in_link_mode_reuses_the_blob_of_identical_files(blob_store, tmp_path):
+    src = write_file(tmp_path / "project" / "config.yml", b"pipeline: []")
+    other_src = write_file(tmp_path / "other_project" / "config.yml", b"pipeline: []")
+    _, _, digest = blob_store.place(file_path=src, dst=str(tmp_path / "model" / "config.yml"), mode=PersistMode.LINK)
+
+    other_dst = str(tmp_path / "other_model" / "config.yml")
+    strategy, blob_strategy, other_digest = blob_store.place(
+        file_path=other_src, dst=other_dst, mode=PersistMode.LINK
+    )
+
+    assert (strategy, blob_strategy, other_digest) == (PersistStrategy.LINK, PersistStrategy.REUSED, digest)
+    assert os.stat(other_dst).st_ino == os.stat(blob_store.blob_path(digest)).st_ino
+    assert len(blob_files(blob_store)) == 1
+
+
+def test_place_reuses_the_blob_of_unchanged_sources_without_reading_them(blob_store, tmp_path, monkeypatch):
+    src = write_file(tmp_path / "project" / "config.yml", b"pipeline: []")
+    _, _, digest = blob_store.place(file_path=src, dst=str(tmp_path / "model" / "config.yml"), mode=PersistMode.LINK)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged source was read again")
+
+    monkeypatch.setattr(BlobStore, "_copy_and_hash_file", staticmethod(fail))
+    monkeypatch.setattr(BlobStore, "_hash_file", staticmethod(fail))
+    result = blob_store.place(file_path=src, dst=str(tmp_path / "next_model" / "config.yml"), mode=PersistMode.LINK)
+
+    assert result == (PersistStrategy.LINK, PersistStrategy.REUSED, digest)
+
+
+def test_place_in_reflink_mode_writes_new_files_once(blob_store, tmp_path):
+    src = write_file(tmp_path / "project" / "config.yml", b"pipeline: []")
+    dst = str(tmp_path / "model" / "config.yml")
+
+    strategy, blob_strategy, digest = blob_store.place(file_path=src, dst=dst, mode=PersistMode.REFLINK)
+
+    assert open(dst, mode="rb").read() == b"pipeline: []"
+    if strategy == PersistStrategy.COPY:
+        # filesystems without copy on write cannot share
+        # the file with a blob, which is then not written
+        assert (blob_strategy, digest) == (None, None)
+        assert blob_files(blob_store) == []
+    else:
+        assert (strategy, blob_strategy) == (PersistStrategy.REFLINK, PersistStrategy.REFLINK)
+        assert blob_files(blob_store) == [blob_store.blob_path(digest)]
+
+
+def test_place_with_invalid_mode(blob_store, tmp_path):
+    src = write_file(tmp_path / "project" / "config.yml", b"pipeline: []")
+
+    with pytest.raises(ValueError):
+        blob_store.place(file_path=src, dst=str(tmp_path / "model" / "config.yml"), mode="symlink")
@@ -0,0 +1,37 @@
+import pytest
+
+from rasa_codeless.shared.constants import (
+    Config,
+    InterfaceType,
+    DEFAULT_MAX_CONCURRENT_TRAININGS,
+)
+from rasa_codeless.shared.exceptions.config import InvalidConfigValueException
+from rasa_codeless.utils.config import (
+    get_init_configs,
+    get_max_concurrent_trainings,
+)
+
+
+def test_get_max_concurrent_trainings_defaults_when_not_set():
+    assert get_max_concurrent_trainings(None) == DEFAULT_MAX_CONCURRENT_TRAININGS
+
+
+def test_get_max_concurrent_trainings_keeps_positive_integers():
+    assert get_max_concurrent_trainings(4) == 4
+
+
+@pytest.mark.parametrize("value", [0, -1, "2", 1.5, True])
+def test_get_max_concurrent_trainings_rejects_invalid_values(value):
+    with pytest.raises(InvalidConfigValueException):
+        get_max_concurrent_trainings(value)
+
+
+def test_get_init_configs_rejects_invalid_cli_max_concurrent_trainings():
+    with pytest.raises(InvalidConfigValueException):
+        get_init_configs(interface=InterfaceType.SERVER, max_concurrent_trainings=0)
+
+
+def test_get_init_configs_sets_cli_max_concurrent_trainings():
+    configs = get_init_configs(interface=InterfaceType.SERVER, max_concurrent_trainings=3)
+
+    assert configs[Config.SERVER_CONFIGS_KEY][Config.MAX_CONCURRENT_TRAININGS_KEY] == 3
@@ -0,0 +1,68 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("rasa")
+
+from rasa_codeless.utils.io import get_available_model_name  # noqa: E402
+
+MODEL_NAME = "20220101-101010.tar.gz"
+
+
+@pytest.fixture
+def models_path(tmp_path):
+    models_path = tmp_path / "models"
+    models_path.mkdir()
+    return str(models_path)
+
+
+@pytest.fixture
+def botstore_path(tmp_path):
+    return str(tmp_path / "bot_store")
+
+
+def test_get_available_model_name_keeps_free_name(models_path, botstore_path):
+    assert get_available_model_name(MODEL_NAME, models_path=models_path, botstore_path=botstore_path) == MODEL_NAME
+    assert not os.path.exists(botstore_path)
+
+
+def test_get_available_model_name_skips_taken_names(models_path, botstore_path):
+    open(os.path.join(models_path, MODEL_NAME), mode="wb").close()
+    os.makedirs(os.path.join(botstore_path, "20220101-101011"))
+
+    model_name = get_available_model_name(MODEL_NAME, models_path=models_path, botstore_path=botstore_path)
+
+    assert model_name == "20220101-101012.tar.gz"
+
+
+def test_get_available_model_name_reserves_botstore_dir(models_path, botstore_path):
+    model_name = get_available_model_name(
+        MODEL_NAME, models_path=models_path, botstore_path=botstore_path, reserve=True
+    )
+
+    assert model_name == MODEL_NAME
+    assert os.path.isdir(os.path.join(botstore_path, "20220101-101010"))
+    # a reserved name is not handed out again
+    assert get_available_model_name(
+        MODEL_NAME, models_path=models_path, botstore_path=botstore_path, reserve=True
+    ) == "20220101-101011.tar.gz"
+
+
+def test_get_available_model_name_reserves_distinct_names_concurrently(models_path, botstore_path):
+    reserved_names = list()
+    start = threading.Barrier(8)
+
+    def reserve():
+        start.wait()
+        reserved_names.append(get_available_model_name(
+            MODEL_NAME, models_path=models_path, botstore_path=botstore_path, reserve=True
+        ))
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(reserved_names) == [f"20220101-1010{10 + second}.tar.gz" for second in range(8)]
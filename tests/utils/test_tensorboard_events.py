@@ -0,0 +1,122 @@
+import os
+import struct
+
+import pytest
+
+from rasa_codeless.shared.exceptions.io import TensorboardEventFileException
+from rasa_codeless.utils.tensorboard_events import (
+    EventFileTailer,
+    iterate_event_file,
+    masked_crc32c,
+    parse_event,
+    read_records,
+)
+
+# written by the tensorboard event writer: a file version
+# event, epoch_i_acc as simple values, and epoch_t_loss as
+# a float_val, tensor_content and double_val tensor
+EVENT_FILE = os.path.join(os.path.dirname(__file__), "data", "events.out.tfevents.1000.fixture.v2")
+
+SCALARS = [
+    (1001.0, 0, "epoch_i_acc", 0.5),
+    (1002.0, 1, "epoch_i_acc", 0.75),
+    (1003.0, 2, "epoch_t_loss", 0.25),
+    (1004.0, 3, "epoch_t_loss", 0.125),
+    (1005.0, 4, "epoch_t_loss", 0.0625),
+]
+
+
+@pytest.fixture
+def event_data():
+    with open(EVENT_FILE, mode="rb") as event_stream:
+        return event_stream.read()
+
+
+def write_event_file(tmp_path, data):
+    event_file = tmp_path / "events.out.tfevents.1000.test.v2"
+    event_file.write_bytes(data)
+    return str(event_file)
+
+
+def record_offsets(data):
+    offsets, position = list(), 0
+    while position < len(data):
+        offsets.append(position)
+        position += 12 + struct.unpack("<Q", data[position:position + 8])[0] + 4
+    return offsets
+
+
+def test_masked_crc32c():
+    # masked crc of an empty record, as written by tensorflow
+    assert masked_crc32c(b"") == 0xA282EAD8
+    assert masked_crc32c(b"123456789") == (((0xE3069283 >> 15) | (0xE3069283 << 17)) + 0xA282EAD8) & 0xFFFFFFFF
+
+
+def test_iterate_event_file_reads_simple_values_and_tensor_scalars():
+    assert list(iterate_event_file(event_file=EVENT_FILE)) == SCALARS
+
+
+def test_parse_event_without_summary(event_data):
+    records, _ = read_records(event_data)
+
+    assert parse_event(records[0]) == (1000.0, 0, [])
+
+
+def test_read_records_leaves_truncated_trailing_record(event_data):
+    last_record = record_offsets(event_data)[-1]
+
+    for end in [last_record + 4, last_record + 12, len(event_data) - 1]:
+        records, consumed = read_records(event_data[:end])
+        assert (len(records), consumed) == (len(SCALARS), last_record)
+
+
+def test_iterate_event_file_ignores_truncated_trailing_record(tmp_path, event_data):
+    event_file = write_event_file(tmp_path, event_data[:-1])
+
+    assert list(iterate_event_file(event_file=event_file)) == SCALARS[:-1]
+
+
+def test_read_records_skips_record_with_corrupt_data(tmp_path, event_data):
+    # flips a byte of the data of the second scalar
+    position = record_offsets(event_data)[2] + 12
+    corrupt_data = event_data[:position] + bytes([event_data[position] ^ 0xFF]) + event_data[position + 1:]
+
+    records, consumed = read_records(corrupt_data)
+
+    assert (len(records), consumed) == (len(SCALARS), len(corrupt_data))
+    event_file = write_event_file(tmp_path, corrupt_data)
+    assert list(iterate_event_file(event_file=event_file)) == [SCALARS[0], *SCALARS[2:]]
+
+
+def test_read_records_stops_at_record_with_corrupt_length(tmp_path, event_data):
+    position = record_offsets(event_data)[3]
+    corrupt_data = event_data[:position] + struct.pack("<Q", 1) + event_data[position + 8:]
+
+    records, consumed = read_records(corrupt_data)
+
+    assert (len(records), consumed) == (3, position)
+    # the event file is then read with tensorflow, which
+    # reports the data loss
+    event_file = write_event_file(tmp_path, corrupt_data)
+    with pytest.raises(TensorboardEventFileException):
+        list(iterate_event_file(event_file=event_file))
+
+
+def test_event_file_tailer_reads_appended_records(tmp_path, append_events):
+    event_file = tmp_path / "logdir" / "DIETClassifier" / "train" / "events.out.tfevents.0.test.v2"
+    append_events(event_file, [(10, 0, {"epoch_t_loss": 0.5})])
+    tailer = EventFileTailer(logdir=str(tmp_path / "logdir"))
+
+    tailer.poll()
+    assert tailer.latest("train", "epoch_t_loss") == {
+        "count": 1, "first_wall_time": 10.0, "value": 0.5, "step": 0, "wall_time": 10.0,
+    }
+
+    append_events(event_file, [(20, 1, {"epoch_t_loss": 0.25, "epoch_i_acc": 0.75})])
+    tailer.poll()
+    tailer.poll()
+    assert tailer.latest("train", "epoch_t_loss") == {
+        "count": 2, "first_wall_time": 10.0, "value": 0.25, "step": 1, "wall_time": 20.0,
+    }
+    assert tailer.latest("train", "epoch_i_acc")["count"] == 1
+    assert tailer.latest("validation", "epoch_t_loss") is None